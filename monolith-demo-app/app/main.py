@@ -1,29 +1,118 @@
 import asyncio
+import json
+import os
 import random
 import time
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
-from fastapi import FastAPI, HTTPException, Query
-from rich.console import Console
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from app.models.company import Company, CompanyCreate, CompanyUpdate
-from app.models.project import Project, ProjectCreate, ProjectSummary, ProjectUpdate
-from app.services.data_service import data_service
+from app.models.batch import (
+    BatchIds,
+    BatchResult,
+    CompanyBatchCreate,
+    CompanyBatchUpdate,
+    ProjectBatchCreate,
+    ProjectBatchUpdate,
+)
+from app.models.change import ChangeSet
+from app.models.company import Company, CompanyCreate, CompanyStats, CompanyUpdate, ExpandedCompany
+from app.models.project import Project, ProjectCreate, ProjectQuery, ProjectSummary, ProjectUpdate
+from app.services.data_service import EXPANSIONS, data_service
+from app.services.response_cache import CachedResponse, ResponseCache, etag_matches
+from app.utils import concurrency
+from app.utils.admission import AdmissionMiddleware
+from app.utils.change_feed import CHANGES_HEARTBEAT, ChangeFeed
+from app.utils.coalescing import CoalescingMiddleware
+from app.utils.compression import COMPRESSION_ENABLED, compress, negotiate
+from app.utils.console import create_console
+from app.utils.latency import latency_model
+from app.utils.draining import DRAIN_TIMEOUT, DrainMiddleware, drain_state
+from app.utils.metrics import STARTUP_PHASE, MetricsMiddleware, mark_worker_dead, render_metrics
 from app.utils.metadata import (
     get_all_status_code_details,
     get_node_name,
     get_pod_name,
     get_worker_id,
 )
+from app.utils.profiler import create_profiler
+from app.utils.startup import Initializer, Startup
+from app.utils.timing import TimedRoute, TimingMiddleware, measured, record_phase
 
-initializers = ["caches", "databases", "client connections"]
 WORKER_ID = get_worker_id()
 POD_NAME = get_pod_name()
 NODE_NAME = get_node_name()
 ALL_STATUS_CODE_DETAILS = get_all_status_code_details()
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+SUMMARY_FIELDS = list(ProjectSummary.model_fields)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE", "true").lower() == "true"
+# How long a cached response answers If-None-Match without checking for other workers' writes
+RESPONSE_CACHE_MAX_STALE = float(os.getenv("RESPONSE_CACHE_MAX_STALE_MS", 1000)) / 1000
+# Charge cache hits and 304s the simulated database delay too, so cached and uncached runs compare
+RESPONSE_CACHE_HIT_DELAY = os.getenv("RESPONSE_CACHE_HIT_DELAY", "false").lower() == "true"
+STARTUP_PARALLEL = os.getenv("STARTUP_PARALLEL", "true").lower() == "true"
+# Plain log lines instead of rich, and the data loaded in the background during startup
+FAST_START = os.getenv("FAST_START", "false").lower() == "true"
+# Multiplies every simulated request delay; 0 turns them off to measure the real work
+SIMULATED_DELAY_SCALE = float(os.getenv("SIMULATED_DELAY_SCALE", 1.0))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+# Guards on ?expand=: how deep relations nest, and how many rows one response may join in
+EXPAND_MAX_DEPTH = int(os.getenv("EXPAND_MAX_DEPTH", 2))
+EXPAND_MAX_ROWS = int(os.getenv("EXPAND_MAX_ROWS", 10000))
+
+response_cache = ResponseCache(max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256)))
+data_service.add_listener(response_cache.invalidate)
+change_feed = ChangeFeed(lambda: concurrency.run_read(data_service.get_version))
+data_service.add_listener(change_feed.notify)
+
+console = create_console(plain=FAST_START)
+
+def reset_worker_id():
+    """Workers forked by app.server inherit the master's module state, including its pid"""
+    global WORKER_ID
+    WORKER_ID = get_worker_id()
+
+os.register_at_fork(after_in_child=reset_worker_id)
+
+def simulated_initializer(delay_min: int, delay_max: int):
+    """Stand-in for acquiring a resource that takes delay_min to delay_max seconds"""
+    async def run():
+        await asyncio.sleep(random.randrange(delay_min, delay_max))
+    return run
+
+async def load_data():
+    """Load the store in the threadpool, so the first request does not pay for it"""
+    await run_in_threadpool(data_service.get_version)
+
+def log_initializer(initializer: Initializer):
+    if initializer.status == "done":
+        STARTUP_PHASE.labels(initializer.name).set(initializer.finished_at - initializer.started_at)
+        console.log(f"[bold green]Worker {WORKER_ID} - Initialized {initializer.name} in {initializer.finished_at - initializer.started_at:.2f} seconds.")
+    else:
+        console.log(f"[bold red]Worker {WORKER_ID} - Initializer {initializer.name} {initializer.status}: {initializer.error}")
+
+# Independent initializers run concurrently; readiness waits for the critical ones only
+startup = Startup(parallel=STARTUP_PARALLEL)
+startup.add("caches", simulated_initializer(1, 5), shared=True)
+startup.add("databases", simulated_initializer(5, 10))
+startup.add("client connections", simulated_initializer(1, 5))
+startup.add("background task", simulated_initializer(1, 5),
+            depends_on=["caches", "databases", "client connections"], critical=False)
+if FAST_START:
+    startup.add("data", load_data, critical=False)
+startup.add_listener(log_initializer)
+
+async def report_startup():
+    """Log the per-phase timing report once the background initializers are done too"""
+    await startup.wait_all()
+    STARTUP_PHASE.labels("total").set(time.perf_counter() - startup.started_at)
+    console.log(f"Application startup complete (Worker {WORKER_ID}): Resources initialized in [bold blue]{time.perf_counter() - startup.started_at:.2f} seconds.")
+    print(json.dumps({"event": "startup_report", "worker": WORKER_ID, "pod_name": POD_NAME, **startup.report()}), flush=True)
 
-console = Console()
 # progress = Progress()
 # progress.start()
 
@@ -34,34 +123,36 @@ async def lifespan(app: FastAPI):
     Run at startup: Simulate a slow start by introducing a delay.
     Initialize resources here.
     """
-    print(f"Application startup initiated (Worker {WORKER_ID}): Simulating slow start...")
-    start_time = time.time()
-    with console.status(f"[bold green]App Initializing (Worker {WORKER_ID})...") as status:
-        for initializer in initializers:
-            status.update(f"[bold blue] Worker {WORKER_ID} - Initializing {initializer}...")
-            init_start_time = time.time()
-            if initializer != "databases":
-                await asyncio.sleep(random.randrange(1,5))
-            else:
-                await asyncio.sleep(random.randrange(5,10))
-            console.log(f"[bold green]Worker {WORKER_ID} - Initialized {initializer} in {time.time() - init_start_time:.2f} seconds.")
-        status.update(
-            f"[bold blue]Worker {WORKER_ID} - Initializing Background Task and Resource Acquisition"
-        )
-        _final_sleep = random.randrange(1,5)
-        await asyncio.sleep(_final_sleep)  # Simulate max of 40 seconds of delay
-        console.log(f"[bold green]Worker {WORKER_ID} - Initialized Background Task and Resource Acquisition in {_final_sleep:.2f} seconds.")
-    console.log(f"Application startup complete (Worker {WORKER_ID}): Resources initialized in [bold blue]{time.time() - start_time:.2f} seconds.")
+    concurrency.configure_threadpool()
+    print(f"Application startup initiated (Worker {WORKER_ID}, {concurrency.get_execution_mode()} mode): Simulating slow start...")
+    with console.status(f"[bold blue]Worker {WORKER_ID} - Initializing {', '.join(startup.initializers)}..."):
+        await startup.start()
+    STARTUP_PHASE.labels("ready").set(startup.ready_at - startup.started_at)
+    console.log(f"Application ready (Worker {WORKER_ID}): Critical resources initialized in [bold blue]{startup.ready_at - startup.started_at:.2f} seconds.")
+    startup_reporter = asyncio.create_task(report_startup())
+    drain_watcher = asyncio.create_task(drain_state.watch())
+    drain_state.ready = True
     yield  # The FastAPI application will now handle requests
     """
     Run on shutdown: Clean up resources here.
     """
     start_time = time.time()
     with console.status(f"[bold green]Application shutdown (Worker {WORKER_ID})...") as status:
+        drain_state.start_drain()
+        status.update(
+            f"[bold blue]Worker {WORKER_ID} - Waiting for {drain_state.in_flight} in-flight requests"
+        )
+        if not await drain_state.wait_idle(DRAIN_TIMEOUT):
+            console.log(f"[bold red]Worker {WORKER_ID} - Drain deadline of {DRAIN_TIMEOUT:.0f}s passed with {drain_state.in_flight} requests in flight")
         status.update(
             f"[bold blue]Worker {WORKER_ID} - Cleaning up resources"
         )
-        await asyncio.sleep(random.randrange(5,15))
+        drain_watcher.cancel()
+        startup_reporter.cancel()
+        startup.cancel()
+        drain_state.close()
+        data_service.close()
+        mark_worker_dead(WORKER_ID)
     console.log(f"[bold green]Worker {WORKER_ID} - Application shutdown complete: Resources cleaned up in {time.time() - start_time:.2f} seconds.")
 
 app = FastAPI(
@@ -70,18 +161,174 @@ app = FastAPI(
     version="1.2.0",
     lifespan=lifespan,
 )
+# Splits FastAPI's request parsing and response serialization into their own timing phases
+app.router.route_class = TimedRoute
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(CoalescingMiddleware, version=lambda: concurrency.run_read(data_service.get_version))
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TimingMiddleware, profiler=create_profiler())
+app.add_middleware(DrainMiddleware)
 
 # Simulate realistic response times
-def simulate_database_delay(delay_min: float = 0.2, delay_max: float = 1.0):
-    """Simulate realistic database query delay - 200ms to 1s for production-like behavior"""
-    time.sleep(random.uniform(delay_min, delay_max))
+async def simulate_database_delay(delay_min: float = 0.2, delay_max: float = 1.0):
+    """Simulate realistic database query delay - 200ms to 1s for production-like behavior,
+    or whatever LATENCY_PROFILE sets for the route"""
+    if not SIMULATED_DELAY_SCALE:
+        return
+    start = time.perf_counter()
+    with latency_model.query():
+        await concurrency.sleep(latency_model.database_delay(delay_min, delay_max) * SIMULATED_DELAY_SCALE)
+    record_phase("db", time.perf_counter() - start)
+
+async def simulate_delay(status_code: int, delay_max: float):
+    """Simulate realistic delay - 100ms to max_delay for production-like behavior,
+    or whatever LATENCY_PROFILE sets for the status code"""
+    if SIMULATED_DELAY_SCALE:
+        await concurrency.sleep(latency_model.status_delay(status_code, 0.1, delay_max) * SIMULATED_DELAY_SCALE)
+
+def encode_json(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
 
-def simulate_delay(delay_max: float):
-    """Simulate realistic delay - 100ms to max_delay for production-like behavior"""
-    time.sleep(random.uniform(0.1, delay_max))
+def cache_headers(cached: CachedResponse, vary: Dict[str, str]) -> Dict[str, str]:
+    return {**cached.headers, **vary, "Cache-Control": "no-cache", "X-Data-Version": str(cached.version)}
+
+def not_modified(cached: CachedResponse, encoding: Optional[str], if_none_match: Optional[str],
+                 headers: Dict[str, str]) -> Optional[Response]:
+    """A 304 if If-None-Match names one of the entry's ETags, found without compressing anything"""
+    for etag in cached.etags(encoding):
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={**headers, "ETag": etag})
+    return None
+
+async def cached_json_response(request: Request, encode: Callable[[], Tuple[bytes, Dict[str, str]]],
+                               delay_max: float = 1.0) -> Response:
+    """Serve encoded JSON from the response cache, keyed by path, query and data version.
+
+    If-None-Match is checked against the cached entry first: one confirmed
+    current within RESPONSE_CACHE_MAX_STALE_MS answers with a 304 without
+    touching the DataService. Otherwise the data version is checked, and a miss
+    pays the simulated database delay, then encodes and caches the body (hits
+    pay it too with RESPONSE_CACHE_HIT_DELAY). The body is sent in the best
+    coding Accept-Encoding allows, compressed once per cache entry.
+    `X-Data-Version` tells clients which version to follow the change feed from.
+    """
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    vary = {"Vary": "Accept-Encoding"} if COMPRESSION_ENABLED else {}
+    if not RESPONSE_CACHE_ENABLED:
+        await simulate_database_delay(delay_max=delay_max)
+        version = await concurrency.run_read(data_service.get_version)
+        body, headers = await concurrency.run_read(measured, "encode", encode)
+        headers = {**headers, **vary, "X-Data-Version": str(version)}
+        compressed = await concurrency.run_read(measured, "compress", compress, body, encoding) if encoding else None
+        if compressed is not None:
+            body, headers["Content-Encoding"] = compressed, encoding
+        return Response(body, media_type="application/json", headers=headers)
+
+    key = (request.url.path, str(request.query_params))
+    if_none_match = request.headers.get("if-none-match")
+    cached = response_cache.recent(key, RESPONSE_CACHE_MAX_STALE) if if_none_match else None
+    response = not_modified(cached, encoding, if_none_match, cache_headers(cached, vary)) if cached else None
+    if response is not None:
+        if RESPONSE_CACHE_HIT_DELAY:
+            await simulate_database_delay(delay_max=delay_max)
+        return response
+
+    version = await concurrency.run_read(data_service.get_version)
+    cached = response_cache.get(key, version)
+    if cached is None or RESPONSE_CACHE_HIT_DELAY:
+        await simulate_database_delay(delay_max=delay_max)
+    if cached is None:
+        body, headers = await concurrency.run_read(measured, "encode", encode)
+        cached = response_cache.put(key, version, body, headers)
+    headers = cache_headers(cached, vary)
+    response = not_modified(cached, encoding, if_none_match, headers)
+    if response is not None:
+        return response
+    content_encoding, body, headers["ETag"] = await concurrency.run_read(measured, "compress", cached.encoded, encoding)
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+def check_batch_size(items: List[Any]):
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per batch, got {len(items)}")
+
+def item_result(row_id: Optional[int], ok: bool, data: Any, error_status: int, error: str) -> Dict[str, Any]:
+    """One entry of a batch response: 200 with data, or error_status with error"""
+    if ok:
+        return {"id": row_id, "status": 200, "data": data}
+    return {"id": row_id, "status": error_status, "error": error}
+
+async def missing_companies(company_ids: List[int]) -> List[int]:
+    """Which of company_ids do not exist, looked up in one store read"""
+    unique = list(dict.fromkeys(company_ids))
+    companies = await concurrency.run_read(data_service.get_companies_by_id, unique)
+    return [company_id for company_id, company in zip(unique, companies) if company is None]
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """Validate a `fields=` projection; `id` is always included as the pagination key"""
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Must be any of: {', '.join(model.model_fields)}")
+    return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+
+def parse_expand(expand: Optional[str]) -> Optional[List[str]]:
+    """Validate an `expand=` list of relations to join into each company"""
+    if expand is None:
+        return None
+    requested = list(dict.fromkeys(path.strip() for path in expand.split(",") if path.strip()))
+    too_deep = [path for path in requested if path.count(".") >= EXPAND_MAX_DEPTH]
+    if too_deep:
+        raise HTTPException(status_code=400, detail=f"Expansions nest at most {EXPAND_MAX_DEPTH} levels: {', '.join(too_deep)}")
+    unknown = [path for path in requested if path not in EXPANSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expansions: {', '.join(unknown)}. Must be any of: {', '.join(EXPANSIONS)}")
+    return requested or None
+
+async def list_response(request: Request, entity: str, model: Type[BaseModel], limit: Optional[int],
+                        after_id: Optional[int], fields: Optional[str], delay_max: float = 1.0,
+                        **filters: Any) -> Response:
+    """A page of rows as JSON (with a `Link: rel="next"` header), or every row as streamed NDJSON"""
+    projection = parse_fields(fields, model)
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        if filters.get("expand"):
+            # EXPAND_MAX_ROWS caps a whole response, which a stream cannot answer with a 400 halfway through
+            raise HTTPException(status_code=400, detail="expand is not supported on streamed responses; page with limit")
+        await simulate_database_delay(delay_max=delay_max)
+        batches = data_service.iter_rows(entity, after_id=after_id, fields=projection, **filters)
+        try:
+            # Fetch the first batch up front so a bad cursor is a 400, not a broken stream
+            first = await concurrency.run_read(next, batches, None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def stream():
+            batch = first
+            while batch:
+                yield b"".join(encode_json(row) + b"\n" for row in batch)
+                batch = await concurrency.run_read(next, batches, None)
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    def encode() -> Tuple[bytes, Dict[str, str]]:
+        try:
+            rows, cursor = data_service.list_page(entity, after_id=after_id, limit=limit, fields=projection,
+                                                  max_expanded=EXPAND_MAX_ROWS, **filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        headers = {}
+        if cursor is not None:
+            next_url = request.url.include_query_params(**cursor)
+            headers["Link"] = f'<{next_url.path}?{next_url.query}>; rel="next"'
+        return encode_json(rows), headers
+
+    return await cached_json_response(request, encode, delay_max=delay_max)
 
 @app.api_route("/", methods=["GET", "HEAD"])
-def read_root():
+async def read_root():
     return {
         "message": app.title,
         "version": app.version,
@@ -91,141 +338,403 @@ def read_root():
     }
 
 @app.api_route("/health", methods=["GET", "HEAD"])
-def health_check():
+async def health_check():
     return {"status": "healthy", "service": "construction-management-api", "pod_name": POD_NAME, "node_name": NODE_NAME}
 
+@app.api_route("/ready", methods=["GET", "HEAD"])
+async def readiness_check():
+    """Fails while starting up and once draining, unlike /health which only checks liveness"""
+    if drain_state.draining or not drain_state.ready:
+        status = "draining" if drain_state.draining else "starting"
+        return JSONResponse({"status": status, "pod_name": POD_NAME, "worker": WORKER_ID}, status_code=503)
+    return {"status": "ready", "pod_name": POD_NAME, "worker": WORKER_ID}
+
+@app.get("/drain", include_in_schema=False)
+async def drain_status():
+    """Drain progress: requests still in flight across the pod's draining workers"""
+    return {
+        "draining": drain_state.draining,
+        "in_flight": drain_state.pod_in_flight(),
+        "draining_for": round(time.time() - drain_state.drain_started, 3) if drain_state.drain_started else 0,
+    }
+
+@app.get("/startup", include_in_schema=False)
+async def startup_report():
+    """Per-phase startup timings of this worker"""
+    return {"worker": WORKER_ID, "pod_name": POD_NAME, **startup.report()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, aggregated across workers"""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
 @app.get("/sleep/{sleep_time}")
-def sleep_route(sleep_time: float):
+async def sleep_route(sleep_time: float):
     """Simulate long-running operations"""
-    time.sleep(sleep_time)
+    await concurrency.sleep(sleep_time)
     return {"slept_for": sleep_time, "message": "Operation completed"}
 
 # Company Endpoints
-@app.get("/companies", response_model=List[Company])
-def get_companies():
-    """Get all companies"""
-    simulate_database_delay(delay_max=4.0)
-    return data_service.get_companies()
-
-@app.get("/companies/{company_id}", response_model=Company)
-def get_company(company_id: int):
-    """Get a specific company by ID"""
-    simulate_database_delay()
-    company = data_service.get_company(company_id)
-    if not company:
-        raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
-    return company
+@app.get("/companies", response_model=List[ExpandedCompany])
+async def get_companies(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size; the next page is linked in the Link header"),
+    after_id: Optional[int] = Query(None, description="Return companies with an ID greater than this"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    expand: Optional[str] = Query(None, description="Comma separated relations to join in: projects, projects.tasks"),
+):
+    """Get all companies; send `Accept: application/x-ndjson` to stream them"""
+    return await list_response(request, "companies", Company, limit, after_id, fields, delay_max=4.0,
+                               expand=parse_expand(expand))
+
+@app.get("/companies/stats", response_model=List[CompanyStats])
+async def get_companies_stats():
+    """Get project aggregates for every company"""
+    await simulate_database_delay()
+    return await concurrency.run_read(data_service.get_companies_stats)
+
+@app.get("/companies/{company_id}", response_model=ExpandedCompany)
+async def get_company(
+    request: Request,
+    company_id: int,
+    expand: Optional[str] = Query(None, description="Comma separated relations to join in: projects, projects.tasks"),
+):
+    """Get a specific company by ID, with its projects and their tasks when expanded"""
+    expansions = parse_expand(expand)
+
+    def encode() -> Tuple[bytes, Dict[str, str]]:
+        if expansions:
+            try:
+                company = data_service.get_company_expanded(company_id, expansions, max_expanded=EXPAND_MAX_ROWS)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if not company:
+                raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
+            return encode_json(company), {}
+        company = data_service.get_company(company_id)
+        if not company:
+            raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
+        return company.model_dump_json().encode(), {}
+
+    return await cached_json_response(request, encode)
 
 @app.get("/companies/{company_id}/projects", response_model=List[ProjectSummary])
-def get_company_projects(company_id: int):
+async def get_company_projects(request: Request, company_id: int):
     """Get all projects for a specific company"""
-    simulate_database_delay()
-    company = data_service.get_company(company_id)
-    if not company:
+    def encode() -> Tuple[bytes, Dict[str, str]]:
+        if not data_service.get_company(company_id):
+            raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
+        # Only the summary columns are read; no full Project models are built
+        return encode_json(data_service.list_rows("projects", None, None, SUMMARY_FIELDS, company_id)), {}
+
+    return await cached_json_response(request, encode)
+
+@app.get("/companies/{company_id}/stats", response_model=CompanyStats)
+async def get_company_stats(company_id: int):
+    """Get project count, budgets and task completion for a company"""
+    await simulate_database_delay()
+    stats = await concurrency.run_read(data_service.get_company_stats, company_id)
+    if not stats:
         raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
-    
-    projects = data_service.get_company_projects(company_id)
-    return [ProjectSummary(
-        id=p.id,
-        name=p.name,
-        status=p.status,
-        budget=p.budget,
-        location=p.location,
-        project_type=p.project_type
-    ) for p in projects]
+    return stats
 
 @app.post("/companies", response_model=Company)
-def create_company(company: CompanyCreate):
+async def create_company(company: CompanyCreate):
     """Create a new company"""
-    simulate_database_delay()
+    await simulate_database_delay()
     company_data = company.dict()
-    new_company = data_service.create_company(company_data)
+    new_company = await concurrency.run_write(data_service.create_company, company_data)
     if not new_company:
         raise HTTPException(status_code=500, detail="Failed to create company")
     return new_company
 
 @app.put("/companies/{company_id}", response_model=Company)
-def update_company(company_id: int, company_update: CompanyUpdate):
+async def update_company(company_id: int, company_update: CompanyUpdate):
     """Update a company"""
-    simulate_database_delay()
+    await simulate_database_delay()
     update_data = {k: v for k, v in company_update.dict().items() if v is not None}
-    updated_company = data_service.update_company(company_id, update_data)
+    updated_company = await concurrency.run_write(data_service.update_company, company_id, update_data)
     if not updated_company:
         raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
     return updated_company
 
 @app.delete("/companies/{company_id}")
-def delete_company(company_id: int):
+async def delete_company(company_id: int):
     """Delete a company"""
-    simulate_database_delay()
-    success = data_service.delete_company(company_id)
+    await simulate_database_delay()
+    success = await concurrency.run_write(data_service.delete_company, company_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Company with ID {company_id} not found")
     return {"message": f"Company {company_id} deleted successfully"}
 
+@app.post("/companies:batchGet", response_model=BatchResult[Company])
+async def batch_get_companies(batch: BatchIds):
+    """Get many companies by ID in one round-trip; results come in request order"""
+    check_batch_size(batch.ids)
+    await simulate_database_delay()
+    companies = await concurrency.run_read(data_service.get_companies_by_id, batch.ids)
+    return {"results": [
+        item_result(company_id, company is not None, company, 404, f"Company with ID {company_id} not found")
+        for company_id, company in zip(batch.ids, companies)
+    ]}
+
+@app.post("/companies:batchCreate", response_model=BatchResult[Company])
+async def batch_create_companies(batch: CompanyBatchCreate):
+    """Create many companies in one storage transaction"""
+    check_batch_size(batch.items)
+    await simulate_database_delay()
+    companies = await concurrency.run_write(data_service.create_companies, [item.dict() for item in batch.items])
+    return {"results": [
+        item_result(company.id if company else None, company is not None, company, 500, "Failed to create company")
+        for company in companies
+    ]}
+
+@app.post("/companies:batchUpdate", response_model=BatchResult[Company])
+async def batch_update_companies(batch: CompanyBatchUpdate):
+    """Update many companies in one storage transaction"""
+    check_batch_size(batch.items)
+    await simulate_database_delay()
+    updates = [(item.id, {k: v for k, v in item.dict(exclude={"id"}).items() if v is not None}) for item in batch.items]
+    companies = await concurrency.run_write(data_service.update_companies, updates)
+    return {"results": [
+        item_result(item.id, company is not None, company, 404, f"Company with ID {item.id} not found")
+        for item, company in zip(batch.items, companies)
+    ]}
+
+@app.post("/companies:batchDelete", response_model=BatchResult[Company])
+async def batch_delete_companies(batch: BatchIds):
+    """Delete many companies in one storage transaction"""
+    check_batch_size(batch.ids)
+    await simulate_database_delay()
+    deleted = await concurrency.run_write(data_service.delete_companies, batch.ids)
+    return {"results": [
+        item_result(company_id, success, None, 404, f"Company with ID {company_id} not found")
+        for company_id, success in zip(batch.ids, deleted)
+    ]}
+
 # Project Endpoints
 @app.get("/projects", response_model=List[Project])
-def get_projects(company_id: Optional[int] = Query(None, description="Filter by company ID")):
-    """Get all projects, optionally filtered by company_id"""
-    simulate_database_delay()
-    return data_service.get_projects(company_id)
+async def get_projects(
+    request: Request,
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    status: Optional[List[str]] = Query(None, description="Filter by status; repeat for any of several"),
+    project_type: Optional[List[str]] = Query(None, description="Filter by project type; repeat for any of several"),
+    location: Optional[List[str]] = Query(None, description="Filter by location; repeat for any of several"),
+    min_budget: Optional[int] = Query(None, description="Minimum budget (inclusive)"),
+    max_budget: Optional[int] = Query(None, description="Maximum budget (inclusive)"),
+    start_date_from: Optional[str] = Query(None, pattern=DATE_PATTERN, description="Earliest start date (YYYY-MM-DD)"),
+    start_date_to: Optional[str] = Query(None, pattern=DATE_PATTERN, description="Latest start date (YYYY-MM-DD)"),
+    end_date_from: Optional[str] = Query(None, pattern=DATE_PATTERN, description="Earliest end date (YYYY-MM-DD)"),
+    end_date_to: Optional[str] = Query(None, pattern=DATE_PATTERN, description="Latest end date (YYYY-MM-DD)"),
+    sort: str = Query("id", pattern=r"^-?(id|budget|start_date|end_date)$", description="Sort field, `-` prefix for descending"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size; the next page is linked in the Link header"),
+    after_id: Optional[int] = Query(None, description="Cursor: ID of the last project of the previous page"),
+    after_value: Optional[str] = Query(None, description="Cursor: sort value of the last project of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+):
+    """Get projects filtered and sorted through secondary indexes; send `Accept: application/x-ndjson` to stream them"""
+    query = ProjectQuery(
+        company_id=company_id, status=status, project_type=project_type, location=location,
+        min_budget=min_budget, max_budget=max_budget,
+        start_date_from=start_date_from, start_date_to=start_date_to,
+        end_date_from=end_date_from, end_date_to=end_date_to, sort=sort,
+    )
+    return await list_response(request, "projects", Project, limit, after_id, fields, query=query, after_value=after_value)
 
 @app.get("/projects/{project_id}", response_model=Project)
-def get_project(project_id: int):
+async def get_project(request: Request, project_id: int):
     """Get a specific project by ID"""
-    simulate_database_delay()
-    project = data_service.get_project(project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project with ID {project_id} not found")
-    return project
+    def encode() -> Tuple[bytes, Dict[str, str]]:
+        project = data_service.get_project(project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail=f"Project with ID {project_id} not found")
+        return project.model_dump_json().encode(), {}
+
+    return await cached_json_response(request, encode)
 
 @app.post("/projects", response_model=Project)
-def create_project(project: ProjectCreate):
+async def create_project(project: ProjectCreate):
     """Create a new project"""
-    simulate_database_delay()
+    await simulate_database_delay()
     
-    # Validate company exists
-    company = data_service.get_company(project.company_id)
-    if not company:
-        raise HTTPException(status_code=400, detail=f"Company with ID {project.company_id} not found")
+    # Validate companies exist
+    for company_id in project.company_id:
+        if not await concurrency.run_read(data_service.get_company, company_id):
+            raise HTTPException(status_code=400, detail=f"Company with ID {company_id} not found")
     
     project_data = project.dict()
-    new_project = data_service.create_project(project_data)
+    new_project = await concurrency.run_write(data_service.create_project, project_data)
     if not new_project:
         raise HTTPException(status_code=500, detail="Failed to create project")
     return new_project
 
 @app.put("/projects/{project_id}", response_model=Project)
-def update_project(project_id: int, project_update: ProjectUpdate):
+async def update_project(project_id: int, project_update: ProjectUpdate):
     """Update a project"""
-    simulate_database_delay()
+    await simulate_database_delay()
     
-    # If updating company_id, validate company exists
-    if project_update.company_id is not None:
-        company = data_service.get_company(project_update.company_id)
-        if not company:
-            raise HTTPException(status_code=400, detail=f"Company with ID {project_update.company_id} not found")
+    # If updating company_id, validate companies exist
+    for company_id in project_update.company_id or []:
+        if not await concurrency.run_read(data_service.get_company, company_id):
+            raise HTTPException(status_code=400, detail=f"Company with ID {company_id} not found")
     
     update_data = {k: v for k, v in project_update.dict().items() if v is not None}
-    updated_project = data_service.update_project(project_id, update_data)
+    updated_project = await concurrency.run_write(data_service.update_project, project_id, update_data)
     if not updated_project:
         raise HTTPException(status_code=404, detail=f"Project with ID {project_id} not found")
     return updated_project
 
 @app.delete("/projects/{project_id}")
-def delete_project(project_id: int):
+async def delete_project(project_id: int):
     """Delete a project"""
-    simulate_database_delay()
-    success = data_service.delete_project(project_id)
+    await simulate_database_delay()
+    success = await concurrency.run_write(data_service.delete_project, project_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Project with ID {project_id} not found")
     return {"message": f"Project {project_id} deleted successfully"}
 
+@app.post("/projects:batchGet", response_model=BatchResult[Project])
+async def batch_get_projects(batch: BatchIds):
+    """Get many projects by ID in one round-trip; results come in request order"""
+    check_batch_size(batch.ids)
+    await simulate_database_delay()
+    projects = await concurrency.run_read(data_service.get_projects_by_id, batch.ids)
+    return {"results": [
+        item_result(project_id, project is not None, project, 404, f"Project with ID {project_id} not found")
+        for project_id, project in zip(batch.ids, projects)
+    ]}
+
+@app.post("/projects:batchCreate", response_model=BatchResult[Project])
+async def batch_create_projects(batch: ProjectBatchCreate):
+    """Create many projects in one storage transaction; items naming an unknown company get a 400"""
+    check_batch_size(batch.items)
+    await simulate_database_delay()
+    missing = set(await missing_companies([company_id for item in batch.items for company_id in item.company_id]))
+    valid = [item.dict() for item in batch.items if not missing.intersection(item.company_id)]
+    created = iter(await concurrency.run_write(data_service.create_projects, valid))
+    results = []
+    for item in batch.items:
+        unknown = [company_id for company_id in item.company_id if company_id in missing]
+        if unknown:
+            results.append(item_result(None, False, None, 400, f"Company with ID {unknown[0]} not found"))
+        else:
+            project = next(created)
+            results.append(item_result(project.id if project else None, project is not None, project, 500, "Failed to create project"))
+    return {"results": results}
+
+@app.post("/projects:batchUpdate", response_model=BatchResult[Project])
+async def batch_update_projects(batch: ProjectBatchUpdate):
+    """Update many projects in one storage transaction; items naming an unknown company get a 400"""
+    check_batch_size(batch.items)
+    await simulate_database_delay()
+    missing = set(await missing_companies([company_id for item in batch.items for company_id in item.company_id or []]))
+    updates = [
+        (item.id, {k: v for k, v in item.dict(exclude={"id"}).items() if v is not None})
+        for item in batch.items if not missing.intersection(item.company_id or [])
+    ]
+    updated = iter(await concurrency.run_write(data_service.update_projects, updates))
+    results = []
+    for item in batch.items:
+        unknown = [company_id for company_id in item.company_id or [] if company_id in missing]
+        if unknown:
+            results.append(item_result(item.id, False, None, 400, f"Company with ID {unknown[0]} not found"))
+        else:
+            project = next(updated)
+            results.append(item_result(item.id, project is not None, project, 404, f"Project with ID {item.id} not found"))
+    return {"results": results}
+
+@app.post("/projects:batchDelete", response_model=BatchResult[Project])
+async def batch_delete_projects(batch: BatchIds):
+    """Delete many projects in one storage transaction"""
+    check_batch_size(batch.ids)
+    await simulate_database_delay()
+    deleted = await concurrency.run_write(data_service.delete_projects, batch.ids)
+    return {"results": [
+        item_result(project_id, success, None, 404, f"Project with ID {project_id} not found")
+        for project_id, success in zip(batch.ids, deleted)
+    ]}
+
+# Change feed
+def change_event(event: str, version: int, data: Any) -> bytes:
+    """One Server-Sent Event; its id is the data version, so a reconnecting client resumes from it"""
+    return f"id: {version}\nevent: {event}\ndata: ".encode() + encode_json(data) + b"\n\n"
+
+async def wait_for_change(after: int, timeout: float) -> int:
+    """The data version once it is past after, or when timeout passes or the worker starts draining.
+
+    Waits in short slices, so open streams and long polls do not hold up a drain.
+    """
+    deadline = time.monotonic() + timeout
+    version = after
+    while not drain_state.draining:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        version = await change_feed.wait(after, min(remaining, 1.0))
+        if version > after:
+            break
+    return version
+
+async def change_stream(since: Optional[int]):
+    """`changes` events from version since on (from now on when since is None), with keep-alive comments.
+
+    A `resync` event means the change log does not reach back to since: the
+    client refetches what it shows and resumes from the event's id. The stream
+    ends once the worker starts draining; EventSource then reconnects elsewhere
+    with Last-Event-ID.
+    """
+    version = since if since is not None else await concurrency.run_read(data_service.get_version)
+    first = True
+    while True:
+        current, changes = await concurrency.run_read(data_service.get_changes, version)
+        if changes is None:
+            yield change_event("resync", current, {"version": current})
+            return
+        if changes or first:
+            yield change_event("changes", current, {"version": current, "changes": changes})
+            version, first = current, False
+        if drain_state.draining:
+            return
+        if await wait_for_change(version, CHANGES_HEARTBEAT) <= version:
+            if drain_state.draining:
+                return
+            yield b": keepalive\n\n"
+
+@app.get("/changes", response_model=ChangeSet,
+         responses={410: {"description": "The change log no longer reaches back to `since`; refetch and resume from `version`"}})
+async def get_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Data version (X-Data-Version) to return changes after; omit to get the current version"),
+    wait: float = Query(0, ge=0, le=30, description="Seconds to hold the request open until something changes"),
+):
+    """Rows changed after version `since`, each once in its current state; send `Accept: text/event-stream` to have them pushed"""
+    if "text/event-stream" in request.headers.get("accept", ""):
+        last_event_id = request.headers.get("last-event-id", "")
+        if last_event_id.isdigit():
+            since = int(last_event_id)
+        return StreamingResponse(change_stream(since), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
+    if since is None:
+        version = await concurrency.run_read(data_service.get_version)
+        return Response(encode_json({"version": version, "changes": []}), media_type="application/json")
+    version, changes = await concurrency.run_read(data_service.get_changes, since)
+    if changes == [] and wait:
+        await wait_for_change(since, wait)
+        version, changes = await concurrency.run_read(data_service.get_changes, since)
+    if changes is None:
+        return JSONResponse({
+            "detail": f"Changes after version {since} are no longer available; refetch and resume from version {version}",
+            "version": version,
+        }, status_code=410)
+    return Response(encode_json({"version": version, "changes": changes}), media_type="application/json")
+
 @app.get("/status/{status_code}")
-def status_route(status_code: int):
+async def status_route(status_code: int):
     """Simulate a status code for testing error handling"""
     if status_code in ALL_STATUS_CODE_DETAILS:
-        simulate_delay(delay_max=ALL_STATUS_CODE_DETAILS.get(status_code).get("max_delay"))
+        await simulate_delay(status_code, delay_max=ALL_STATUS_CODE_DETAILS.get(status_code).get("max_delay"))
         message = ALL_STATUS_CODE_DETAILS.get(status_code).get("message")
         description = ALL_STATUS_CODE_DETAILS.get(status_code).get("description")
     else:
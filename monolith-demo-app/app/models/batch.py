@@ -0,0 +1,48 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from app.models.company import CompanyCreate, CompanyUpdate
+from app.models.project import ProjectCreate, ProjectUpdate
+
+T = TypeVar("T")
+
+
+class BatchIds(BaseModel):
+    ids: List[int]
+
+
+class CompanyBatchCreate(BaseModel):
+    items: List[CompanyCreate]
+
+
+class CompanyUpdateItem(CompanyUpdate):
+    id: int
+
+
+class CompanyBatchUpdate(BaseModel):
+    items: List[CompanyUpdateItem]
+
+
+class ProjectBatchCreate(BaseModel):
+    items: List[ProjectCreate]
+
+
+class ProjectUpdateItem(ProjectUpdate):
+    id: int
+
+
+class ProjectBatchUpdate(BaseModel):
+    items: List[ProjectUpdateItem]
+
+
+class BatchItemResult(BaseModel, Generic[T]):
+    """Outcome of one item, in request order; status is what the single-item endpoint would have answered"""
+    id: Optional[int] = None
+    status: int
+    data: Optional[T] = None
+    error: Optional[str] = None
+
+
+class BatchResult(BaseModel, Generic[T]):
+    results: List[BatchItemResult[T]]
@@ -0,0 +1,17 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class Change(BaseModel):
+    """A row as it is now, after its last change at version seq"""
+    seq: int
+    entity: Literal["companies", "projects"]
+    op: Literal["put", "delete"]
+    id: int
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangeSet(BaseModel):
+    version: int
+    changes: List[Change]
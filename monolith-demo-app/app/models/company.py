@@ -2,6 +2,8 @@ from typing import List, Optional
 
 from pydantic import BaseModel
 
+from app.models.project import ExpandedProject
+
 
 class Company(BaseModel):
     id: int
@@ -18,6 +20,11 @@ class Company(BaseModel):
     email: str
 
 
+class ExpandedCompany(Company):
+    """Company with the relations named in ?expand= joined in"""
+    projects: Optional[List[ExpandedProject]] = None
+
+
 class CompanyCreate(BaseModel):
     name: str
     type: str
@@ -39,7 +46,16 @@ class CompanyUpdate(BaseModel):
     specialties: Optional[List[str]] = None
     employee_count: Optional[int] = None
     annual_revenue: Optional[int] = None
-    project_count: Optional[int] = None
     website: Optional[str] = None
     phone: Optional[str] = None
     email: Optional[str] = None
+
+
+class CompanyStats(BaseModel):
+    company_id: int
+    project_count: int
+    total_budget: int
+    active_budget: int
+    task_count: int
+    completed_task_count: int
+    task_completion_ratio: float
@@ -56,6 +56,11 @@ class ProjectUpdate(BaseModel):
     tasks: Optional[List[Task]] = None
 
 
+class ExpandedProject(Project):
+    """Project joined into a company by ?expand=projects; tasks only with projects.tasks"""
+    tasks: Optional[List[Task]] = None
+
+
 class ProjectSummary(BaseModel):
     id: int
     name: str
@@ -63,3 +68,17 @@ class ProjectSummary(BaseModel):
     budget: int
     location: str
     project_type: str
+
+
+class ProjectQuery(BaseModel):
+    company_id: Optional[int] = None
+    status: Optional[List[str]] = None
+    project_type: Optional[List[str]] = None
+    location: Optional[List[str]] = None
+    min_budget: Optional[int] = None
+    max_budget: Optional[int] = None
+    start_date_from: Optional[str] = None
+    start_date_to: Optional[str] = None
+    end_date_from: Optional[str] = None
+    end_date_to: Optional[str] = None
+    sort: str = "id"
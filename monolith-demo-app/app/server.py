@@ -0,0 +1,205 @@
+"""Preload-and-fork server: import the app and load the data once, then fork the workers.
+
+The master imports ``app.main`` (FastAPI, pydantic, rich and the app itself),
+loads the data store and runs the ``shared`` startup initializers, then freezes
+the heap so the garbage collector does not dirty those pages, binds the
+listening socket and forks ``--workers`` uvicorn workers. Workers share every
+page the master populated copy-on-write and only run their own per-process
+initializers. The master then supervises: a worker that dies is replaced by a
+fresh fork of the already warm master, without repeating the cold start.
+
+Usage:
+    python -m app.server --host 0.0.0.0 --port 8000 --workers 4
+"""
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+# Workers forked faster than this after the previous one died are crash-looping; back off
+MIN_WORKER_LIFETIME = 1.0
+MAX_RESTART_DELAY = 10.0
+# Exit code of a worker whose lifespan startup failed, as with uvicorn's own supervisor
+STARTUP_FAILURE = 3
+# How long a stopping worker waits for connections it already accepted to send their request
+ACCEPTED_GRACE = 1.0
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn's server, except that stopping does not drop connections it just accepted.
+
+    uvicorn closes every connection without a request in progress as soon as it
+    stops accepting, including one accepted a moment earlier whose request has
+    not arrived yet; the client then sees the connection closed or reset with
+    no response. Stop accepting first and give those connections a moment.
+
+    ``servers``, ``server_state.connections`` and each connection's ``cycle``
+    are uvicorn internals (written against 0.54); without them this is plain uvicorn.
+    """
+
+    async def shutdown(self, sockets=None):
+        servers = getattr(self, "servers", None)
+        connections = getattr(getattr(self, "server_state", None), "connections", None)
+        if servers is not None and connections is not None:
+            for server in servers:
+                server.close()
+            deadline = time.monotonic() + ACCEPTED_GRACE
+            # A connection without the attribute counts as busy, so it is left to uvicorn
+            while time.monotonic() < deadline and any(
+                getattr(connection, "cycle", False) is None for connection in list(connections)
+            ):
+                await asyncio.sleep(0.01)
+        await super().shutdown(sockets)
+
+
+class PreforkServer:
+    def __init__(self, host: str, port: int, workers: int, graceful_timeout: float, log_level: str,
+                 lifespan: str):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.lifespan = lifespan
+        self.children: Dict[int, float] = {}
+        self.stopping: Optional[float] = None
+        self.restart_delay = 0.0
+        self.sock: Optional[socket.socket] = None
+        # The app imported by preload(), which every worker is forked with
+        self.app: Optional[Any] = None
+
+    def log(self, message: str):
+        print(f"[prefork {os.getpid()}] {message}", flush=True)
+
+    def preload(self):
+        """Everything the workers should inherit instead of doing themselves"""
+        start = time.perf_counter()
+        from app.main import app, data_service, startup
+
+        imported = time.perf_counter()
+        data_service.preload()
+        loaded = time.perf_counter()
+        if self.lifespan == "on":
+            asyncio.run(startup.run_shared())
+        # Objects created so far are never collected; keeping the collector off them keeps their pages shared
+        gc.freeze()
+        self.app = app
+        self.log(
+            f"Preloaded app in {imported - start:.2f}s, data in {loaded - imported:.2f}s, "
+            f"shared initializers in {time.perf_counter() - loaded:.2f}s"
+        )
+
+    def bind(self):
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        self.sock = sock
+
+    def spawn(self):
+        assert self.app is not None and self.sock is not None, "preload() and bind() before forking workers"
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+        # Worker: its own process group, so a terminal Ctrl-C reaches it only once (through the master)
+        os.setpgid(0, 0)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        exit_code = 1
+        try:
+            server = WorkerServer(uvicorn.Config(self.app, lifespan=self.lifespan, log_level=self.log_level))
+            server.run(sockets=[self.sock])
+            exit_code = 0 if server.started else STARTUP_FAILURE
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def reap(self):
+        """Collect exited workers and forget their metrics and drain state"""
+        from app.main import drain_state
+        from app.utils.metrics import mark_worker_dead
+
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                break
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            mark_worker_dead(pid)
+            drain_state.close(pid)
+            if self.stopping is None:
+                lifetime = time.monotonic() - started
+                exit_code = os.waitstatus_to_exitcode(status)
+                self.log(f"Worker {pid} exited with status {exit_code} after {lifetime:.1f}s")
+                if lifetime < MIN_WORKER_LIFETIME or exit_code == STARTUP_FAILURE:
+                    self.restart_delay = min(max(self.restart_delay * 2, 0.5), MAX_RESTART_DELAY)
+                else:
+                    self.restart_delay = 0.0
+
+    def stop(self, signum, frame):
+        if self.stopping is None:
+            self.stopping = time.monotonic()
+            self.log(f"Received {signal.Signals(signum).name}, stopping {len(self.children)} workers")
+            for pid in self.children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def run(self):
+        self.preload()
+        self.bind()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.log(f"Serving on http://{self.host}:{self.port} with {self.workers} workers")
+        for _ in range(self.workers):
+            self.spawn()
+        while True:
+            self.reap()
+            if self.stopping is not None:
+                if not self.children:
+                    break
+                if time.monotonic() - self.stopping > self.graceful_timeout:
+                    self.log(f"Workers still running after {self.graceful_timeout:.0f}s, killing them")
+                    for pid in self.children:
+                        os.kill(pid, signal.SIGKILL)
+                    self.graceful_timeout = float("inf")
+            elif len(self.children) < self.workers:
+                if self.restart_delay:
+                    time.sleep(self.restart_delay)
+                self.spawn()
+                continue
+            time.sleep(0.1)
+        self.log("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 1)))
+    # Workers bound their own shutdown by DRAIN_TIMEOUT; this is the backstop
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("DRAIN_TIMEOUT", 30)) + 10)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--lifespan", default="on", choices=["on", "off"])
+    args = parser.parse_args()
+    PreforkServer(args.host, args.port, args.workers, args.graceful_timeout, args.log_level, args.lifespan).run()
+
+
+if __name__ == "__main__":
+    main()
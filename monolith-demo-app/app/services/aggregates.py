@@ -0,0 +1,61 @@
+from typing import Any, Dict
+
+# Projects in any other status count towards a company's active budget
+INACTIVE_STATUSES = ('Completed',)
+
+
+class CompanyAggregate:
+    """Running totals over the projects linked to one company"""
+
+    __slots__ = ('project_count', 'total_budget', 'active_budget', 'task_count', 'completed_task_count')
+
+    def __init__(self):
+        self.project_count = 0
+        self.total_budget = 0
+        self.active_budget = 0
+        self.task_count = 0
+        self.completed_task_count = 0
+
+    def apply(self, project: Dict[str, Any], sign: int):
+        """Add (sign=1) or subtract (sign=-1) one project's contribution"""
+        tasks = project.get('tasks', [])
+        self.project_count += sign
+        self.total_budget += sign * project.get('budget', 0)
+        if project.get('status') not in INACTIVE_STATUSES:
+            self.active_budget += sign * project.get('budget', 0)
+        self.task_count += sign * len(tasks)
+        self.completed_task_count += sign * sum(1 for task in tasks if task.get('status') == 'Completed')
+
+    def as_dict(self, company_id: int) -> Dict[str, Any]:
+        return {
+            'company_id': company_id,
+            'project_count': self.project_count,
+            'total_budget': self.total_budget,
+            'active_budget': self.active_budget,
+            'task_count': self.task_count,
+            'completed_task_count': self.completed_task_count,
+            'task_completion_ratio': self.completed_task_count / self.task_count if self.task_count else 0.0,
+        }
+
+
+class CompanyAggregates:
+    """Per-company aggregates maintained as deltas on every project put/remove"""
+
+    def __init__(self):
+        self.by_company: Dict[int, CompanyAggregate] = {}
+
+    def add(self, project: Dict[str, Any]):
+        # A company listed twice on a project still counts it once
+        for company_id in dict.fromkeys(project.get('company_id', [])):
+            self.by_company.setdefault(company_id, CompanyAggregate()).apply(project, 1)
+
+    def remove(self, project: Dict[str, Any]):
+        for company_id in dict.fromkeys(project.get('company_id', [])):
+            aggregate = self.by_company.get(company_id)
+            if aggregate is not None:
+                aggregate.apply(project, -1)
+                if aggregate.project_count == 0:
+                    del self.by_company[company_id]
+
+    def get(self, company_id: int) -> Dict[str, Any]:
+        return self.by_company.get(company_id, CompanyAggregate()).as_dict(company_id)
@@ -0,0 +1,65 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+# (seq, entity, id) of one changed row
+Change = Tuple[int, str, int]
+
+
+class ChangeLog:
+    """The rows touched by the last ``max_entries`` mutations, keyed by data version.
+
+    Only keys are kept; readers look the rows up in the store, so a client
+    catching up gets each row once, in its current state. ``floor`` is the
+    oldest version the log can bring a client forward from: every change after
+    it is still here. Versions are the store's ``seq``, identical across
+    workers, so a client may move between workers.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: Deque[Change] = deque()
+        self.floor: Optional[int] = None
+        self.last = 0
+
+    def append(self, seq: int, entity: str, row_id: int):
+        if self.floor is None or self.max_entries <= 0 or seq < self.last:
+            return
+        change = (seq, entity, row_id)
+        if seq == self.last:
+            # One record can touch several rows; skip it when it is replayed
+            for entry in reversed(self.entries):
+                if entry[0] != seq:
+                    break
+                if entry == change:
+                    return
+        while len(self.entries) >= self.max_entries:
+            self.floor = self.entries.popleft()[0]
+        self.entries.append(change)
+        self.last = seq
+
+    def rebase(self, seq: int):
+        """The store was reloaded wholesale at version seq.
+
+        Changes after seq are dropped; the records the storage replays next add
+        back the ones that were persisted. When seq is past the log, the load
+        folded in changes the log never saw and the log starts over from seq.
+        """
+        if self.floor is None or seq > self.last or seq < self.floor:
+            self.entries.clear()
+            self.floor = seq
+        else:
+            while self.entries and self.entries[-1][0] > seq:
+                self.entries.pop()
+        self.last = seq
+
+    def since(self, version: int) -> Optional[List[Change]]:
+        """Changes after version, oldest first, or None when the log cannot tell (it rolled over)"""
+        if self.max_entries <= 0 or self.floor is None or version < self.floor or version > self.last:
+            return None
+        changes = []
+        for change in reversed(self.entries):
+            if change[0] <= version:
+                break
+            changes.append(change)
+        changes.reverse()
+        return changes
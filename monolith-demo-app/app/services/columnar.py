@@ -0,0 +1,339 @@
+from array import array
+from copy import deepcopy
+from typing import Any, Dict, Iterator, List, Optional
+
+PROJECT_FIELDS = ('id', 'name', 'company_id', 'status', 'start_date', 'end_date', 'budget', 'location',
+                  'project_type', 'square_footage', 'floors', 'architect', 'tasks')
+TASK_FIELDS = ('id', 'name', 'status', 'completion_date')
+# Few distinct values each, so they are stored once and referenced by code
+CATEGORICAL_FIELDS = ('status', 'start_date', 'end_date', 'location', 'project_type', 'architect')
+INTEGER_FIELDS = ('budget', 'square_footage', 'floors')
+# Ids far above the row count go to a dict instead of stretching the dense slot array
+DENSE_HEADROOM = 65536
+# Updates and deletes leave dead slots behind; the table is rebuilt once they outnumber live ones
+VACUUM_MIN_DEAD = 4096
+# Range of the signed 64-bit arrays ('q') integers are stored in
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+_missing = object()
+
+
+class Dictionary:
+    """Distinct values of a column, each stored once and referenced by a small integer code"""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class SlotIndex:
+    """Row id -> slot, as an array indexed by id for the usual dense ids and a dict for outliers"""
+
+    def __init__(self):
+        self.dense = array('q')
+        self.sparse: Dict[int, int] = {}
+        self.count = 0
+
+    def get(self, row_id: int) -> Optional[int]:
+        if 0 <= row_id < len(self.dense):
+            slot = self.dense[row_id]
+            return slot if slot >= 0 else None
+        return self.sparse.get(row_id)
+
+    def set(self, row_id: int, slot: int):
+        if self.get(row_id) is None:
+            self.count += 1
+        if 0 <= row_id < len(self.dense):
+            self.dense[row_id] = slot
+        elif 0 <= row_id < 2 * self.count + DENSE_HEADROOM:
+            self.dense.extend(array('q', [-1]) * (row_id + 1 - len(self.dense)))
+            self.dense[row_id] = slot
+        else:
+            self.sparse[row_id] = slot
+
+    def remove(self, row_id: int):
+        if 0 <= row_id < len(self.dense):
+            if self.dense[row_id] >= 0:
+                self.dense[row_id] = -1
+                self.count -= 1
+        elif self.sparse.pop(row_id, None) is not None:
+            self.count -= 1
+
+
+def _is_int(value: Any) -> bool:
+    return type(value) is int
+
+
+def _is_int64(value: Any) -> bool:
+    return type(value) is int and INT64_MIN <= value <= INT64_MAX
+
+
+def _fits(project: Dict[str, Any]) -> bool:
+    """Whether a row has exactly the Project fields with types the columns can hold"""
+    if len(project) != len(PROJECT_FIELDS) or any(field not in project for field in PROJECT_FIELDS):
+        return False
+    if not all(_is_int64(project[field]) for field in ('id',) + INTEGER_FIELDS):
+        return False
+    if not isinstance(project['name'], str) or not all(isinstance(project[field], str) for field in CATEGORICAL_FIELDS):
+        return False
+    if not isinstance(project['company_id'], list) or not all(_is_int64(company_id) for company_id in project['company_id']):
+        return False
+    if not isinstance(project['tasks'], list):
+        return False
+    for task in project['tasks']:
+        if not isinstance(task, dict) or len(task) != len(TASK_FIELDS) or any(field not in task for field in TASK_FIELDS):
+            return False
+        if not _is_int64(task['id']) or not isinstance(task['name'], str) or not isinstance(task['status'], str):
+            return False
+        if task['completion_date'] is not None and not isinstance(task['completion_date'], str):
+            return False
+    return True
+
+
+class ProjectTable:
+    """Projects stored column by column, readable like the dict of project rows it replaces.
+
+    Integers sit in typed arrays, categorical strings (status, dates, location,
+    type, architect) are dictionary-encoded, names are one UTF-8 buffer with
+    offsets, and company ids and tasks are flat arrays with per-project
+    offsets. A project costs a few hundred bytes instead of several KB of
+    dicts, strings and ints, and reading rows never touches refcounts of
+    shared objects, which keeps forked workers' pages shared.
+
+    Rows are appended to slots; an update appends a new slot and retires the
+    old one, and the table compacts itself once most slots are dead. Reads
+    return new dicts (``get``) or lazy views (``view``), so callers can never
+    change stored rows in place. A row that does not fit the columns (extra or
+    missing fields, other types) is kept as a plain dict in its slot.
+    """
+
+    def __init__(self):
+        self._slots = SlotIndex()
+        self._ids = array('q')
+        self._alive = bytearray()
+        self._dead = 0
+        self._ints = {field: array('q') for field in INTEGER_FIELDS}
+        self._codes = {field: array('I') for field in CATEGORICAL_FIELDS}
+        self._dictionaries = {field: Dictionary() for field in CATEGORICAL_FIELDS}
+        self._names = bytearray()
+        self._name_offsets = array('q', [0])
+        self._company_ids = array('q')
+        self._company_offsets = array('q', [0])
+        self._task_offsets = array('q', [0])
+        self._task_ids = array('q')
+        self._task_names = array('I')
+        self._task_statuses = array('I')
+        self._task_dates = array('I')
+        self._task_dictionaries = {field: Dictionary() for field in ('name', 'status', 'completion_date')}
+        self._overflow: Dict[int, Dict[str, Any]] = {}
+
+    # Mapping interface
+    def __len__(self) -> int:
+        return self._slots.count
+
+    def __contains__(self, row_id: Any) -> bool:
+        return _is_int(row_id) and self._slots.get(row_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        for slot, alive in enumerate(self._alive):
+            if alive:
+                overflow = self._overflow.get(slot)
+                yield overflow['id'] if overflow is not None else self._ids[slot]
+
+    def __getitem__(self, row_id: int) -> Dict[str, Any]:
+        slot = self._slots.get(row_id)
+        if slot is None:
+            raise KeyError(row_id)
+        return self._row(slot)
+
+    def __setitem__(self, row_id: int, project: Dict[str, Any]):
+        slot = self._slots.get(row_id)
+        if slot is not None:
+            self._retire(slot)
+        self._slots.set(row_id, self._append(project))
+        if self._dead >= VACUUM_MIN_DEAD and self._dead > len(self._alive) // 2:
+            self._vacuum()
+
+    def get(self, row_id: int, default: Any = None) -> Any:
+        slot = self._slots.get(row_id)
+        return self._row(slot) if slot is not None else default
+
+    def pop(self, row_id: int, default: Any = _missing) -> Any:
+        slot = self._slots.get(row_id)
+        if slot is None:
+            if default is _missing:
+                raise KeyError(row_id)
+            return default
+        row = self._row(slot)
+        self._retire(slot)
+        self._slots.remove(row_id)
+        return row
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        for slot, alive in enumerate(self._alive):
+            if alive:
+                yield self._row(slot)
+
+    def interned(self, project: Dict[str, Any]) -> Dict[str, Any]:
+        """A stored row with its categorical strings swapped for the dictionaries' shared copies"""
+        slot = self._slots.get(project['id'])
+        if slot is None or slot in self._overflow:
+            return project
+        return {**project, **{field: dictionary.values[self._codes[field][slot]]
+                              for field, dictionary in self._dictionaries.items()}}
+
+    def view(self, row_id: int) -> Optional['ProjectView']:
+        """Lazy read-only row that decodes only the fields asked for"""
+        slot = self._slots.get(row_id)
+        return ProjectView(self, slot) if slot is not None else None
+
+    # Storage
+    def _append(self, project: Dict[str, Any]) -> int:
+        """Store project in a new slot; every value is checked first, so a failure leaves the columns aligned"""
+        name = None
+        if _fits(project):
+            try:
+                name = project['name'].encode()
+            except UnicodeEncodeError:
+                pass
+        slot = len(self._ids)
+        if name is None:
+            # Overflow rows are read from their dict; the id column only keeps the slots aligned
+            self._ids.append(project['id'] if _is_int64(project['id']) else -1)
+            self._alive.append(1)
+            # Deep copies in and out, like columnar rows: nested lists must not be shared with callers
+            self._overflow[slot] = deepcopy(project)
+            for column in self._ints.values():
+                column.append(0)
+            for column in self._codes.values():
+                column.append(0)
+            self._name_offsets.append(len(self._names))
+            self._company_offsets.append(len(self._company_ids))
+            self._task_offsets.append(len(self._task_ids))
+            return slot
+        self._ids.append(project['id'])
+        self._alive.append(1)
+        for field, column in self._ints.items():
+            column.append(project[field])
+        for field, column in self._codes.items():
+            column.append(self._dictionaries[field].encode(project[field]))
+        self._names += name
+        self._name_offsets.append(len(self._names))
+        self._company_ids.extend(project['company_id'])
+        self._company_offsets.append(len(self._company_ids))
+        names, statuses, dates = (self._task_dictionaries[field] for field in ('name', 'status', 'completion_date'))
+        for task in project['tasks']:
+            self._task_ids.append(task['id'])
+            self._task_names.append(names.encode(task['name']))
+            self._task_statuses.append(statuses.encode(task['status']))
+            self._task_dates.append(dates.encode(task['completion_date']))
+        self._task_offsets.append(len(self._task_ids))
+        return slot
+
+    def _retire(self, slot: int):
+        self._alive[slot] = 0
+        self._overflow.pop(slot, None)
+        self._dead += 1
+
+    def _vacuum(self):
+        """Rebuild the columns from the live rows, in slot order"""
+        fresh = ProjectTable()
+        for row in self.values():
+            fresh[row['id']] = row
+        self.__dict__.update(fresh.__dict__)
+
+    # Decoding
+    def _value(self, slot: int, field: str, default: Any = None) -> Any:
+        overflow = self._overflow.get(slot)
+        if overflow is not None:
+            value = overflow.get(field, _missing)
+            return deepcopy(value) if value is not _missing else default
+        if field in self._codes:
+            return self._dictionaries[field].values[self._codes[field][slot]]
+        if field in self._ints:
+            return self._ints[field][slot]
+        if field == 'id':
+            return self._ids[slot]
+        if field == 'name':
+            return self._names[self._name_offsets[slot]:self._name_offsets[slot + 1]].decode()
+        if field == 'company_id':
+            return self._company_ids[self._company_offsets[slot]:self._company_offsets[slot + 1]].tolist()
+        if field == 'tasks':
+            return self._tasks(slot)
+        return default
+
+    def _tasks(self, slot: int) -> List[Dict[str, Any]]:
+        start, end = self._task_offsets[slot], self._task_offsets[slot + 1]
+        if start == end:
+            return []
+        dictionaries = self._task_dictionaries
+        names, statuses, dates = dictionaries['name'].values, dictionaries['status'].values, dictionaries['completion_date'].values
+        return [
+            {'id': task_id, 'name': names[name], 'status': statuses[status], 'completion_date': dates[date]}
+            for task_id, name, status, date in zip(self._task_ids[start:end], self._task_names[start:end],
+                                                   self._task_statuses[start:end], self._task_dates[start:end])
+        ]
+
+    def _row(self, slot: int) -> Dict[str, Any]:
+        overflow = self._overflow.get(slot)
+        if overflow is not None:
+            return deepcopy(overflow)
+        codes, dictionaries, ints = self._codes, self._dictionaries, self._ints
+        name_offsets, company_offsets = self._name_offsets, self._company_offsets
+        # Spelled out field by field: this runs for every row a read returns
+        return {
+            'id': self._ids[slot],
+            'name': self._names[name_offsets[slot]:name_offsets[slot + 1]].decode(),
+            'company_id': self._company_ids[company_offsets[slot]:company_offsets[slot + 1]].tolist(),
+            'status': dictionaries['status'].values[codes['status'][slot]],
+            'start_date': dictionaries['start_date'].values[codes['start_date'][slot]],
+            'end_date': dictionaries['end_date'].values[codes['end_date'][slot]],
+            'budget': ints['budget'][slot],
+            'location': dictionaries['location'].values[codes['location'][slot]],
+            'project_type': dictionaries['project_type'].values[codes['project_type'][slot]],
+            'square_footage': ints['square_footage'][slot],
+            'floors': ints['floors'][slot],
+            'architect': dictionaries['architect'].values[codes['architect'][slot]],
+            'tasks': self._tasks(slot),
+        }
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns and dictionaries, leaving out overflow rows"""
+        arrays = [self._slots.dense, self._ids, self._name_offsets, self._company_ids, self._company_offsets,
+                  self._task_offsets, self._task_ids, self._task_names, self._task_statuses, self._task_dates,
+                  *self._ints.values(), *self._codes.values()]
+        total = sum(column.itemsize * len(column) for column in arrays) + len(self._names) + len(self._alive)
+        for dictionary in (*self._dictionaries.values(), *self._task_dictionaries.values()):
+            total += sum(len(value) for value in dictionary.values if value is not None)
+        return total
+
+
+class ProjectView:
+    """Read-only access to one stored project, decoding fields on demand"""
+
+    __slots__ = ('_table', '_slot')
+
+    def __init__(self, table: ProjectTable, slot: int):
+        self._table = table
+        self._slot = slot
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return self._table._value(self._slot, field, default)
+
+    def __getitem__(self, field: str) -> Any:
+        value = self._table._value(self._slot, field, _missing)
+        if value is _missing:
+            raise KeyError(field)
+        return value
+
+    def materialize(self) -> Dict[str, Any]:
+        return self._table._row(self._slot)
@@ -1,211 +1,505 @@
-import json
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
 
-from app.models.company import Company
-from app.models.project import Project
+from pydantic import BaseModel
+
+from app.models.company import Company, CompanyStats
+from app.models.project import Project, ProjectQuery
+from app.services.journal import JournalStorage
+from app.services.sqlite_storage import SQLiteStorage
+from app.services.storage import Record, StorageError
+from app.services.store import MemoryStore
+from app.utils.metrics import STORAGE_LOAD, STORAGE_SAVE, WRITE_BATCH_SIZE
+from app.utils.timing import measured, record_phase
+
+# Relations ?expand= can join into companies, as dotted paths from the company
+EXPANSIONS = ['projects', 'projects.tasks']
+# Columns of an expanded project unless its tasks are expanded too
+EXPANDED_PROJECT_FIELDS = [field for field in Project.model_fields if field != 'tasks']
+
+
+def create_storage(data_dir: str, backend: str):
+    """Storage backend by name: `journal` (JSON snapshots + journal) or `sqlite`"""
+    fsync = os.getenv('JOURNAL_FSYNC', 'true').lower() == 'true'
+    if backend == 'sqlite':
+        db_file = os.getenv('SQLITE_PATH', os.path.join(data_dir, 'construction.db'))
+        return SQLiteStorage(db_file, seed_dir=data_dir, fsync=fsync)
+    if backend == 'journal':
+        compact_bytes = int(os.getenv('JOURNAL_COMPACT_BYTES', 1024 * 1024))
+        return JournalStorage(data_dir, compact_bytes=compact_bytes, fsync=fsync)
+    raise ValueError(f"Unknown DATA_BACKEND: {backend}")
+
+
+def build_models(model: Type[BaseModel], rows: List[Optional[Dict[str, Any]]]) -> List[Optional[BaseModel]]:
+    """model instances of rows, None where a row is None; timed as the request's `model` phase"""
+    start = time.perf_counter()
+    models = [model(**row) if row else None for row in rows]
+    record_phase('model', time.perf_counter() - start)
+    return models
+
+
+def check_expansion(expanded: int, max_expanded: Optional[int]):
+    if max_expanded is not None and expanded > max_expanded:
+        raise ValueError(f"Expansion exceeds {max_expanded} rows; request fewer companies with limit")
+
+
+class PendingWrite:
+    """The mutations of one caller and, once their batch is persisted, their outcomes"""
+
+    def __init__(self, builds: List[Callable[[MemoryStore], Optional[List[Record]]]]):
+        self.builds = builds
+        self.done = False
+        self.ok = [False] * len(builds)
+        self.error: Optional[BaseException] = None
 
 
 class DataService:
-    def __init__(self):
-        self.data_dir = os.path.join(
+    def __init__(self, data_dir: Optional[str] = None, backend: Optional[str] = None):
+        self.data_dir = data_dir or os.getenv('DATA_DIR') or os.path.join(
             os.path.dirname(__file__), '..', 'models', 'data'
         )
         self.companies_file = os.path.join(self.data_dir, 'companies.json')
         self.projects_file = os.path.join(self.data_dir, 'projects.json')
-    
-    def _load_json(self, file_path: str) -> Dict[str, Any]:
-        """Load JSON data from file"""
+        self.backend = backend or os.getenv('DATA_BACKEND', 'journal')
+        self._store = MemoryStore(
+            # Rows touched by the most recent mutations, for clients catching up through the change feed
+            change_log_size=int(os.getenv('CHANGE_LOG_SIZE', 10000)),
+        )
+        self._storage = create_storage(self.data_dir, self.backend)
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[int], None]] = []
+        # Group commit: concurrent writes queue up and one of them persists the whole batch
+        self.batch_max = int(os.getenv('WRITE_BATCH_MAX', 64))
+        self.batch_window = float(os.getenv('WRITE_BATCH_WINDOW_MS', 0)) / 1000
+        self._queue: List[PendingWrite] = []
+        self._queue_changed = threading.Condition()
+        self._flushing = False
+
+    def _sync(self) -> MemoryStore:
+        """Bring the in-memory store up to date with the storage backend"""
+        with self._lock:
+            start = time.perf_counter()
+            if self._storage.sync(self._store):
+                elapsed = time.perf_counter() - start
+                STORAGE_LOAD.labels(self.backend).observe(elapsed)
+                record_phase('load', elapsed)
+                self._notify()
+            return self._store
+
+    def _notify(self):
+        for listener in self._listeners:
+            listener(self._store.seq)
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """Call listener(version) after every change, local or from another worker"""
+        self._listeners.append(listener)
+
+    def get_version(self) -> int:
+        """Data version: the seq of the last applied mutation, identical across workers"""
+        return self._sync().seq
+
+    def get_changes(self, since: int) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+        """The current version and every row changed after version since, in its current state.
+
+        A row changed several times appears once, at the version of its last
+        change, with `op` `put` and its data, or `delete`. The changes are None
+        when the change log no longer reaches back to since (or since is not a
+        version this service has seen); the client then has to refetch everything.
+        """
+        with self._lock:
+            store = self._sync()
+            entries = store.changes.since(since)
+            if entries is None:
+                return store.seq, None
+            latest: Dict[Tuple[str, int], int] = {}
+            for seq, entity, row_id in entries:
+                latest.pop((entity, row_id), None)
+                latest[(entity, row_id)] = seq
+            changes = []
+            for (entity, row_id), seq in latest.items():
+                row = store.get_company(row_id) if entity == 'companies' else store.get_project(row_id)
+                changes.append({
+                    'seq': seq, 'entity': entity, 'op': 'put' if row is not None else 'delete',
+                    'id': row_id, 'data': row,
+                })
+            return store.seq, changes
+
+    def _write(self, build: Callable[[MemoryStore], Optional[List[Record]]]) -> bool:
+        """Run build under the cross-worker write lock and persist the records it returns.
+
+        build sees the store caught up with every worker's writes and with the
+        writes batched before it, so ids it takes from ``store.next_id`` are
+        unique. Returning None aborts the write.
+
+        Writes are group committed: a writer that finds no batch being persisted
+        leads one, waits up to ``batch_window`` for more writers, then runs the
+        builds of every queued writer (up to ``batch_max`` writers) in one
+        storage transaction, i.e. one
+        journal append and fsync or one SQLite COMMIT. Writers that arrive in the
+        meantime wait for the leader to acknowledge them, or for the next batch.
+        """
+        return self._write_all([build])[0]
+
+    def _write_all(self, builds: List[Callable[[MemoryStore], Optional[List[Record]]]]) -> List[bool]:
+        """Like ``_write`` for several builds, which always land in the same transaction.
+
+        Each build sees the records of the ones before it; the result says which
+        of them were persisted. Every build runs even if an earlier one raised.
+        """
+        if not builds:
+            return []
+        start = time.perf_counter()
+        write = PendingWrite(builds)
+        with self._queue_changed:
+            self._queue.append(write)
+            self._queue_changed.notify_all()
+        while True:
+            with self._queue_changed:
+                while self._flushing and not write.done:
+                    self._queue_changed.wait()
+                if write.done:
+                    break
+                self._flushing = True
+            try:
+                self._lead_batch()
+            finally:
+                with self._queue_changed:
+                    self._flushing = False
+                    self._queue_changed.notify_all()
+        # Includes waiting for the batch in progress, the latency group commit trades for throughput
+        record_phase('write', time.perf_counter() - start)
+        if write.error is not None:
+            raise write.error
+        return write.ok
+
+    def _lead_batch(self):
+        with self._queue_changed:
+            if self.batch_window > 0:
+                deadline = time.monotonic() + self.batch_window
+                while len(self._queue) < self.batch_max:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._queue_changed.wait(remaining)
+            batch, self._queue = self._queue[:self.batch_max], self._queue[self.batch_max:]
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-        except json.JSONDecodeError:
-            return {}
-    
-    def _save_json(self, file_path: str, data: Dict[str, Any]) -> bool:
-        """Save JSON data to file"""
+            self._commit_batch(batch)
+        finally:
+            for write in batch:
+                write.done = True
+
+    def _commit_batch(self, batch: List[PendingWrite]):
+        """Run every build of the batch and persist their records in one transaction.
+
+        The storage takes its cross-process write lock before the store lock,
+        so readers are not held up while this waits for other workers' writes.
+        """
+        start = time.perf_counter()
         try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            return True
-        except Exception:
-            return False
-    
+            with self._storage.transaction(self._store, self._lock) as store:
+                for write in batch:
+                    for index, build in enumerate(write.builds):
+                        try:
+                            records = build(store)
+                        except Exception as e:
+                            write.error = write.error or e
+                            continue
+                        if records is not None:
+                            self._storage.commit(store, records)
+                            write.ok[index] = True
+        except StorageError:
+            for write in batch:
+                write.ok = [False] * len(write.builds)
+            return
+        STORAGE_SAVE.labels(self.backend).observe(time.perf_counter() - start)
+        WRITE_BATCH_SIZE.labels(self.backend).observe(len(batch))
+        if any(any(write.ok) for write in batch):
+            with self._lock:
+                self._notify()
+
+    def _creator(self, entity: str, row: Dict[str, Any]) -> Callable[[MemoryStore], List[Record]]:
+        """Build that stores row under a newly allocated id, which it writes into row"""
+        def build(store: MemoryStore) -> List[Record]:
+            # Generate new ID
+            row['id'] = store.next_id(entity)
+            if entity == 'companies':
+                row['project_count'] = 0
+            return [self._put(entity, row)]
+        return build
+
+    def _updater(self, entity: str, row_id: int, update_data: Dict[str, Any],
+                 updated: Dict[str, Any]) -> Callable[[MemoryStore], Optional[List[Record]]]:
+        """Build that merges update_data into the stored row, leaving the result in updated"""
+        def build(store: MemoryStore) -> Optional[List[Record]]:
+            row = store.get_company(row_id) if entity == 'companies' else store.get_project(row_id)
+            if row is None:
+                return None
+            # Update only provided fields
+            updated.update(row, **{k: v for k, v in update_data.items() if v is not None})
+            return [self._put(entity, updated)]
+        return build
+
+    def _deleter(self, entity: str, row_id: int) -> Callable[[MemoryStore], Optional[List[Record]]]:
+        def build(store: MemoryStore) -> Optional[List[Record]]:
+            row = store.get_company(row_id) if entity == 'companies' else store.get_project(row_id)
+            if row is None:
+                return None
+            return [self._delete(entity, row_id)]
+        return build
+
+    def _put(self, entity: str, row: Dict[str, Any]) -> Record:
+        return {'op': 'put', 'entity': entity, 'id': row['id'], 'data': row}
+
+    def _delete(self, entity: str, row_id: int) -> Record:
+        return {'op': 'delete', 'entity': entity, 'id': row_id, 'data': None}
+
+    def close(self):
+        """Wait for background work and release the storage backend"""
+        self._storage.close()
+
+    def preload(self):
+        """Load the store now instead of on the first request, leaving no storage thread or connection behind.
+
+        Used by the prefork server, whose workers then share the loaded rows copy-on-write.
+        """
+        self._sync()
+        self._storage.close()
+
+    # Paginated access to raw rows, without building models
+    def list_page(self, entity: str, after_id: Optional[int] = None, limit: Optional[int] = None,
+                  fields: Optional[List[str]] = None, company_id: Optional[int] = None,
+                  query: Optional[ProjectQuery] = None, after_value: Any = None,
+                  expand: Optional[List[str]] = None, max_expanded: Optional[int] = None,
+                  ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """A page of rows projected to fields, plus the cursor of the next page if there is one.
+
+        Without a query rows come in primary key order after after_id. A
+        ProjectQuery filters and sorts projects through the secondary indexes;
+        its cursor is (after_value, after_id), and after_value may be left out
+        while the after_id row still exists. Companies get the EXPANSIONS in
+        expand joined in from the same store read (see _expand). Building the
+        rows is timed as the request's `model` phase.
+        """
+        return measured('model', self._page, entity, after_id, limit, fields, company_id, query, after_value,
+                        expand, max_expanded)
+
+    def _page(self, entity: str, after_id: Optional[int], limit: Optional[int], fields: Optional[List[str]],
+              company_id: Optional[int], query: Optional[ProjectQuery], after_value: Any,
+              expand: Optional[List[str]], max_expanded: Optional[int],
+              ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        fetch = limit + 1 if limit is not None else None
+        with self._lock:
+            store = self._sync()
+            if query is not None:
+                after = self._query_cursor(store, query, after_id, after_value)
+                rows = store.query_projects(query, after=after, limit=fetch)
+            else:
+                rows = store.scan(entity, after_id=after_id, limit=fetch, company_id=company_id, fields=fields)
+                fields = None
+            if expand and entity == 'companies':
+                self._expand(store, rows[:limit], expand, max_expanded)
+        cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            sort_field = query.sort.lstrip('-') if query is not None else 'id'
+            cursor = {'after_id': rows[-1]['id']}
+            if sort_field != 'id':
+                cursor['after_value'] = rows[-1][sort_field]
+        if fields is not None:
+            rows = [{field: row[field] for field in fields} for row in rows]
+        return rows, cursor
+
+    def _expand(self, store: MemoryStore, companies: List[Dict[str, Any]], expand: List[str],
+                max_expanded: Optional[int]):
+        """Add each company's projects, with their tasks for `projects.tasks`, to the company rows.
+
+        Raises ValueError before building anything when the projects alone
+        would exceed max_expanded joined rows, and as soon as their tasks do.
+        """
+        with_tasks = 'projects.tasks' in expand
+        expanded = sum(len(store.company_projects.get(company['id'], ())) for company in companies)
+        check_expansion(expanded, max_expanded)
+        for company in companies:
+            projects = store.scan('projects', company_id=company['id'],
+                                  fields=None if with_tasks else EXPANDED_PROJECT_FIELDS)
+            if with_tasks:
+                expanded += sum(len(project['tasks']) for project in projects)
+                check_expansion(expanded, max_expanded)
+            company['projects'] = projects
+
+    def _query_cursor(self, store: MemoryStore, query: ProjectQuery, after_id: Optional[int],
+                      after_value: Any) -> Optional[Tuple[Any, int]]:
+        if after_id is None:
+            return None
+        sort_field = query.sort.lstrip('-')
+        if sort_field == 'id':
+            return after_id, after_id
+        if after_value is not None:
+            return (int(after_value) if sort_field == 'budget' else after_value), after_id
+        project = store.get_project(after_id)
+        if project is None:
+            raise ValueError(f"Project {after_id} no longer exists; pass after_value to resume after it")
+        return store.project_sort_key(project, sort_field)
+
+    def list_rows(self, entity: str, after_id: Optional[int] = None, limit: Optional[int] = None,
+                  fields: Optional[List[str]] = None, company_id: Optional[int] = None,
+                  query: Optional[ProjectQuery] = None) -> List[Dict[str, Any]]:
+        """Rows after after_id, projected to fields when given"""
+        return self.list_page(entity, after_id=after_id, limit=limit, fields=fields,
+                              company_id=company_id, query=query)[0]
+
+    def iter_rows(self, entity: str, after_id: Optional[int] = None, fields: Optional[List[str]] = None,
+                  company_id: Optional[int] = None, query: Optional[ProjectQuery] = None,
+                  after_value: Any = None, expand: Optional[List[str]] = None,
+                  max_expanded: Optional[int] = None, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """Every row after the cursor in batches, each fetched by keyset so memory stays flat.
+
+        max_expanded caps the rows expand joins into each batch.
+        """
+        cursor = {'after_id': after_id, 'after_value': after_value}
+        while True:
+            rows, next_cursor = self.list_page(entity, limit=batch_size, fields=fields, company_id=company_id,
+                                               query=query, expand=expand, max_expanded=max_expanded, **cursor)
+            if rows:
+                yield rows
+            if next_cursor is None:
+                return
+            cursor = {'after_value': None, **next_cursor}
+
     # Company methods
     def get_companies(self) -> List[Company]:
         """Get all companies"""
-        data = self._load_json(self.companies_file)
-        companies = data.get('companies', [])
-        return [Company(**company) for company in companies]
+        return build_models(Company, self.list_rows('companies'))
     
     def get_company(self, company_id: int) -> Optional[Company]:
         """Get company by ID"""
-        companies = self.get_companies()
-        for company in companies:
-            if company.id == company_id:
-                return company
-        return None
+        with self._lock:
+            company = self._sync().get_company(company_id)
+        return Company(**company) if company else None
+
+    def get_company_expanded(self, company_id: int, expand: List[str],
+                             max_expanded: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Company row with the EXPANSIONS in expand joined in from one store read"""
+        with self._lock:
+            store = self._sync()
+            company = store.get_company(company_id)
+            if company is not None:
+                measured('model', self._expand, store, [company], expand, max_expanded)
+        return company
     
+    def get_company_stats(self, company_id: int) -> Optional[CompanyStats]:
+        """Get project aggregates for a company, maintained incrementally on project writes"""
+        with self._lock:
+            store = self._sync()
+            if store.get_company(company_id) is None:
+                return None
+            return CompanyStats(**store.get_company_stats(company_id))
+
+    def get_companies_stats(self) -> List[CompanyStats]:
+        """Get project aggregates for every company"""
+        with self._lock:
+            store = self._sync()
+            return [CompanyStats(**store.get_company_stats(company_id)) for company_id in store.sorted_ids['companies']]
+
     def get_company_projects(self, company_id: int) -> List[Project]:
         """Get all projects for a company"""
-        data = self._load_json(self.projects_file)
-        projects = data.get('projects', [])
-        company_projects = [p for p in projects if company_id in p.get('company_id', [])]
-        return [Project(**project) for project in company_projects]
+        return build_models(Project, self.list_rows('projects', company_id=company_id))
     
+    def get_companies_by_id(self, company_ids: List[int]) -> List[Optional[Company]]:
+        """Get companies by ID in one store read; None where a company does not exist"""
+        with self._lock:
+            store = self._sync()
+            rows = [store.get_company(company_id) for company_id in company_ids]
+        return build_models(Company, rows)
+
     def create_company(self, company_data: Dict[str, Any]) -> Optional[Company]:
         """Create a new company"""
-        data = self._load_json(self.companies_file)
-        companies = data.get('companies', [])
-        
-        # Generate new ID
-        max_id = max([c.get('id', 0) for c in companies], default=0)
-        company_data['id'] = max_id + 1
-        company_data['project_count'] = 0
-        
-        companies.append(company_data)
-        data['companies'] = companies
-        
-        if self._save_json(self.companies_file, data):
+        if self._write(self._creator('companies', company_data)):
             return Company(**company_data)
         return None
+
+    def create_companies(self, companies: List[Dict[str, Any]]) -> List[Optional[Company]]:
+        """Create many companies in one storage transaction; None where one was not stored"""
+        stored = self._write_all([self._creator('companies', company) for company in companies])
+        return [Company(**company) if ok else None for company, ok in zip(companies, stored)]
     
     def update_company(self, company_id: int, update_data: Dict[str, Any]) -> Optional[Company]:
         """Update a company"""
-        data = self._load_json(self.companies_file)
-        companies = data.get('companies', [])
-        
-        for i, company in enumerate(companies):
-            if company.get('id') == company_id:
-                # Update only provided fields
-                for key, value in update_data.items():
-                    if value is not None:
-                        company[key] = value
-                
-                companies[i] = company
-                data['companies'] = companies
-                
-                if self._save_json(self.companies_file, data):
-                    return Company(**company)
-                break
+        if self._write(self._updater('companies', company_id, update_data, {})):
+            # project_count comes from the aggregates, not from the row that was written
+            return self.get_company(company_id)
         return None
+
+    def update_companies(self, updates: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Company]]:
+        """Apply many (company_id, update_data) in one storage transaction; None where a company does not exist"""
+        stored = self._write_all([
+            self._updater('companies', company_id, update_data, {}) for company_id, update_data in updates
+        ])
+        companies = iter(self.get_companies_by_id([company_id for (company_id, _), ok in zip(updates, stored) if ok]))
+        return [next(companies) if ok else None for ok in stored]
     
     def delete_company(self, company_id: int) -> bool:
         """Delete a company"""
-        data = self._load_json(self.companies_file)
-        companies = data.get('companies', [])
-        
-        original_count = len(companies)
-        companies = [c for c in companies if c.get('id') != company_id]
-        
-        if len(companies) < original_count:
-            data['companies'] = companies
-            return self._save_json(self.companies_file, data)
-        return False
+        return self._write(self._deleter('companies', company_id))
+
+    def delete_companies(self, company_ids: List[int]) -> List[bool]:
+        """Delete many companies in one storage transaction; False where a company does not exist"""
+        return self._write_all([self._deleter('companies', company_id) for company_id in company_ids])
     
     # Project methods
     def get_projects(self, company_id: Optional[int] = None) -> List[Project]:
         """Get all projects, optionally filtered by company_id"""
-        data = self._load_json(self.projects_file)
-        projects = data.get('projects', [])
-        
-        if company_id is not None:
-            projects = [p for p in projects if company_id in p.get('company_id', [])]
-        
-        return [Project(**project) for project in projects]
+        return build_models(Project, self.list_rows('projects', company_id=company_id))
     
     def get_project(self, project_id: int) -> Optional[Project]:
         """Get project by ID"""
-        data = self._load_json(self.projects_file)
-        projects = data.get('projects', [])
-        
-        for project in projects:
-            if project.get('id') == project_id:
-                return Project(**project)
-        return None
+        with self._lock:
+            project = self._sync().get_project(project_id)
+        return Project(**project) if project else None
+
+    def get_projects_by_id(self, project_ids: List[int]) -> List[Optional[Project]]:
+        """Get projects by ID in one store read; None where a project does not exist"""
+        with self._lock:
+            store = self._sync()
+            rows = [store.get_project(project_id) for project_id in project_ids]
+        return build_models(Project, rows)
     
     def create_project(self, project_data: Dict[str, Any]) -> Optional[Project]:
         """Create a new project"""
-        data = self._load_json(self.projects_file)
-        projects = data.get('projects', [])
-        
-        # Generate new ID
-        max_id = max([p.get('id', 0) for p in projects], default=0)
-        project_data['id'] = max_id + 1
-        
-        projects.append(project_data)
-        data['projects'] = projects
-        
-        if self._save_json(self.projects_file, data):
-            # Update company project count
-            company_ids = project_data.get('company_id', [])
-            for company_id in company_ids:
-                self._update_company_project_count(company_id)
+        if self._write(self._creator('projects', project_data)):
             return Project(**project_data)
         return None
+
+    def create_projects(self, projects: List[Dict[str, Any]]) -> List[Optional[Project]]:
+        """Create many projects in one storage transaction; None where one was not stored"""
+        stored = self._write_all([self._creator('projects', project) for project in projects])
+        return [Project(**project) if ok else None for project, ok in zip(projects, stored)]
     
     def update_project(self, project_id: int, update_data: Dict[str, Any]) -> Optional[Project]:
         """Update a project"""
-        data = self._load_json(self.projects_file)
-        projects = data.get('projects', [])
-        
-        for i, project in enumerate(projects):
-            if project.get('id') == project_id:
-                # Update only provided fields
-                for key, value in update_data.items():
-                    if value is not None:
-                        project[key] = value
-                
-                projects[i] = project
-                data['projects'] = projects
-                
-                if self._save_json(self.projects_file, data):
-                    return Project(**project)
-                break
+        updated = {}
+        if self._write(self._updater('projects', project_id, update_data, updated)):
+            return Project(**updated)
         return None
+
+    def update_projects(self, updates: List[Tuple[int, Dict[str, Any]]]) -> List[Optional[Project]]:
+        """Apply many (project_id, update_data) in one storage transaction; None where a project does not exist"""
+        results = [{} for _ in updates]
+        stored = self._write_all([
+            self._updater('projects', project_id, update_data, updated)
+            for (project_id, update_data), updated in zip(updates, results)
+        ])
+        return [Project(**updated) if ok else None for updated, ok in zip(results, stored)]
     
     def delete_project(self, project_id: int) -> bool:
         """Delete a project"""
-        data = self._load_json(self.projects_file)
-        projects = data.get('projects', [])
-        
-        # Find project to get company_id
-        project_to_delete = None
-        for project in projects:
-            if project.get('id') == project_id:
-                project_to_delete = project
-                break
-        
-        if project_to_delete:
-            original_count = len(projects)
-            projects = [p for p in projects if p.get('id') != project_id]
-            
-            if len(projects) < original_count:
-                data['projects'] = projects
-                if self._save_json(self.projects_file, data):
-                    # Update company project count
-                    company_id = project_to_delete.get('company_id')
-                    if company_id:
-                        self._update_company_project_count(company_id)
-                    return True
-        return False
-    
-    def _update_company_project_count(self, company_id: int):
-        """Update the project count for a company"""
-        data = self._load_json(self.companies_file)
-        companies = data.get('companies', [])
-        
-        for company in companies:
-            if company.get('id') == company_id:
-                # Count projects for this company
-                project_count = len(self.get_company_projects(company_id))
-                company['project_count'] = project_count
-                break
-        
-        data['companies'] = companies
-        self._save_json(self.companies_file, data)
+        return self._write(self._deleter('projects', project_id))
+
+    def delete_projects(self, project_ids: List[int]) -> List[bool]:
+        """Delete many projects in one storage transaction; False where a project does not exist"""
+        return self._write_all([self._deleter('projects', project_id) for project_id in project_ids])
 
 
 # Global data service instance
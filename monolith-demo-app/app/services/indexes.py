@@ -0,0 +1,145 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+HASH_FIELDS = ('status', 'project_type', 'location')
+SORTED_FIELDS = ('budget', 'start_date', 'end_date')
+
+
+class HashIndex:
+    """Exact-match index: field value -> ids"""
+
+    def __init__(self):
+        self.entries: Dict[Any, Set[int]] = {}
+
+    def add(self, value: Any, row_id: int):
+        self.entries.setdefault(value, set()).add(row_id)
+
+    def remove(self, value: Any, row_id: int):
+        row_ids = self.entries.get(value)
+        if row_ids is not None:
+            row_ids.discard(row_id)
+            if not row_ids:
+                del self.entries[value]
+
+    def lookup(self, values: Iterable[Any]) -> Set[int]:
+        """Ids matching any of values"""
+        values = list(values)
+        if len(values) == 1:
+            return self.entries.get(values[0], set())
+        return set().union(*(self.entries.get(value, ()) for value in values))
+
+
+class SortedIndex:
+    """Range index: (value, id) pairs kept in sorted order.
+
+    Held as a list of values and a parallel array of ids rather than a list of
+    tuples, which saves a tuple object per row.
+    """
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.ids = array('q')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def bisect_left(self, key: Tuple[Any, int]) -> int:
+        """Position of the first pair >= key"""
+        value, row_id = key
+        start = bisect_left(self.values, value)
+        return bisect_left(self.ids, row_id, start, bisect_right(self.values, value, start))
+
+    def bisect_right(self, key: Tuple[Any, int]) -> int:
+        """Position after the last pair <= key"""
+        value, row_id = key
+        start = bisect_left(self.values, value)
+        return bisect_right(self.ids, row_id, start, bisect_right(self.values, value, start))
+
+    def add(self, value: Any, row_id: int):
+        index = self.bisect_right((value, row_id))
+        self.values.insert(index, value)
+        self.ids.insert(index, row_id)
+
+    def remove(self, value: Any, row_id: int):
+        index = self.bisect_left((value, row_id))
+        if index < len(self.ids) and self.ids[index] == row_id and self.values[index] == value:
+            del self.values[index]
+            del self.ids[index]
+
+    def extend(self, pairs: Iterable[Tuple[Any, int]]):
+        """Add many pairs with one sort instead of one insert each"""
+        merged = sorted(chain(zip(self.values, self.ids), pairs))
+        self.values = [value for value, _ in merged]
+        self.ids = array('q', (row_id for _, row_id in merged))
+
+    def bounds(self, low: Any = None, high: Any = None) -> Tuple[int, int]:
+        """Positions [start, end) of the pairs with low <= value <= high"""
+        start = bisect_left(self.values, low) if low is not None else 0
+        end = bisect_right(self.values, high) if high is not None else len(self.values)
+        return start, max(start, end)
+
+
+class ProjectIndexes:
+    """Secondary indexes over projects, updated on every put/remove"""
+
+    def __init__(self):
+        self.hash = {field: HashIndex() for field in HASH_FIELDS}
+        self.sorted = {field: SortedIndex() for field in SORTED_FIELDS}
+        self._pending: Optional[Dict[str, List[Tuple[Any, int]]]] = None
+
+    @contextmanager
+    def deferred(self):
+        """Collect sorted index entries of the adds inside and sort them in once at the end.
+
+        Inserting into a sorted array moves everything after the position, so
+        loading n rows one by one is quadratic; a bulk load uses this instead.
+        """
+        self._pending = {field: [] for field in self.sorted}
+        try:
+            yield
+        finally:
+            pending, self._pending = self._pending, None
+            for field, pairs in pending.items():
+                self.sorted[field].extend(pairs)
+
+    def add(self, project: Dict[str, Any]):
+        for field, index in self.hash.items():
+            index.add(project.get(field), project['id'])
+        for field, index in self.sorted.items():
+            if self._pending is not None:
+                self._pending[field].append((project.get(field), project['id']))
+            else:
+                index.add(project.get(field), project['id'])
+
+    def remove(self, project: Dict[str, Any]):
+        for field, index in self.hash.items():
+            index.remove(project.get(field), project['id'])
+        for field, index in self.sorted.items():
+            index.remove(project.get(field), project['id'])
+
+
+def range_filters(query) -> Dict[str, Tuple[Optional[Any], Optional[Any]]]:
+    """Inclusive (low, high) bounds per sorted field set on a ProjectQuery"""
+    ranges = {
+        'budget': (query.min_budget, query.max_budget),
+        'start_date': (query.start_date_from, query.start_date_to),
+        'end_date': (query.end_date_from, query.end_date_to),
+    }
+    return {field: bounds for field, bounds in ranges.items() if bounds != (None, None)}
+
+
+def matches(project: Dict[str, Any], query, ranges: Dict[str, Tuple[Any, Any]]) -> bool:
+    if query.company_id is not None and query.company_id not in project.get('company_id', []):
+        return False
+    for field in HASH_FIELDS:
+        values = getattr(query, field)
+        if values is not None and project.get(field) not in values:
+            return False
+    for field, (low, high) in ranges.items():
+        value = project.get(field)
+        if (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
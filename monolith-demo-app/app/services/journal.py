@@ -0,0 +1,370 @@
+import fcntl
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.storage import Record, StorageError
+from app.services.store import MemoryStore
+
+Signature = Optional[Tuple[int, int, int]]
+
+WHITESPACE = re.compile(r'\s*')
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+
+class SnapshotReader:
+    """Incremental JSON reader over a snapshot file, one value at a time.
+
+    A 1M-project snapshot parsed with ``json.load`` holds every row as a dict at
+    once, and the survivors of that peak (ids, budgets) pin its memory for the
+    life of the process. Reading row by row keeps only a chunk of text around.
+    """
+
+    CHUNK = 1024 * 1024
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(self.CHUNK)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at the end of the file"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.buffer, self.pos)
+        self.pos += 1
+
+    def skip(self, char: str) -> bool:
+        """Consume char if it comes next"""
+        if self.peek() != char:
+            return False
+        self.pos += 1
+        return True
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+                continue
+            # A number cut off by the buffer end ("2." of "2.5") decodes early; read on and retry
+            if NUMBER_TAIL.match(self.buffer, end).end() == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_snapshot(file_path: str, key: str, meta: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Rows of the ``key`` list of a snapshot; its other top-level values are stored into meta"""
+    try:
+        f = open(file_path, 'r')
+    except FileNotFoundError:
+        return
+    with f:
+        reader = SnapshotReader(f)
+        reader.expect('{')
+        if reader.skip('}'):
+            return
+        while True:
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                reader.expect('[')
+                if not reader.skip(']'):
+                    while True:
+                        yield reader.value()
+                        if not reader.skip(','):
+                            break
+                    reader.expect(']')
+            else:
+                meta[name] = reader.value()
+            if not reader.skip(','):
+                break
+        reader.expect('}')
+        if reader.peek():
+            raise json.JSONDecodeError('Extra data', reader.buffer, reader.pos)
+
+
+class JournalStorage:
+    """Snapshot files plus an append-only journal of mutations.
+
+    Every mutation appends one JSON line per changed row to ``journal.jsonl``;
+    startup loads the ``companies.json``/``projects.json`` snapshots and replays
+    the journal on top. Once the journal grows past ``compact_bytes`` it is
+    renamed to ``journal.jsonl.compacting`` and folded into fresh snapshots by a
+    background thread, which swaps them in with an atomic rename. Records carry
+    whole rows, so replaying a record twice (after a crash mid-compaction) is safe.
+
+    Writers from every worker process serialize on an flock of ``journal.lock``
+    for the few microseconds it takes to catch up with the journal, allocate ids
+    and append; readers never take it. Records committed inside one transaction
+    go out in a single append and fsync when it ends.
+    """
+
+    def __init__(self, data_dir: str, compact_bytes: int = 1024 * 1024, fsync: bool = True):
+        self.companies_file = os.path.join(data_dir, 'companies.json')
+        self.projects_file = os.path.join(data_dir, 'projects.json')
+        self.journal_file = os.path.join(data_dir, 'journal.jsonl')
+        self.compacting_file = self.journal_file + '.compacting'
+        self.lock_file = os.path.join(data_dir, 'journal.lock')
+        self.compact_lock_file = os.path.join(data_dir, 'compact.lock')
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._snapshot_signature: Optional[Tuple[Signature, ...]] = None
+        self._journal_inode: Optional[int] = None
+        self._journal_offset = 0
+        self._compactor: Optional[threading.Thread] = None
+        self._staged: List[Record] = []
+
+    def _file_signature(self, file_path: str) -> Signature:
+        """File inode, mtime and size, used to detect changes made by other processes"""
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _snapshot_signatures(self) -> Tuple[Signature, ...]:
+        return tuple(
+            self._file_signature(path)
+            for path in (self.companies_file, self.projects_file, self.compacting_file)
+        )
+
+    def _load_json(self, file_path: str) -> Dict[str, Any]:
+        """Load JSON data from file"""
+        try:
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            return {}
+
+    def _read_journal(self, file_path: str, offset: int = 0) -> Tuple[List[Record], int, Optional[int]]:
+        """Read complete records from offset; a torn trailing line is left for later"""
+        try:
+            with open(file_path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return [], 0, None
+        records = []
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return records, offset + end, inode
+
+    def _load_snapshot(self, store: MemoryStore):
+        """Load snapshots and replay a journal left over from an unfinished compaction"""
+        companies: Dict[str, Any] = {}
+        projects: Dict[str, Any] = {}
+        try:
+            store.load(iter_snapshot(self.companies_file, 'companies', companies),
+                       iter_snapshot(self.projects_file, 'projects', projects))
+        except json.JSONDecodeError:
+            # A damaged snapshot loads as empty, as it always has; the other one still loads
+            companies = self._load_json(self.companies_file)
+            projects = self._load_json(self.projects_file)
+            store.load(companies.get('companies', []), projects.get('projects', []))
+        store.loaded(max(companies.get('seq', 0), projects.get('seq', 0)))
+        store.max_ids['companies'] = max(store.max_ids['companies'], companies.get('max_id', 0))
+        store.max_ids['projects'] = max(store.max_ids['projects'], projects.get('max_id', 0))
+        for record in self._read_journal(self.compacting_file)[0]:
+            store.apply(record)
+
+    def sync(self, store: MemoryStore) -> bool:
+        """Bring the store up to date with disk; returns True if anything changed"""
+        with self._lock:
+            signature = self._snapshot_signatures()
+            journal = self._file_signature(self.journal_file)
+            journal_inode = journal[0] if journal else None
+            reload = signature != self._snapshot_signature or journal_inode != self._journal_inode
+            if reload:
+                self._load_snapshot(store)
+                self._snapshot_signature = signature
+                self._journal_offset = 0
+                if signature[2] is not None:
+                    self.compact()
+            elif journal is None or journal[2] <= self._journal_offset:
+                return False
+            records, offset, inode = self._read_journal(self.journal_file, self._journal_offset)
+            for record in records:
+                store.apply(record)
+            self._journal_inode, self._journal_offset = inode, offset
+            return reload or bool(records)
+
+    @contextmanager
+    def transaction(self, store: MemoryStore, guard: ContextManager[Any] = nullcontext()) -> Iterator[MemoryStore]:
+        """Hold the cross-process write lock with the store caught up to the journal.
+
+        The flock is taken before guard (the caller's lock on the store) and
+        this storage's own lock, so waiting for another worker's write never
+        blocks the readers of this one.
+        """
+        try:
+            lock = open(self.lock_file, 'a')
+        except OSError as e:
+            raise StorageError(str(e)) from e
+        try:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            except OSError as e:
+                raise StorageError(str(e)) from e
+            with guard, self._lock:
+                try:
+                    self.sync(store)
+                    yield store
+                    self._append(self._staged)
+                except BaseException as e:
+                    if self._staged:
+                        # The store already holds records that never reached the journal; reload it from disk
+                        self._snapshot_signature = None
+                    if isinstance(e, OSError):
+                        raise StorageError(str(e)) from e
+                    raise
+                finally:
+                    self._staged = []
+        finally:
+            lock.close()
+
+    def commit(self, store: MemoryStore, records: List[Record]):
+        """Apply records to the store and stage them for the journal.
+
+        Must be called inside ``transaction`` so seq and ids stay unique across
+        workers. Later writes in the same transaction see these records; they
+        are appended to the journal when the transaction ends.
+        """
+        with self._lock:
+            # Staged first, so a record that fails to apply still makes ``transaction`` reload the store
+            self._staged.extend(records)
+            for record in records:
+                store.seq += 1
+                record['seq'] = store.seq
+                store.apply(record)
+
+    def _append(self, records: List[Record]):
+        """Append records to the journal with one write and one fsync"""
+        if not records:
+            return
+        with self._lock:
+            payload = b''.join(
+                json.dumps(record, separators=(',', ':')).encode() + b'\n' for record in records
+            )
+            fd = os.open(self.journal_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                before = os.fstat(fd)
+                # A line torn by a crash mid-append would swallow the first record; end it, it is skipped on replay
+                if before.st_size and os.pread(fd, 1, before.st_size - 1) != b'\n':
+                    payload = b'\n' + payload
+                os.write(fd, payload)
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            # Skip re-reading our own append unless someone else wrote in between
+            if before.st_ino == self._journal_inode and before.st_size == self._journal_offset:
+                self._journal_offset += len(payload)
+            elif self._journal_inode is None and before.st_size == 0:
+                self._journal_inode, self._journal_offset = before.st_ino, len(payload)
+            if self._journal_offset >= self.compact_bytes:
+                self.compact()
+
+    def compact(self):
+        """Rotate the journal and fold it into fresh snapshots in the background"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            # A leftover from a crashed compaction is folded in before rotating again
+            if not os.path.exists(self.compacting_file):
+                try:
+                    os.replace(self.journal_file, self.compacting_file)
+                except FileNotFoundError:
+                    return
+                self._snapshot_signature = self._snapshot_signatures()
+                self._journal_inode, self._journal_offset = None, 0
+            self._compactor = threading.Thread(target=self._compact, name='journal-compactor', daemon=True)
+            self._compactor.start()
+
+    def _compact(self):
+        # Only one process folds a given journal; whoever holds compact.lock owns it
+        with open(self.compact_lock_file, 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            if not os.path.exists(self.compacting_file):
+                return
+            snapshot = MemoryStore()
+            self._load_snapshot(snapshot)
+            written = []
+            for file_path, key in ((self.companies_file, 'companies'), (self.projects_file, 'projects')):
+                meta = {'seq': snapshot.seq, 'max_id': snapshot.max_ids[key]}
+                written.append((self._write_snapshot(file_path, key, meta, getattr(snapshot, key).values()), file_path))
+            # Writers sync under journal.lock, so they see either the old snapshots plus the
+            # compacting journal or the new snapshots, never one snapshot swapped without the other
+            with open(self.lock_file, 'a') as write_lock:
+                fcntl.flock(write_lock, fcntl.LOCK_EX)
+                with self._lock:
+                    for tmp_path, file_path in written:
+                        os.replace(tmp_path, file_path)
+                    os.unlink(self.compacting_file)
+                    dir_fd = os.open(os.path.dirname(self.compacting_file), os.O_RDONLY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                    self._snapshot_signature = self._snapshot_signatures()
+
+    def _write_snapshot(self, file_path: str, key: str, meta: Dict[str, Any], rows: Iterable[Dict[str, Any]]) -> str:
+        """Write a snapshot next to the target and fsync it; returns its path, for the caller to rename into place.
+
+        Rows are written one per line as they are iterated, so a large store is
+        never copied into one list or one string.
+        """
+        tmp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write('{\n')
+            for name, value in meta.items():
+                f.write(f'  {json.dumps(name)}: {json.dumps(value)},\n')
+            f.write(f'  {json.dumps(key)}: [')
+            separator = '\n    '
+            for row in rows:
+                f.write(separator + json.dumps(row, separators=(',', ':')))
+                separator = ',\n    '
+            f.write('\n  ]\n}\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    def close(self):
+        """Wait for a running compaction to finish"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.utils.compression import compress
+
+
+class CachedResponse:
+    def __init__(self, version: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.version = version
+        self.body = body
+        self.headers = headers or {}
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        # When the entry was last confirmed current against the data version
+        self.checked = time.monotonic()
+        # Compressed bodies by content coding, None where compression did not pay off
+        self.variants: Dict[str, Optional[bytes]] = {}
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[Optional[str], bytes, str]:
+        """Content coding, body and ETag to send for a negotiated encoding.
+
+        Each coding is compressed on first use and kept with the entry, so it is
+        computed once per data version. Variants get their own strong ETag.
+        """
+        if encoding is None:
+            return None, self.body, self.etag
+        if encoding not in self.variants:
+            self.variants[encoding] = compress(self.body, encoding)
+        compressed = self.variants[encoding]
+        if compressed is None:
+            return None, self.body, self.etag
+        return encoding, compressed, self._variant_etag(encoding)
+
+    def etags(self, encoding: Optional[str]) -> List[str]:
+        """ETags a client asking for encoding may hold, known without compressing.
+
+        Until the variant is compressed it is unknown whether it pays off, so
+        both its ETag and the uncompressed body's are candidates.
+        """
+        if encoding is None or (encoding in self.variants and self.variants[encoding] is None):
+            return [self.etag]
+        return [self._variant_etag(encoding), self.etag]
+
+    def _variant_etag(self, encoding: str) -> str:
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+class ResponseCache:
+    """Encoded response bodies keyed by request and data version, LRU-bounded"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            entry.checked = time.monotonic()
+            return entry
+
+    def recent(self, key: Hashable, max_age: float) -> Optional[CachedResponse]:
+        """The entry for key if get() confirmed its version within max_age seconds.
+
+        Entries of older versions are dropped as soon as this worker sees a
+        write, so this only misses writes other workers made since then.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.checked > max_age:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, version: int, body: bytes,
+            headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        entry = CachedResponse(version, body, headers)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, version: Optional[int] = None):
+        """Drop every entry older than version (all entries if version is None)"""
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+            else:
+                for key in [k for k, e in self._entries.items() if e.version != version]:
+                    del self._entries[key]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in (tag[2:] if tag.startswith('W/') else tag for tag in candidates)
+
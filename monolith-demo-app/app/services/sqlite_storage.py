@@ -0,0 +1,215 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+from app.services.storage import Record, StorageError
+from app.services.store import MemoryStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    entity TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (entity, id)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    op TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    entity TEXT PRIMARY KEY,
+    max_id INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteStorage:
+    """Rows plus a change log in one SQLite database in WAL mode, shared by every worker.
+
+    Each worker keeps serving reads from its own MemoryStore. ``PRAGMA data_version``
+    tells it cheaply when another connection committed, and it then tails the
+    ``changes`` table instead of reloading. Writes run in short ``BEGIN IMMEDIATE``
+    transactions, so id allocation is atomic across processes while readers
+    (WAL) never block. The change log is pruned to the last ``keep_changes``
+    entries; a worker that falls further behind does a full reload.
+    """
+
+    def __init__(self, db_file: str, seed_dir: str, keep_changes: int = 10000, fsync: bool = True):
+        self.db_file = db_file
+        self.seed_dir = seed_dir
+        self.keep_changes = keep_changes
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Write transactions get their own connection, see ``transaction``
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_pid: Optional[int] = None
+        self._data_version: Optional[int] = None
+        self._pending: List[Record] = []
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connect lazily, and again after a fork; connections must not cross processes"""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid, self._data_version = conn, os.getpid(), None
+            self._seed(conn)
+        return self._conn
+
+    def _write_connection(self) -> sqlite3.Connection:
+        self._connection()
+        if self._writer is None or self._writer_pid != os.getpid():
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+            self._writer, self._writer_pid = conn, os.getpid()
+        return self._writer
+
+    def _seed(self, conn: sqlite3.Connection):
+        """Import the JSON snapshots into an empty database"""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('SELECT 1 FROM meta LIMIT 1').fetchone() is None:
+                for entity in ('companies', 'projects'):
+                    rows = self._load_json(os.path.join(self.seed_dir, f'{entity}.json')).get(entity, [])
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO rows (entity, id, data) VALUES (?, ?, ?)',
+                        [(entity, row['id'], json.dumps(row)) for row in rows],
+                    )
+                    conn.execute(
+                        'INSERT INTO meta (entity, max_id) VALUES (?, ?)',
+                        (entity, max([row['id'] for row in rows], default=0)),
+                    )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _load_json(self, file_path: str) -> Dict[str, Any]:
+        """Load JSON data from file"""
+        try:
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _full_load(self, conn: sqlite3.Connection, store: MemoryStore):
+        companies, projects = [], []
+        for entity, data in conn.execute('SELECT entity, data FROM rows ORDER BY entity, id'):
+            (companies if entity == 'companies' else projects).append(json.loads(data))
+        store.load(companies, projects)
+        for entity, max_id in conn.execute('SELECT entity, max_id FROM meta'):
+            store.max_ids[entity] = max(store.max_ids[entity], max_id)
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        store.loaded(seq[0] if seq else 0)
+
+    def sync(self, store: MemoryStore) -> bool:
+        """Bring the store up to date with the database; returns True if anything changed"""
+        with self._lock:
+            try:
+                conn = self._connection()
+                data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+                if data_version == self._data_version:
+                    return False
+                own_transaction = not conn.in_transaction
+                if own_transaction:
+                    conn.execute('BEGIN')
+                try:
+                    oldest = conn.execute('SELECT MIN(seq) FROM changes').fetchone()[0]
+                    if self._data_version is None or (oldest is not None and oldest > store.seq + 1):
+                        self._full_load(conn, store)
+                    else:
+                        changes = conn.execute(
+                            'SELECT seq, entity, op, id, data FROM changes WHERE seq > ? ORDER BY seq',
+                            (store.seq,),
+                        )
+                        for seq, entity, op, row_id, data in changes:
+                            store.apply({
+                                'seq': seq, 'entity': entity, 'op': op, 'id': row_id,
+                                'data': json.loads(data) if data else None,
+                            })
+                finally:
+                    if own_transaction:
+                        conn.execute('COMMIT')
+                self._data_version = data_version
+                return True
+            except sqlite3.Error as e:
+                raise StorageError(str(e)) from e
+
+    @contextmanager
+    def transaction(self, store: MemoryStore, guard: ContextManager[Any] = nullcontext()) -> Iterator[MemoryStore]:
+        """Hold the database write lock with the store caught up to it.
+
+        BEGIN IMMEDIATE runs on the write connection before guard (the
+        caller's lock on the store) and this storage's own lock are taken, so
+        waiting for another worker's write never blocks the readers of this one.
+        """
+        try:
+            with self._lock:
+                conn = self._write_connection()
+            conn.execute('BEGIN IMMEDIATE')
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        with guard, self._lock:
+            try:
+                self.sync(store)
+                yield store
+                conn.execute('COMMIT')
+            except BaseException as e:
+                if self._pending:
+                    # The store already holds the rolled back records; reload it from the database
+                    self._data_version = None
+                conn.execute('ROLLBACK')
+                if isinstance(e, sqlite3.Error):
+                    raise StorageError(str(e)) from e
+                raise
+            finally:
+                self._pending = []
+
+    def commit(self, store: MemoryStore, records: List[Record]):
+        """Write records inside the current transaction and apply them to the store.
+
+        Later writes in the same transaction see these records; all of them
+        become durable with one COMMIT when the transaction ends.
+        """
+        with self._lock:
+            conn = self._write_connection()
+            # Pending first, so a record that fails to apply still makes ``transaction`` reload the store
+            self._pending.extend(records)
+            for record in records:
+                data = json.dumps(record['data']) if record['data'] is not None else None
+                cursor = conn.execute(
+                    'INSERT INTO changes (entity, op, id, data) VALUES (?, ?, ?, ?)',
+                    (record['entity'], record['op'], record['id'], data),
+                )
+                record['seq'] = cursor.lastrowid
+                if record['op'] == 'put':
+                    conn.execute(
+                        'INSERT OR REPLACE INTO rows (entity, id, data) VALUES (?, ?, ?)',
+                        (record['entity'], record['id'], data),
+                    )
+                else:
+                    conn.execute('DELETE FROM rows WHERE entity = ? AND id = ?', (record['entity'], record['id']))
+                conn.execute(
+                    'UPDATE meta SET max_id = MAX(max_id, ?) WHERE entity = ?',
+                    (record['id'], record['entity']),
+                )
+                if record['seq'] % 1000 == 0:
+                    conn.execute('DELETE FROM changes WHERE seq <= ?', (record['seq'] - self.keep_changes,))
+                store.apply(record)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            if self._writer is not None and self._writer_pid == os.getpid():
+                self._writer.close()
+            self._conn = self._writer = None
@@ -0,0 +1,7 @@
+from typing import Any, Dict
+
+Record = Dict[str, Any]
+
+
+class StorageError(Exception):
+    """A storage backend failed to read or persist data"""
@@ -0,0 +1,256 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.models.project import ProjectQuery
+from app.services.aggregates import CompanyAggregates
+from app.services.changelog import ChangeLog
+from app.services.columnar import ProjectTable
+from app.services.indexes import HASH_FIELDS, ProjectIndexes, matches, range_filters
+
+
+class MemoryStore:
+    """In-memory tables keyed by primary key, plus a company -> project ids index.
+
+    Projects, the bulk of the data, live in a columnar ProjectTable; reads get
+    fresh dicts built from it. With a change_log_size, the rows touched by the
+    last mutations are kept in a ChangeLog for the change feed.
+    """
+
+    def __init__(self, change_log_size: int = 0):
+        self.companies: Dict[int, Dict[str, Any]] = {}
+        self.projects = ProjectTable()
+        self.company_projects: Dict[int, Set[int]] = {}
+        self.max_ids: Dict[str, int] = {'companies': 0, 'projects': 0}
+        self.seq = 0
+        # Primary keys in sorted order, for keyset pagination
+        self.sorted_ids: Dict[str, List[int]] = {'companies': [], 'projects': []}
+        self.project_indexes = ProjectIndexes()
+        self.company_aggregates = CompanyAggregates()
+        # Survives clear(): after a reload, loaded() decides whether the log still holds
+        self.changes = ChangeLog(change_log_size)
+
+    def load(self, companies: Iterable[Dict[str, Any]], projects: Iterable[Dict[str, Any]]):
+        """Replace the whole store content"""
+        self.clear()
+        for company in companies:
+            # First row wins on duplicate ids, like the original linear scan did
+            if company.get('id') not in self.companies:
+                self.put_company(company)
+        with self.project_indexes.deferred():
+            for project in projects:
+                if project.get('id') not in self.projects:
+                    self.put_project(project)
+
+    def clear(self):
+        self.companies = {}
+        self.projects = ProjectTable()
+        self.company_projects = {}
+        self.max_ids = {'companies': 0, 'projects': 0}
+        self.seq = 0
+        self.sorted_ids = {'companies': [], 'projects': []}
+        self.project_indexes = ProjectIndexes()
+        self.company_aggregates = CompanyAggregates()
+
+    def loaded(self, seq: int):
+        """Set the version of freshly loaded content, before any journal records are replayed on it"""
+        self.seq = seq
+        self.changes.rebase(seq)
+
+    def apply(self, record: Dict[str, Any]):
+        """Apply one journal record; replaying the same record twice is harmless"""
+        if self.changes.max_entries > 0:
+            self._log_change(record)
+        if record['entity'] == 'companies':
+            if record['op'] == 'put':
+                self.put_company(record['data'])
+            else:
+                self.remove_company(record['id'])
+        else:
+            if record['op'] == 'put':
+                self.put_project(record['data'])
+            else:
+                self.remove_project(record['id'])
+        entity = record['entity']
+        self.max_ids[entity] = max(self.max_ids[entity], record['id'])
+        self.seq = max(self.seq, record.get('seq', 0))
+
+    def _log_change(self, record: Dict[str, Any]):
+        """Log the rows a record touches: its own, and the companies whose project_count it changes"""
+        seq = record.get('seq', 0)
+        self.changes.append(seq, record['entity'], record['id'])
+        if record['entity'] == 'projects':
+            old = self.projects.view(record['id'])
+            before = set(old.get('company_id', [])) if old is not None else set()
+            after = set(record['data'].get('company_id', [])) if record['op'] == 'put' else set()
+            for company_id in sorted(before ^ after):
+                self.changes.append(seq, 'companies', company_id)
+
+    def next_id(self, entity: str) -> int:
+        """Next primary key; ids of deleted rows are never handed out again"""
+        return self.max_ids[entity] + 1
+
+    def _add_id(self, entity: str, row_id: int):
+        ids = self.sorted_ids[entity]
+        # New ids are allocated in increasing order, so this is usually an append
+        if not ids or row_id > ids[-1]:
+            ids.append(row_id)
+        else:
+            insort(ids, row_id)
+
+    def _remove_id(self, entity: str, row_id: int):
+        ids = self.sorted_ids[entity]
+        index = bisect_left(ids, row_id)
+        if index < len(ids) and ids[index] == row_id:
+            del ids[index]
+
+    def scan(self, entity: str, after_id: Optional[int] = None, limit: Optional[int] = None,
+             company_id: Optional[int] = None, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Rows in primary key order after after_id, at most limit of them, projected to fields when given"""
+        if company_id is not None:
+            ids = sorted(self.company_projects.get(company_id, ()))
+        else:
+            ids = self.sorted_ids[entity]
+        start = bisect_right(ids, after_id) if after_id is not None else 0
+        end = start + limit if limit is not None else len(ids)
+        if entity == 'companies':
+            rows = [self._company_view(self.companies[row_id]) for row_id in ids[start:end]]
+        elif fields is not None:
+            # Decode only the projected columns
+            views = (self.projects.view(row_id) for row_id in ids[start:end])
+            return [{field: view[field] for field in fields} for view in views]
+        else:
+            return [self.projects[row_id] for row_id in ids[start:end]]
+        return [{field: row[field] for field in fields} for row in rows] if fields is not None else rows
+
+    # Companies
+    def get_company(self, company_id: int) -> Optional[Dict[str, Any]]:
+        company = self.companies.get(company_id)
+        return self._company_view(company) if company is not None else None
+
+    def _company_view(self, company: Dict[str, Any]) -> Dict[str, Any]:
+        """Company row with project_count taken from the live aggregates"""
+        aggregate = self.company_aggregates.by_company.get(company['id'])
+        return {**company, 'project_count': aggregate.project_count if aggregate else 0}
+
+    def get_company_stats(self, company_id: int) -> Dict[str, Any]:
+        return self.company_aggregates.get(company_id)
+
+    def put_company(self, company: Dict[str, Any]):
+        if company['id'] not in self.companies:
+            self._add_id('companies', company['id'])
+        self.companies[company['id']] = company
+        self.max_ids['companies'] = max(self.max_ids['companies'], company['id'])
+
+    def remove_company(self, company_id: int) -> Optional[Dict[str, Any]]:
+        company = self.companies.pop(company_id, None)
+        if company is not None:
+            self._remove_id('companies', company_id)
+        return company
+
+    # Projects
+    def get_project(self, project_id: int) -> Optional[Dict[str, Any]]:
+        return self.projects.get(project_id)
+
+    def put_project(self, project: Dict[str, Any]):
+        self.remove_project(project['id'])
+        self._add_id('projects', project['id'])
+        self.projects[project['id']] = project
+        # Indexes then hold the table's single copy of each repeated string, not this row's
+        project = self.projects.interned(project)
+        self.project_indexes.add(project)
+        self.company_aggregates.add(project)
+        self.max_ids['projects'] = max(self.max_ids['projects'], project['id'])
+        for company_id in project.get('company_id', []):
+            self.company_projects.setdefault(company_id, set()).add(project['id'])
+
+    def remove_project(self, project_id: int) -> Optional[Dict[str, Any]]:
+        project = self.projects.pop(project_id, None)
+        if project is not None:
+            self._remove_id('projects', project_id)
+            self.project_indexes.remove(project)
+            self.company_aggregates.remove(project)
+            for company_id in project.get('company_id', []):
+                project_ids = self.company_projects.get(company_id)
+                if project_ids is not None:
+                    project_ids.discard(project_id)
+                    if not project_ids:
+                        del self.company_projects[company_id]
+        return project
+
+    def project_sort_key(self, project: Dict[str, Any], sort_field: str) -> Tuple[Any, int]:
+        return project[sort_field], project['id']
+
+    def _walk_projects(self, sort_field: str, descending: bool, after: Optional[Tuple[Any, int]],
+                       bounds: Optional[Tuple[Any, Any]]) -> Iterator[int]:
+        """Project ids in sort order, starting after the cursor, within bounds on the sort field"""
+        if sort_field == 'id':
+            keys: List[Any] = self.sorted_ids['projects']
+            start, end = 0, len(keys)
+            if after is not None:
+                position = (bisect_right if not descending else bisect_left)(keys, after[1])
+                start, end = (position, end) if not descending else (start, position)
+            for i in (range(start, end) if not descending else range(end - 1, start - 1, -1)):
+                yield keys[i]
+            return
+        index = self.project_indexes.sorted[sort_field]
+        start, end = index.bounds(*bounds) if bounds else (0, len(index))
+        if after is not None:
+            if not descending:
+                start = max(start, index.bisect_right(after))
+            else:
+                end = min(end, index.bisect_left(after))
+        for i in (range(start, end) if not descending else range(end - 1, start - 1, -1)):
+            yield index.ids[i]
+
+    def query_projects(self, query: ProjectQuery, after: Optional[Tuple[Any, int]] = None,
+                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Filtered, sorted projects after the (sort value, id) cursor.
+
+        The smallest candidate set (a hash index bucket, the company index or a
+        range slice of a sorted index) drives the scan, so the cost tracks the
+        result size rather than the table size.
+        """
+        descending = query.sort.startswith('-')
+        sort_field = query.sort.lstrip('-')
+        ranges = range_filters(query)
+
+        candidates: List[Tuple[int, Any]] = []
+        for field in HASH_FIELDS:
+            values = getattr(query, field)
+            if values is not None:
+                row_ids = self.project_indexes.hash[field].lookup(values)
+                candidates.append((len(row_ids), row_ids))
+        if query.company_id is not None:
+            row_ids = self.company_projects.get(query.company_id, set())
+            candidates.append((len(row_ids), row_ids))
+        for field, bounds in ranges.items():
+            start, end = self.project_indexes.sorted[field].bounds(*bounds)
+            candidates.append((end - start, field))
+        driver = min(candidates, key=lambda candidate: candidate[0], default=(len(self.projects), sort_field))[1]
+
+        if driver == sort_field:
+            # Already in sort order: walk the index from the cursor and stop at limit
+            rows = []
+            for row_id in self._walk_projects(sort_field, descending, after, ranges.get(sort_field)):
+                project = self.projects.view(row_id)
+                if matches(project, query, ranges):
+                    rows.append(project.materialize())
+                    if limit is not None and len(rows) >= limit:
+                        break
+            return rows
+
+        if isinstance(driver, str):
+            start, end = self.project_indexes.sorted[driver].bounds(*ranges[driver])
+            row_ids = self.project_indexes.sorted[driver].ids[start:end]
+        else:
+            row_ids = driver
+        # Filter and sort lazy views; only the rows returned are decoded in full
+        rows = [self.projects.view(row_id) for row_id in row_ids]
+        rows = [project for project in rows if matches(project, query, ranges)]
+        rows.sort(key=lambda project: self.project_sort_key(project, sort_field), reverse=descending)
+        if after is not None:
+            if not descending:
+                rows = [project for project in rows if self.project_sort_key(project, sort_field) > after]
+            else:
+                rows = [project for project in rows if self.project_sort_key(project, sort_field) < after]
+        return [project.materialize() for project in (rows[:limit] if limit is not None else rows)]
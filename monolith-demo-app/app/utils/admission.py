@@ -0,0 +1,158 @@
+import json
+import math
+import os
+import time
+from typing import Dict, Optional
+
+from app.utils.metadata import get_all_status_code_details
+from app.utils.metrics import ADMISSION_LIMIT, ADMISSION_REJECTED
+from app.utils.routing import RouteMatcher
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "false").lower() == "true"
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", 20))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", 4))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", 500))
+# How far the fastest recent latency may rise above the no-load baseline before the limit shrinks
+ADMISSION_TOLERANCE = float(os.getenv("ADMISSION_TOLERANCE", 1.5))
+# Hard cap on admitted requests per worker across all routes
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 1000))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+
+# Probes and control endpoints always get through, so overload never fails liveness or readiness;
+# the change feed holds streams and long polls open, which would read as queueing
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics", "/drain", "/startup", "/changes"})
+
+# Requests per limit update; the fastest of them is the latency sample
+WINDOW = 20
+# How fast the no-load baseline may drift up per window when a route genuinely gets slower
+BASELINE_DRIFT = 0.01
+
+
+class GradientLimit:
+    """Concurrency limit of one route that follows its latency, in the style of Netflix's gradient limiter.
+
+    Every ``WINDOW`` requests the fastest latency of the window is compared with
+    the route's no-load baseline (the lowest such value seen, drifting up
+    slowly). Queueing delays every request, even the fastest, so while that
+    stays within ``tolerance`` times the baseline the limit grows by about
+    sqrt(limit); beyond it the limit shrinks in proportion, down to
+    ``min_limit``. Taking the fastest request keeps deliberately random
+    handler latency from reading as congestion. Server errors cut the limit
+    multiplicatively, AIMD style.
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, tolerance: float,
+                 smoothing: float = 0.2, backoff: float = 0.9):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._window_min = float("inf")
+        self._window_samples = 0
+        self._window_busy = False
+
+    def on_sample(self, rtt: float, in_flight: int, failed: bool):
+        if failed:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            return
+        self._window_min = min(self._window_min, rtt)
+        self._window_samples += 1
+        # A route using less than half of its limit says nothing about a higher one
+        self._window_busy = self._window_busy or in_flight >= self.limit / 2
+        if self._window_samples < WINDOW:
+            return
+        rtt, busy = self._window_min, self._window_busy
+        self._window_min, self._window_samples, self._window_busy = float("inf"), 0, False
+        if self.baseline is None:
+            self.baseline = rtt
+        self.baseline = min(self.baseline * (1 + BASELINE_DRIFT), rtt)
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / max(rtt, 1e-6)))
+        if gradient == 1.0 and not busy:
+            return
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, self.limit))
+
+
+class AdmissionMiddleware:
+    """Shed excess load per route before it queues: 429 over the route's limit, 503 over the worker's cap.
+
+    Rejections are cheap and carry ``Retry-After``. Envoy's retry policies
+    retry 5xx/gateway errors, so the per-route case uses 429, which they do
+    not retry and so do not amplify.
+    """
+
+    def __init__(self, app, enabled: bool = ADMISSION_CONTROL):
+        self.app = app
+        self.enabled = enabled
+        self.limits: Dict[str, GradientLimit] = {}
+        self.in_flight = 0
+        self._router = RouteMatcher()
+        self._rejections: Dict[int, bytes] = {}
+        status_codes = get_all_status_code_details()
+        for status in (429, 503):
+            details = status_codes[status]
+            self._rejections[status] = json.dumps({"detail": f"{details['message']}: {details['description']}"}).encode()
+
+    def _limit(self, route: str) -> GradientLimit:
+        limit = self.limits.get(route)
+        if limit is None:
+            limit = self.limits[route] = GradientLimit(
+                ADMISSION_INITIAL_LIMIT, ADMISSION_MIN_LIMIT, ADMISSION_MAX_LIMIT, ADMISSION_TOLERANCE,
+            )
+            ADMISSION_LIMIT.labels(route).set(limit.limit)
+        return limit
+
+    async def _reject(self, send, route: str, status: int):
+        ADMISSION_REJECTED.labels(route, str(status)).inc()
+        body = self._rejections[status]
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(ADMISSION_RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+        route = self._router.match(scope)
+        if route is None:
+            return await self.app(scope, receive, send)
+        # Outer middleware (metrics) labels rejections with the route too
+        scope["route"] = route
+        limit = self._limit(route.path)
+        if self.in_flight >= ADMISSION_MAX_IN_FLIGHT:
+            return await self._reject(send, route.path, 503)
+        if limit.in_flight >= int(limit.limit):
+            return await self._reject(send, route.path, 429)
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        limit.in_flight += 1
+        in_flight = limit.in_flight
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight -= 1
+            limit.in_flight -= 1
+            previous = int(limit.limit)
+            limit.on_sample(time.perf_counter() - start, in_flight, failed=status >= 500)
+            if int(limit.limit) != previous:
+                ADMISSION_LIMIT.labels(route.path).set(int(limit.limit))
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional
+
+# How often a worker checks storage for writes made by its siblings while clients are waiting for changes
+CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", 0.5))
+# Seconds between keep-alive comments on an idle event stream, below Envoy's and browsers' idle timeouts
+CHANGES_HEARTBEAT = float(os.getenv("CHANGES_HEARTBEAT", 15))
+
+
+class ChangeFeed:
+    """Wakes requests waiting for the data version to move past theirs.
+
+    Local writes wake waiters at once through ``notify`` (a DataService
+    listener, called from any thread). Writes of sibling workers reach this
+    worker only through storage, so while anyone is waiting one watcher task
+    checks the version every ``poll_interval``; one storage check per worker
+    then serves every open stream and long poll. The watcher stops when the
+    last waiter leaves.
+    """
+
+    def __init__(self, version: Callable[[], Awaitable[int]], poll_interval: float = CHANGES_POLL_INTERVAL):
+        self.version = version
+        self.poll_interval = poll_interval
+        self.current = 0
+        self.waiters = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    def notify(self, version: int):
+        """A local write reached version; safe to call from any thread"""
+        loop = self._loop
+        if loop is None or not self.waiters:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            # The loop is closed (shutdown) or belongs to the process this worker was forked from
+            pass
+
+    async def _start(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._wake, self._changed, self._watcher = loop, asyncio.Event(), asyncio.Event(), None
+        if self._watcher is None or self._watcher.done():
+            # Nobody was watching, so current may be stale
+            self._publish(await self.version())
+            if self._watcher is None or self._watcher.done():
+                self._watcher = loop.create_task(self._watch())
+
+    async def _watch(self):
+        while self.waiters:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self._publish(await self.version())
+
+    def _publish(self, version: int):
+        if version != self.current:
+            self.current = version
+            changed, self._changed = self._changed, asyncio.Event()
+            changed.set()
+
+    async def wait(self, after: int, timeout: float) -> int:
+        """The data version once it is past after, or the current one when timeout passes first"""
+        self.waiters += 1
+        try:
+            await self._start()
+            deadline = self._loop.time() + timeout
+            while self.current <= after:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            return self.current
+        finally:
+            self.waiters -= 1
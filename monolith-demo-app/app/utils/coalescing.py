@@ -0,0 +1,94 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from app.utils.metrics import COALESCED_REQUESTS
+from app.utils.routing import RouteMatcher
+
+# Route templates whose identical concurrent GETs share one computation, e.g. "/companies,/projects/{project_id}"; "*" for all
+COALESCE_ROUTES = os.getenv("COALESCE_ROUTES", "")
+
+# Request headers a response may depend on; they are part of the coalescing key
+KEY_HEADERS = (b"accept", b"accept-encoding", b"if-none-match")
+
+Message = Dict[str, Any]
+
+
+def parse_routes(value: str) -> FrozenSet[str]:
+    return frozenset(route.strip() for route in value.split(",") if route.strip())
+
+
+class CoalescingMiddleware:
+    """Single-flight for GET requests: identical concurrent requests share the first one's response.
+
+    Requests are identical when they hit the same route with the same path,
+    query string, key headers and data version. The first (leader) runs the
+    app in a separate task and buffers the response; requests arriving while it
+    is in flight (followers) wait for it and replay the same status, headers
+    and body. Because the data version is part of the key, a request made after
+    a write never gets a response computed before it. Streamed NDJSON responses
+    and event streams are never coalesced.
+    """
+
+    def __init__(self, app, routes: FrozenSet[str] = parse_routes(COALESCE_ROUTES),
+                 version: Optional[Callable[[], Awaitable[int]]] = None):
+        self.app = app
+        self.routes = routes
+        self.version = version
+        self._router = RouteMatcher()
+        self._in_flight: Dict[Tuple[Any, ...], "asyncio.Future[List[Message]]"] = {}
+
+    def _route(self, scope) -> Optional[Any]:
+        """The route the router will pick, if coalescing is enabled for it"""
+        route = self._router.match(scope)
+        if route is not None and ("*" in self.routes or route.path in self.routes):
+            return route
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.routes or scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        route = self._route(scope)
+        headers = dict((name, value) for name, value in scope["headers"] if name in KEY_HEADERS)
+        accept = headers.get(b"accept", b"")
+        if route is None or b"application/x-ndjson" in accept or b"text/event-stream" in accept:
+            return await self.app(scope, receive, send)
+
+        version = await self.version() if self.version is not None else None
+        key = (scope["method"], scope["path"], scope["query_string"], version,
+               *(headers.get(name) for name in KEY_HEADERS))
+        flight = self._in_flight.get(key)
+        if flight is None:
+            COALESCED_REQUESTS.labels(route.path, "leader").inc()
+            flight = self._in_flight[key] = asyncio.ensure_future(self._compute(key, scope))
+            flight.add_done_callback(lambda done: done.cancelled() or done.exception())
+        else:
+            COALESCED_REQUESTS.labels(route.path, "follower").inc()
+            # Outer middleware (metrics) reads the route the router would have set
+            scope["route"] = route
+        # Shielded so a leader whose client goes away does not cancel the followers' response
+        for message in await asyncio.shield(flight):
+            # Outer middleware may replace keys of the message, so each request gets its own copy
+            await send(dict(message))
+
+    async def _compute(self, key: Tuple[Any, ...], scope) -> List[Message]:
+        messages: List[Message] = []
+        requested = False
+
+        async def receive() -> Message:
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # GETs have no more body; anything waiting for a disconnect waits until the response is done
+            await asyncio.Event().wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message):
+            messages.append(message)
+
+        try:
+            await self.app(scope, receive, send)
+            return messages
+        finally:
+            del self._in_flight[key]
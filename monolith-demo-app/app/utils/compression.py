@@ -0,0 +1,67 @@
+import gzip
+import os
+from typing import Callable, Dict, Optional
+
+# brotli and zstandard are optional; without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION", "true").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+
+CODECS: Dict[str, Callable[[bytes], bytes]] = {
+    # mtime=0 keeps the gzip bytes, and so the ETag, identical across workers
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if brotli is not None:
+    CODECS["br"] = lambda body: brotli.compress(body, quality=5)
+if zstandard is not None:
+    # A ZstdCompressor must not be shared between threads
+    CODECS["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+
+# Server preference, used to break ties between equally acceptable encodings
+ENCODINGS = [
+    encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if encoding.strip() in CODECS
+]
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Content coding to answer an Accept-Encoding header with, or None for identity"""
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    # Compression wins ties with identity; a client has to prefer identity explicitly
+    if best is None or best_weight < weights.get("identity", 1.0):
+        return None
+    return best
+
+
+def compress(body: bytes, encoding: str) -> Optional[bytes]:
+    """body in the given content coding, or None when it is too small or would not shrink"""
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return None
+    compressed = CODECS[encoding](body)
+    return compressed if len(compressed) < len(body) else None
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import time
+from typing import Any, Callable, TypeVar
+
+import anyio.to_thread
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.timing import in_thread
+
+T = TypeVar("T")
+
+# "async": handlers await asyncio.sleep; only storage reads and writes use the threadpool.
+# "sync": every simulated delay and data access pins a threadpool thread, like plain `def` handlers.
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "async").lower()
+
+
+def get_execution_mode() -> str:
+    return EXECUTION_MODE
+
+
+def configure_threadpool():
+    """Resize Starlette's threadpool (anyio default limiter, 40 threads) from THREADPOOL_SIZE"""
+    size = os.getenv("THREADPOOL_SIZE")
+    if size:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(size)
+
+
+async def sleep(seconds: float):
+    """Wait without holding a thread in async mode; block a threadpool thread in sync mode"""
+    if EXECUTION_MODE == "sync":
+        await run_in_threadpool(in_thread(time.sleep, seconds))
+    else:
+        await asyncio.sleep(seconds)
+
+
+async def run_read(func: Callable[..., T], *args: Any) -> T:
+    """Reads run in the threadpool in both modes: catching up with storage, or reloading it,
+    waits for the store lock, which a write holds while it applies a batch.
+
+    Time spent waiting for a threadpool thread is recorded as the request's `queue` phase.
+    """
+    return await run_in_threadpool(in_thread(func, *args))
+
+
+async def run_write(func: Callable[..., T], *args: Any) -> T:
+    """Writes take file locks and fsync, so they always run in the threadpool"""
+    return await run_in_threadpool(in_thread(func, *args))
@@ -0,0 +1,34 @@
+import re
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# rich markup such as [bold green] or [/bold green]
+MARKUP = re.compile(r"\[/?[a-z]+(?: [a-z]+)*\]")
+
+
+class PlainStatus:
+    def __init__(self, console: "PlainConsole"):
+        self.console = console
+
+    def update(self, message: str):
+        self.console.log(message)
+
+
+class PlainConsole:
+    """The part of rich's Console the lifecycle messages use, as plain lines without markup"""
+
+    def log(self, message: str):
+        print(MARKUP.sub("", message), flush=True)
+
+    @contextmanager
+    def status(self, message: str) -> Iterator[PlainStatus]:
+        self.log(message)
+        yield PlainStatus(self)
+
+
+def create_console(plain: bool = False) -> Any:
+    """rich's Console, or a PlainConsole that leaves rich unimported, since the styling is cosmetic"""
+    if plain:
+        return PlainConsole()
+    from rich.console import Console
+    return Console()
@@ -0,0 +1,125 @@
+import asyncio
+import glob
+import os
+import time
+from typing import Optional
+
+# Created by the preStop hook; every worker of the pod polls for it
+DRAIN_FILE = os.getenv("DRAIN_FILE", "/tmp/app-draining")
+DRAIN_POLL_INTERVAL = float(os.getenv("DRAIN_POLL_INTERVAL", 0.2))
+# Upper bound on how long shutdown waits for in-flight requests
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", 30))
+
+# Probes and drain control are never counted, so polling them cannot keep a worker busy
+UNTRACKED_PATHS = frozenset({"/health", "/ready", "/drain", "/metrics"})
+
+
+class DrainState:
+    """Per-worker in-flight request count, readiness and drain flag.
+
+    Draining starts from ``start_drain`` (lifespan shutdown) or when
+    the drain file shows up. While draining, each worker publishes its in-flight
+    count next to the drain file so any worker can report the total for the pod.
+    """
+
+    def __init__(self, drain_file: str = DRAIN_FILE, poll_interval: float = DRAIN_POLL_INTERVAL):
+        self.drain_file = drain_file
+        self.poll_interval = poll_interval
+        self.in_flight = 0
+        self.ready = False
+        self.draining = False
+        self.drain_started: Optional[float] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def count_file(self) -> str:
+        return f"{self.drain_file}.{os.getpid()}"
+
+    def request_started(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    def start_drain(self):
+        """Fail readiness and close connections after each response"""
+        if not self.draining:
+            self.draining = True
+            self.drain_started = time.time()
+        self._publish()
+
+    def _publish(self):
+        try:
+            with open(self.count_file, "w") as f:
+                f.write(str(self.in_flight))
+        except OSError:
+            pass
+
+    async def watch(self):
+        """Pick up a pod-wide drain and keep this worker's published count fresh"""
+        while True:
+            if not self.draining and os.path.exists(self.drain_file):
+                self.start_drain()
+            elif self.draining:
+                self._publish()
+            await asyncio.sleep(self.poll_interval)
+
+    def pod_in_flight(self) -> int:
+        """In-flight requests across every worker that has started draining"""
+        total = self.in_flight
+        for path in glob.glob(f"{glob.escape(self.drain_file)}.*"):
+            if path == self.count_file:
+                continue
+            try:
+                with open(path) as f:
+                    total += int(f.read() or 0)
+            except (OSError, ValueError):
+                continue
+        return total
+
+    async def wait_idle(self, timeout: float = DRAIN_TIMEOUT) -> bool:
+        """Wait until no request is in flight; False if the deadline passed first"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def close(self, pid: Optional[int] = None):
+        """Forget a worker's published count once it has stopped serving (this worker by default)"""
+        try:
+            os.unlink(f"{self.drain_file}.{pid or os.getpid()}")
+        except OSError:
+            pass
+
+
+drain_state = DrainState()
+
+
+class DrainMiddleware:
+    """Track in-flight requests and send `Connection: close` once the worker is draining"""
+
+    def __init__(self, app, state: DrainState = drain_state):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTRACKED_PATHS:
+            return await self.app(scope, receive, send)
+
+        state = self.state
+
+        async def send_with_close(message):
+            if message["type"] == "http.response.start" and state.draining:
+                message["headers"] = [*message.get("headers", []), (b"connection", b"close")]
+            await send(message)
+
+        state.request_started()
+        try:
+            await self.app(scope, receive, send_with_close)
+        finally:
+            state.request_finished()
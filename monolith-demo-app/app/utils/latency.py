@@ -0,0 +1,233 @@
+import json
+import math
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.timing import current_timing, log_event
+
+# JSON latency profile; re-read whenever the file changes, so a running pod can be retuned through a ConfigMap
+LATENCY_PROFILE = os.getenv("LATENCY_PROFILE")
+# Seeds per-route random streams for reproducible runs; overrides the profile's "seed"
+LATENCY_SEED = os.getenv("LATENCY_SEED")
+LATENCY_RELOAD_INTERVAL = float(os.getenv("LATENCY_RELOAD_INTERVAL", 1.0))
+
+
+class Distribution(ABC):
+    """Seconds of simulated latency"""
+
+    @abstractmethod
+    def sample(self, rng: random.Random) -> float:
+        ...
+
+
+class Uniform(Distribution):
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+class Constant(Distribution):
+    def __init__(self, value: float):
+        self.value = value
+
+    def sample(self, rng: random.Random) -> float:
+        return self.value
+
+
+class LogNormal(Distribution):
+    """Long-tailed latency given by its median and the sigma of its logarithm, optionally capped"""
+
+    def __init__(self, median: float, sigma: float, cap: Optional[float] = None):
+        self.mu = math.log(median)
+        self.sigma = sigma
+        self.cap = cap
+
+    def sample(self, rng: random.Random) -> float:
+        value = rng.lognormvariate(self.mu, self.sigma)
+        return min(value, self.cap) if self.cap is not None else value
+
+
+class Empirical(Distribution):
+    """Inverse CDF given as (probability, seconds) points, interpolated linearly between them.
+
+    The points are quantiles of observed latencies, e.g. fitted from an access
+    log by benchmarks.fit_latency_profile; they must start at probability 0 and
+    end at 1.
+    """
+
+    def __init__(self, quantiles: List[Tuple[float, float]]):
+        points = sorted((float(p), float(value)) for p, value in quantiles)
+        if len(points) < 2 or points[0][0] != 0.0 or points[-1][0] != 1.0:
+            raise ValueError("empirical quantiles must include probabilities 0 and 1")
+        self.probabilities = [p for p, _ in points]
+        self.values = [value for _, value in points]
+
+    def sample(self, rng: random.Random) -> float:
+        u = rng.random()
+        i = min(bisect_right(self.probabilities, u), len(self.values) - 1)
+        p0, p1 = self.probabilities[i - 1], self.probabilities[i]
+        v0, v1 = self.values[i - 1], self.values[i]
+        return v0 + (v1 - v0) * ((u - p0) / (p1 - p0) if p1 > p0 else 0.0)
+
+
+def parse_distribution(spec: Dict[str, Any]) -> Distribution:
+    kind = spec.get("type")
+    if kind == "uniform":
+        return Uniform(spec["min"], spec["max"])
+    if kind == "constant":
+        return Constant(spec["value"])
+    if kind == "lognormal":
+        return LogNormal(spec["median"], spec["sigma"], spec.get("max"))
+    if kind == "empirical":
+        return Empirical(spec["quantiles"])
+    raise ValueError(f"Unknown latency distribution type: {kind}")
+
+
+class LoadModel:
+    """Latency multiplier that grows once concurrent queries exceed the database's capacity"""
+
+    def __init__(self, capacity: int, exponent: float = 1.0):
+        self.capacity = capacity
+        self.exponent = exponent
+
+    def multiplier(self, in_flight: int) -> float:
+        return max(1.0, in_flight / self.capacity) ** self.exponent
+
+
+class LatencyProfile:
+    """Distributions by route ("GET /companies/{company_id}" or just the template) and by status code"""
+
+    def __init__(self, routes: Optional[Dict[str, Distribution]] = None,
+                 status: Optional[Dict[int, Distribution]] = None,
+                 default: Optional[Distribution] = None,
+                 load: Optional[LoadModel] = None,
+                 seed: Optional[str] = None):
+        self.routes = routes or {}
+        self.status = status or {}
+        self.default = default
+        self.load = load
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyProfile":
+        load = data.get("load")
+        return cls(
+            routes={route: parse_distribution(spec) for route, spec in data.get("routes", {}).items()},
+            status={int(code): parse_distribution(spec) for code, spec in data.get("status", {}).items()},
+            default=parse_distribution(data["default"]) if "default" in data else None,
+            load=LoadModel(load["capacity"], load.get("exponent", 1.0)) if load else None,
+            seed=str(data["seed"]) if data.get("seed") is not None else None,
+        )
+
+
+class LatencyModel:
+    """Draws the simulated database and status code delays from a latency profile.
+
+    Without a profile every delay is uniform between the bounds the caller
+    passes, the app's original behaviour. A profile replaces that per route
+    (looked up as "METHOD template", then "template", then "default") and per
+    status code. With a seed each route draws from its own random stream, so a
+    route's sequence of delays does not depend on how its requests interleave
+    with other routes. With a load model, delays are multiplied as concurrent
+    simulated queries in this worker exceed the configured capacity.
+    The profile file is checked for changes at most every reload_interval
+    seconds; a file that fails to parse is logged and the previous profile kept.
+    """
+
+    def __init__(self, path: Optional[str] = LATENCY_PROFILE, seed: Optional[str] = LATENCY_SEED,
+                 reload_interval: float = LATENCY_RELOAD_INTERVAL):
+        self.path = path
+        self.seed_override = seed
+        self.reload_interval = reload_interval
+        self.profile = LatencyProfile()
+        self.in_flight = 0
+        self._signature: Optional[Tuple[float, int]] = None
+        self._error: Optional[str] = None
+        self._checked_at = -math.inf
+        self._rngs: Dict[str, random.Random] = {}
+        self._reload()
+
+    def _reload(self):
+        if not self.path:
+            return
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime, stat.st_size)
+            if signature == self._signature:
+                return
+            with open(self.path) as f:
+                profile = LatencyProfile.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Logged once per distinct error, not on every check
+            if str(e) != self._error:
+                self._error = str(e)
+                log_event({"event": "latency_profile_error", "path": self.path, "error": self._error})
+            return
+        self.profile, self._signature, self._error, self._rngs = profile, signature, None, {}
+        log_event({"event": "latency_profile_loaded", "path": self.path, "routes": sorted(profile.routes),
+                   "status": sorted(profile.status), "seed": self.seed, "load": profile.load is not None})
+
+    @property
+    def seed(self) -> Optional[str]:
+        return self.seed_override if self.seed_override is not None else self.profile.seed
+
+    def _rng(self, key: str) -> Any:
+        seed = self.seed
+        if seed is None:
+            # The random module's generator, which is reseeded in every forked worker
+            return random
+        rng = self._rngs.get(key)
+        if rng is None:
+            rng = self._rngs[key] = random.Random(f"{seed}:{key}")
+        return rng
+
+    def _check(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            self._reload()
+
+    def database_delay(self, low: float, high: float) -> float:
+        """Seconds for one simulated query of the current request's route"""
+        self._check()
+        profile = self.profile
+        timing = current_timing()
+        route = (timing.route if timing is not None else None) or "default"
+        key, distribution = route, profile.routes.get(route)
+        if distribution is None:
+            key = route.partition(" ")[2]
+            distribution = profile.routes.get(key)
+        if distribution is None and profile.default is not None:
+            key, distribution = "default", profile.default
+        if distribution is None:
+            key, distribution = route, Uniform(low, high)
+        delay = distribution.sample(self._rng(key))
+        if profile.load is not None:
+            delay *= profile.load.multiplier(self.in_flight + 1)
+        return delay
+
+    def status_delay(self, status_code: int, low: float, high: float) -> float:
+        """Seconds before answering /status/{status_code}"""
+        self._check()
+        distribution = self.profile.status.get(status_code) or Uniform(low, high)
+        return distribution.sample(self._rng(f"status {status_code}"))
+
+    @contextmanager
+    def query(self) -> Iterator[None]:
+        """Count a simulated query as in flight, for the load model"""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+latency_model = LatencyModel()
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from typing import Tuple
+
+import anyio.to_thread
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+from app.utils.timing import RequestTiming, _request_timing
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Set (and emptied) by the container start script so every worker writes its samples there
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STORAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+REQUEST_DURATION = Histogram(
+    "app_request_duration_seconds", "Total request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+SIMULATED_DB_DURATION = Histogram(
+    "app_request_simulated_db_seconds", "Time spent in simulated database delay per request",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+HANDLER_DURATION = Histogram(
+    "app_request_handler_seconds", "Request latency excluding simulated database delay",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge("app_requests_in_flight", "Requests currently being handled", multiprocess_mode="livesum")
+THREADPOOL_BUSY = Gauge("app_threadpool_busy_threads", "Threadpool threads in use", multiprocess_mode="livesum")
+THREADPOOL_SIZE = Gauge("app_threadpool_size", "Threadpool capacity", multiprocess_mode="livesum")
+STORAGE_LOAD = Histogram(
+    "app_data_load_seconds", "DataService syncs that loaded data from storage",
+    ["backend"], buckets=STORAGE_BUCKETS,
+)
+STORAGE_SAVE = Histogram(
+    "app_data_save_seconds", "DataService write batches, including locking and persistence",
+    ["backend"], buckets=STORAGE_BUCKETS,
+)
+WRITE_BATCH_SIZE = Histogram(
+    "app_write_batch_size", "Writes persisted together by one group commit",
+    ["backend"], buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+COALESCED_REQUESTS = Counter(
+    "app_coalesced_requests_total", "GET requests on coalescing routes; followers shared a leader's response",
+    ["route", "role"],
+)
+ADMISSION_LIMIT = Gauge(
+    "app_admission_limit", "Current adaptive concurrency limit per route",
+    ["route"], multiprocess_mode="liveall",
+)
+ADMISSION_REJECTED = Counter(
+    "app_admission_rejected_total", "Requests shed by admission control",
+    ["route", "status"],
+)
+STARTUP_PHASE = Gauge(
+    "app_startup_phase_seconds", "Duration of each lifespan startup phase",
+    ["phase"], multiprocess_mode="liveall",
+)
+
+
+_threadpool_seen = [None, None]
+_limiter_by_loop = {}
+
+
+def update_threadpool():
+    """Publish threadpool usage; gauges are only written when a value changed"""
+    # Looking the limiter up through anyio costs ~10us, so it is cached per event loop
+    loop = asyncio.get_running_loop()
+    limiter = _limiter_by_loop.get(loop)
+    if limiter is None:
+        _limiter_by_loop.clear()
+        limiter = _limiter_by_loop[loop] = anyio.to_thread.current_default_thread_limiter()
+    busy, size = limiter.borrowed_tokens, limiter.total_tokens
+    if busy != _threadpool_seen[0]:
+        THREADPOOL_BUSY.set(busy)
+        _threadpool_seen[0] = busy
+    if size != _threadpool_seen[1]:
+        THREADPOOL_SIZE.set(size)
+        _threadpool_seen[1] = size
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metrics of this process, or of every worker when PROMETHEUS_MULTIPROC_DIR is set"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int):
+    """Drop a stopped worker's live gauges"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+class MetricsMiddleware:
+    """Per-route latency histograms, in-flight requests and threadpool saturation"""
+
+    def __init__(self, app):
+        self.app = app
+        # Labelled children are looked up once per (method, route, status), not per request
+        self._children = {}
+
+    def _observers(self, method: str, path: str, status: int):
+        key = (method, path, status)
+        observers = self._children.get(key)
+        if observers is None:
+            observers = self._children[key] = (
+                REQUEST_DURATION.labels(method, path, str(status)).observe,
+                SIMULATED_DB_DURATION.labels(path).observe,
+                HANDLER_DURATION.labels(path).observe,
+            )
+        return observers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        # Normally started by TimingMiddleware; the simulated delay is read from its `db` phase
+        timing = _request_timing.get()
+        token = None
+        if timing is None:
+            timing = RequestTiming()
+            token = _request_timing.set(timing)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        update_threadpool()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            update_threadpool()
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            observe_request, observe_simulated_db, observe_handler = self._observers(scope["method"], path, status)
+            observe_request(elapsed)
+            simulated_db = timing.phases.get("db", 0.0)
+            observe_simulated_db(simulated_db)
+            observe_handler(max(elapsed - simulated_db, 0.0))
+            if token is not None:
+                _request_timing.reset(token)
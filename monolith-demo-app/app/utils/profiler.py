@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.utils.timing import RequestTiming
+
+# Requests running longer than this many milliseconds get their stacks sampled; 0 turns the profiler off
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 0))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 10))
+PROFILE_MAX_STACKS = int(os.getenv("PROFILE_MAX_STACKS", 50))
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def thread_stack(frame) -> List[str]:
+    """Labels of a thread's frames, outermost first"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def await_chain(coro) -> List[str]:
+    """Labels of a suspended coroutine and everything it awaits, outermost first"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+
+class SlowRequestProfiler:
+    """Samples the stacks of requests that have run longer than a threshold.
+
+    A daemon thread wakes every ``interval`` seconds and, for each in-flight
+    request past ``threshold``, records where it is: the await chain of its
+    task when it is suspended (e.g. in ``asyncio.sleep`` or waiting for a
+    thread), the event loop thread's stack when it is running, and the stack
+    of every threadpool thread working for it. Samples are aggregated as
+    collapsed stacks (``a;b;c`` -> count, the flame graph input format).
+    Requests that finish under the threshold are never sampled, so the cost
+    in production is one dict insert and delete per request.
+    """
+
+    def __init__(self, threshold: float, interval: float = 0.01, max_stacks: int = 50):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._active: Dict[int, RequestTiming] = {}
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def register(self, timing: RequestTiming):
+        """Track a request; called on the event loop at the start of the request"""
+        timing.task = asyncio.current_task()
+        self._loop_thread = threading.get_ident()
+        self._active[id(timing)] = timing
+        # Started lazily, so each forked worker runs its own sampler
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+
+    def unregister(self, timing: RequestTiming):
+        self._active.pop(id(timing), None)
+
+    def report(self, timing: RequestTiming) -> Dict[str, Any]:
+        stacks = sorted(timing.samples.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": sum(timing.samples.values()),
+            "stacks": dict(stacks[:self.max_stacks]),
+        }
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            slow = [timing for timing in list(self._active.values()) if now - timing.started >= self.threshold]
+            if not slow:
+                continue
+            frames = sys._current_frames()
+            for timing in slow:
+                try:
+                    self._sample(timing, frames)
+                except (RuntimeError, ValueError):
+                    # The request moved on while we looked at it; skip this sample
+                    continue
+
+    def _sample(self, timing: RequestTiming, frames: Dict[int, Any]):
+        stacks = []
+        coro = timing.task.get_coro() if timing.task is not None else None
+        if coro is not None and getattr(coro, "cr_running", False):
+            loop_frame = frames.get(self._loop_thread)
+            if loop_frame is not None:
+                stacks.append(thread_stack(loop_frame))
+        elif coro is not None:
+            stacks.append(await_chain(coro))
+        for thread in tuple(timing.threads):
+            frame = frames.get(thread)
+            if frame is not None:
+                stacks.append(["[threadpool]"] + thread_stack(frame))
+        for stack in stacks:
+            if stack:
+                key = ";".join(stack)
+                timing.samples[key] = timing.samples.get(key, 0) + 1
+
+
+def create_profiler() -> Optional[SlowRequestProfiler]:
+    """The profiler configured by PROFILE_SLOW_MS, or None when it is off"""
+    if PROFILE_SLOW_MS <= 0:
+        return None
+    return SlowRequestProfiler(PROFILE_SLOW_MS / 1000, PROFILE_INTERVAL_MS / 1000, PROFILE_MAX_STACKS)
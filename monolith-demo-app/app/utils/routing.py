@@ -0,0 +1,21 @@
+from typing import Any, List, Optional
+
+
+class RouteMatcher:
+    """Find the route the router will pick for a request, from middleware that runs before routing"""
+
+    def __init__(self):
+        self._routes: Optional[List[Any]] = None
+
+    def match(self, scope) -> Optional[Any]:
+        if self._routes is None:
+            # The app is only reachable from a request scope, so routes are resolved on first use
+            self._routes = [route for route in scope["app"].routes if hasattr(route, "path_regex")]
+        path, method = scope["path"], scope["method"]
+        for route in self._routes:
+            if route.path_regex.match(path):
+                methods = getattr(route, "methods", None)
+                if methods is not None and method not in methods:
+                    continue
+                return route
+        return None
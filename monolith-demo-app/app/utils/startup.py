@@ -0,0 +1,190 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+
+class Initializer:
+    """One startup step: an async callable plus the names of the steps it needs first"""
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[Any]], depends_on: Sequence[str] = (),
+                 critical: bool = True, shared: bool = False):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        # Readiness waits for critical steps only; the rest finish in the background
+        self.critical = critical
+        # Shared steps can run once in a prefork master and be inherited by every worker
+        self.shared = shared
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.status = "pending"
+        self.error: Optional[str] = None
+
+
+class Startup:
+    """Run initializers as soon as their dependencies are done, independent ones concurrently.
+
+    ``start`` returns once every critical initializer (and so everything it
+    depends on) has finished; non-critical ones keep running as tasks and are
+    awaited by ``wait_all`` or cancelled by ``cancel``. With ``parallel=False``
+    the steps run one at a time in dependency order and all of them gate
+    readiness, like the original sequential startup.
+
+    ``run_shared`` runs the ``shared`` initializers ahead of time (in the prefork
+    master); ``start`` then only runs what is still pending.
+    """
+
+    def __init__(self, parallel: bool = True):
+        self.parallel = parallel
+        self.initializers: Dict[str, Initializer] = {}
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._listeners: List[Callable[[Initializer], None]] = []
+
+    def add(self, name: str, run: Callable[[], Awaitable[Any]], depends_on: Sequence[str] = (),
+            critical: bool = True, shared: bool = False) -> Initializer:
+        if name in self.initializers:
+            raise ValueError(f"Initializer {name} is already registered")
+        unknown = [dependency for dependency in depends_on if dependency not in self.initializers]
+        if unknown:
+            # Dependencies must be registered first, which also rules out cycles
+            raise ValueError(f"Initializer {name} depends on unknown initializers: {', '.join(unknown)}")
+        if shared and not all(self.initializers[dependency].shared for dependency in depends_on):
+            raise ValueError(f"Shared initializer {name} can only depend on shared initializers")
+        initializer = self.initializers[name] = Initializer(name, run, depends_on, critical, shared)
+        return initializer
+
+    def add_listener(self, listener: Callable[[Initializer], None]):
+        """Called with each initializer as it finishes, fails or is skipped"""
+        self._listeners.append(listener)
+
+    def _pending(self) -> List[str]:
+        return [name for name, initializer in self.initializers.items() if initializer.status == "pending"]
+
+    def _gating(self) -> List[str]:
+        """Pending critical initializers plus everything they transitively depend on"""
+        if not self.parallel:
+            return self._pending()
+        needed: Dict[str, None] = {}
+        pending = [name for name, initializer in self.initializers.items() if initializer.critical]
+        while pending:
+            name = pending.pop()
+            if name not in needed and self.initializers[name].status == "pending":
+                needed[name] = None
+                pending.extend(self.initializers[name].depends_on)
+        return list(needed)
+
+    async def _run(self, initializer: Initializer):
+        try:
+            if self.parallel:
+                # Dependencies without a task already ran in the prefork master
+                await asyncio.gather(*(self._tasks[name] for name in initializer.depends_on if name in self._tasks))
+            else:
+                # Registration order is a valid topological order
+                order = list(self._tasks)
+                position = order.index(initializer.name)
+                if position:
+                    await self._tasks[order[position - 1]]
+        except Exception:
+            initializer.status = "skipped"
+            initializer.error = "a dependency failed"
+            self._finished(initializer)
+            raise
+        initializer.started_at = time.perf_counter()
+        initializer.status = "running"
+        try:
+            await initializer.run()
+            initializer.status = "done"
+        except asyncio.CancelledError:
+            initializer.status = "cancelled"
+            raise
+        except Exception as e:
+            initializer.status = "failed"
+            initializer.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            initializer.finished_at = time.perf_counter()
+            self._finished(initializer)
+
+    def _finished(self, initializer: Initializer):
+        for listener in self._listeners:
+            listener(initializer)
+
+    async def run_shared(self):
+        """Run the shared initializers to completion, before any worker is forked"""
+        shared = [initializer for initializer in self.initializers.values() if initializer.shared]
+        self._tasks = {}
+        for initializer in shared:
+            self._tasks[initializer.name] = asyncio.create_task(self._run(initializer), name=f"startup:{initializer.name}")
+        try:
+            await asyncio.gather(*self._tasks.values())
+        finally:
+            # The tasks belong to the master's event loop; workers start with a clean slate
+            self._tasks = {}
+
+    async def start(self):
+        """Start every pending initializer and return once the critical ones are done"""
+        self.started_at = time.perf_counter()
+        gating_names = self._gating()
+        for name in self._pending():
+            self._tasks[name] = asyncio.create_task(self._run(self.initializers[name]), name=f"startup:{name}")
+        background = [task for name, task in self._tasks.items() if name not in gating_names]
+        for task in background:
+            # Failures of background steps are recorded in the report, not raised
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        gating = [self._tasks[name] for name in gating_names]
+        try:
+            await asyncio.gather(*gating)
+        except BaseException:
+            self.cancel()
+            raise
+        self.ready_at = time.perf_counter()
+        if not background:
+            self.completed_at = self.ready_at
+        else:
+            asyncio.create_task(self._complete(background))
+
+    async def _complete(self, background: List["asyncio.Task[None]"]):
+        await asyncio.gather(*background, return_exceptions=True)
+        self.completed_at = time.perf_counter()
+
+    async def wait_all(self):
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+
+    def report(self) -> Dict[str, Any]:
+        """Per-phase timings in seconds, relative to the start of startup.
+
+        Shared phases that ran in the prefork master have negative offsets.
+        """
+
+        def offset(moment: Optional[float]) -> Optional[float]:
+            return round(moment - self.started_at, 3) if moment is not None and self.started_at is not None else None
+
+        phases = []
+        for initializer in self.initializers.values():
+            duration = None
+            if initializer.started_at is not None and initializer.finished_at is not None:
+                duration = round(initializer.finished_at - initializer.started_at, 3)
+            phases.append({
+                "name": initializer.name,
+                "depends_on": list(initializer.depends_on),
+                "critical": initializer.critical,
+                "shared": initializer.shared,
+                "status": initializer.status,
+                "started_at": offset(initializer.started_at),
+                "finished_at": offset(initializer.finished_at),
+                "duration": duration,
+                "error": initializer.error,
+            })
+        return {
+            "parallel": self.parallel,
+            "ready_after": offset(self.ready_at),
+            "completed_after": offset(self.completed_at),
+            "phases": phases,
+        }
@@ -0,0 +1,218 @@
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Set, Tuple, TypeVar
+
+from fastapi.routing import APIRoute
+
+from app.utils.metadata import get_pod_name
+
+T = TypeVar("T")
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"
+REQUEST_LOG = os.getenv("REQUEST_LOG", "false").lower() == "true"
+POD_NAME = get_pod_name()
+
+
+class RequestTiming:
+    """Time spent in each phase of one request, shared by everything that runs on its behalf"""
+
+    __slots__ = ("started", "phases", "endpoint", "route", "task", "threads", "samples")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        # (start, end) of the endpoint function, to split FastAPI's parsing from its serialization
+        self.endpoint: Optional[Tuple[float, float]] = None
+        # "METHOD /route/{template}" of the matched route
+        self.route: Optional[str] = None
+        # Where the request runs, for the slow request profiler
+        self.task: Optional[asyncio.Task] = None
+        self.threads: Set[int] = set()
+        self.samples: Dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _request_timing.get()
+
+
+def record_phase(phase: str, seconds: float):
+    """Attribute seconds of phase to the current request, if there is one"""
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.add(phase, seconds)
+
+
+def measured(phase: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call func and attribute its duration to phase, minus the phases recorded inside it,
+    so phases never overlap and add up to at most the request's total"""
+    timing = _request_timing.get()
+    if timing is None:
+        return func(*args, **kwargs)
+    nested = sum(timing.phases.values())
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = sum(timing.phases.values()) - nested
+        timing.add(phase, max(elapsed - nested, 0.0))
+
+
+def in_thread(func: Callable[..., T], *args: Any) -> Callable[[], T]:
+    """func(*args) for the threadpool, recording how long it waited for a thread as the `queue` phase"""
+    timing = _request_timing.get()
+    if timing is None:
+        return functools.partial(func, *args)
+    submitted = time.perf_counter()
+
+    def run() -> T:
+        timing.add("queue", time.perf_counter() - submitted)
+        thread = threading.get_ident()
+        timing.threads.add(thread)
+        try:
+            return func(*args)
+        finally:
+            timing.threads.discard(thread)
+    return run
+
+
+def timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint so the request's timing knows when it started and finished"""
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timing = _request_timing.get()
+                if timing is not None:
+                    timing.endpoint = (start, time.perf_counter())
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timing = _request_timing.get()
+                if timing is not None:
+                    timing.endpoint = (start, time.perf_counter())
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that splits FastAPI's own work into `parse` (reading and validating the
+    request before the endpoint runs) and `serialize` (response model validation and
+    JSON rendering after it returns)"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            timing = _request_timing.get()
+            if timing is not None:
+                timing.route = f"{request.method} {self.path}"
+            response = await handler(request)
+            if timing is not None and timing.endpoint is not None:
+                endpoint_start, endpoint_end = timing.endpoint
+                timing.add("parse", endpoint_start - start)
+                timing.add("serialize", time.perf_counter() - endpoint_end)
+            return response
+        return timed_handler
+
+
+def log_event(event: Dict[str, Any]):
+    print(json.dumps(event, separators=(",", ":")), flush=True)
+
+
+class TimingMiddleware:
+    """Per-request phase timings, reported as a `Server-Timing` header and a JSON request log.
+
+    Each request gets an `x-request-id` (Envoy's, or a new one), echoed in the
+    response and in its log line so the line joins Envoy's JSON access log. A
+    SlowRequestProfiler, when given, samples the stacks of requests that run
+    longer than its threshold and logs them as one profile per slow request.
+    """
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timing = RequestTiming()
+        token = _request_timing.set(timing)
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                if SERVER_TIMING:
+                    total = time.perf_counter() - timing.started
+                    headers.append((b"server-timing", timing.server_timing(total).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if self.profiler is not None:
+            self.profiler.register(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - timing.started
+            profiled = False
+            if self.profiler is not None:
+                self.profiler.unregister(timing)
+                profiled = bool(timing.samples) and duration >= self.profiler.threshold
+            if REQUEST_LOG or profiled:
+                # Field names follow Envoy's JSON access log so the two join on request_id
+                route = scope.get("route")
+                event = {
+                    "request_id": request_id,
+                    "request_method": scope["method"],
+                    "path": scope["path"],
+                    "route": route.path if route is not None else None,
+                    "response_code": status,
+                    "duration": round(duration * 1000, 3),
+                    "phases": {phase: round(seconds * 1000, 3) for phase, seconds in timing.phases.items()},
+                    "worker": os.getpid(),
+                    "pod_name": POD_NAME,
+                }
+                if REQUEST_LOG:
+                    log_event({"event": "request", **event})
+                if profiled:
+                    log_event({"event": "slow_request_profile", **event, **self.profiler.report(timing)})
+            _request_timing.reset(token)
@@ -0,0 +1,85 @@
+"""Overload one worker with and without adaptive admission control.
+
+--clients closed-loop clients hit --path for --duration seconds against a
+single uvicorn worker in EXECUTION_MODE=sync. In that mode every in-flight
+request holds one of the ~40 threadpool threads, so excess requests queue
+and latency climbs for everyone. A separate probe polls /health throughout.
+Clients honour Retry-After on 429/503, unless --no-retry-after makes them
+retry immediately the way siege does.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_admission --clients 300 --duration 20 --path /projects/1
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.httpclient import request
+from benchmarks.server import run_server
+
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(base_url: str, path: str, clients: int, duration: float, honor_retry_after: bool) -> dict:
+    ok, shed, errors, health = [], 0, 0, []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal shed, errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await request('GET', base_url + path, timeout=60.0)
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+                continue
+            if response.status in (429, 503):
+                shed += 1
+                if honor_retry_after:
+                    await asyncio.sleep(float(response.headers.get('retry-after', 1)))
+            elif response.status >= 500:
+                errors += 1
+            else:
+                ok.append(time.perf_counter() - start)
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await request('GET', base_url + '/health', timeout=60.0)
+            except (OSError, asyncio.TimeoutError):
+                pass
+            health.append(time.perf_counter() - start)
+            await asyncio.sleep(0.2)
+
+    await asyncio.gather(probe(), *(client() for _ in range(clients)))
+    return {
+        'goodput': len(ok) / duration, 'p50': percentile(ok, 0.5), 'p99': percentile(ok, 0.99),
+        'shed': shed, 'errors': errors, 'health_p99': percentile(health, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--path', default='/projects/1')
+    parser.add_argument('--no-retry-after', action='store_true')
+    args = parser.parse_args()
+
+    print(f"{'admission':<11}{'ok/s':>8}{'p50 s':>8}{'p99 s':>8}{'shed':>8}{'errors':>8}{'/health p99 s':>15}")
+    for admission in (False, True):
+        env = {'EXECUTION_MODE': 'sync', 'ADMISSION_CONTROL': str(admission).lower()}
+        with run_server(env=env) as base_url:
+            r = asyncio.run(run(base_url, args.path, args.clients, args.duration, not args.no_retry_after))
+        print(f"{'on' if admission else 'off':<11}{r['goodput']:>8.1f}{r['p50']:>8.2f}{r['p99']:>8.2f}"
+              f"{r['shed']:>8}{r['errors']:>8}{r['health_p99']:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
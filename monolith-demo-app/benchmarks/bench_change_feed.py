@@ -0,0 +1,166 @@
+"""Dashboards kept fresh by polling the lists vs. following the change feed.
+
+--clients dashboards watch a generated dataset (benchmarks.dataset) while a
+writer creates --write-rate companies per second, with simulated delays off.
+  * poll: every dashboard GETs /companies and /projects?limit=100 every
+          --interval seconds, like the high-frequency entries of urls-*.txt
+  * feed: every dashboard holds one `GET /changes` Server-Sent Events stream
+For each mode the benchmark reports the requests the server answered, its CPU
+time per second of wall clock (read from /proc), the bytes the dashboards
+received, and staleness: how long after a write was acknowledged each
+dashboard first saw its version (X-Data-Version on a list, the id of an event).
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_change_feed --clients 50 --duration 20 --interval 2 --write-rate 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.bench_coalescing import COMPANY, percentile
+from benchmarks.bench_compression import cpu_seconds
+from benchmarks.dataset import dataset_dir
+from benchmarks.httpclient import request
+from benchmarks.server import run_server_process
+
+POLL_PATHS = ['/companies', '/projects?limit=100']
+
+
+class Dashboard:
+    """When this client first saw each data version, and what that cost it"""
+
+    def __init__(self):
+        self.seen: List[Tuple[int, float]] = []
+        self.version = -1
+        self.bytes = 0
+        self.requests = 0
+
+    def saw(self, version: int):
+        if version > self.version:
+            self.version = version
+            self.seen.append((version, time.perf_counter()))
+
+
+async def poll(base_url: str, dashboard: Dashboard, interval: float, stop: asyncio.Event):
+    while not stop.is_set():
+        for path in POLL_PATHS:
+            response = await request('GET', base_url + path, headers={'Accept-Encoding': 'gzip'})
+            dashboard.requests += 1
+            dashboard.bytes += len(response.body)
+            dashboard.saw(int(response.headers.get('x-data-version', -1)))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def follow(base_url: str, dashboard: Dashboard, stop: asyncio.Event):
+    parts = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    writer.write(f'GET /changes HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: text/event-stream\r\n\r\n'.encode())
+    await writer.drain()
+    dashboard.requests += 1
+    pending = b''
+    try:
+        while not stop.is_set():
+            try:
+                data = await asyncio.wait_for(reader.read(65536), 0.5)
+            except asyncio.TimeoutError:
+                continue
+            if not data:
+                return
+            dashboard.bytes += len(data)
+            pending += data
+            *lines, pending = pending.split(b'\n')
+            for line in lines:
+                if line.startswith(b'id: '):
+                    dashboard.saw(int(line[4:]))
+    finally:
+        writer.close()
+
+
+async def write(base_url: str, rate: float, stop: asyncio.Event, acks: Dict[int, float]):
+    while not stop.is_set():
+        response = await request('POST', base_url + '/companies', body=json.dumps(COMPANY).encode(),
+                                 headers={'Content-Type': 'application/json'})
+        acked = time.perf_counter()
+        assert response.status == 200, response.body
+        # A single writer, so the version right after the write is the write's own
+        version = (await request('GET', base_url + '/changes')).json()['version']
+        acks[version] = acked
+        try:
+            await asyncio.wait_for(stop.wait(), 1 / rate)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(base_url: str, pid: int, mode: str, clients: int, duration: float, interval: float,
+              write_rate: float) -> dict:
+    stop, acks = asyncio.Event(), {}
+    dashboards = [Dashboard() for _ in range(clients)]
+    if mode == 'poll':
+        watchers = [poll(base_url, dashboard, interval, stop) for dashboard in dashboards]
+    else:
+        watchers = [follow(base_url, dashboard, stop) for dashboard in dashboards]
+    cpu, start = cpu_seconds(pid), time.perf_counter()
+    tasks = [asyncio.create_task(watcher) for watcher in watchers]
+    await asyncio.sleep(1)
+    writer = asyncio.create_task(write(base_url, write_rate, stop, acks))
+    await asyncio.sleep(duration)
+    # Give the last write one poll interval to show up
+    await asyncio.sleep(interval if mode == 'poll' else 1)
+    stop.set()
+    await asyncio.gather(writer, *tasks)
+    elapsed, cpu = time.perf_counter() - start, cpu_seconds(pid) - cpu
+
+    staleness = []
+    for dashboard in dashboards:
+        for version, acked in acks.items():
+            seen = next((at for seen_version, at in dashboard.seen if seen_version >= version), None)
+            if seen is not None:
+                staleness.append(max(seen - acked, 0.0))
+    return {
+        'requests': sum(dashboard.requests for dashboard in dashboards),
+        'cpu_ms_per_s': cpu / elapsed * 1000,
+        'kb': sum(dashboard.bytes for dashboard in dashboards) / 1024,
+        'p50': percentile(staleness, 0.5) if staleness else float('nan'),
+        'p99': percentile(staleness, 0.99) if staleness else float('nan'),
+        'writes': len(acks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--companies', type=int, default=100)
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=20, help='seconds of writes per mode')
+    parser.add_argument('--interval', type=float, default=2, help='seconds between polls of one dashboard')
+    parser.add_argument('--write-rate', type=float, default=1, help='writes per second')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'bench-datasets'))
+    args = parser.parse_args()
+
+    source = dataset_dir(args.cache_dir, args.companies, args.projects)
+    print(f"{'mode':<6}{'requests':>10}{'CPU ms/s':>10}{'KiB recv':>10}{'writes':>8}{'stale p50 s':>13}{'stale p99 s':>13}")
+    for mode in ('poll', 'feed'):
+        data_dir = tempfile.mkdtemp(prefix='bench-change-feed-')
+        shutil.copytree(source, data_dir, dirs_exist_ok=True)
+        env = {'DATA_DIR': data_dir, 'SIMULATED_DELAY_SCALE': '0', 'METRICS_ENABLED': 'false'}
+        try:
+            with run_server_process(env) as (base_url, process):
+                r = asyncio.run(run(base_url, process.pid, mode, args.clients, args.duration,
+                                    args.interval, args.write_rate))
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        print(f"{mode:<6}{r['requests']:>10}{r['cpu_ms_per_s']:>10.0f}{r['kb']:>10.0f}{r['writes']:>8}"
+              f"{r['p50']:>13.3f}{r['p99']:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Fan-in of identical GETs with and without single-flight coalescing.
+
+Each wave fires --concurrency identical requests at once, like siege clients
+hitting /companies together. A write between waves bumps the data version,
+so every wave starts with a cold response cache. The benchmark reports
+latency percentiles and the simulated database time spent, taken from
+/metrics, which stands in for backend load.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_coalescing --concurrency 200 --waves 5 --path /companies
+"""
+import argparse
+import asyncio
+import json
+import re
+import shutil
+import tempfile
+import time
+
+from benchmarks.httpclient import request
+from benchmarks.server import APP_DIR, run_server
+
+COMPANY = {'name': 'Bench Co', 'type': 'General Contractor', 'founded': 2000, 'headquarters': 'Nowhere',
+           'specialties': [], 'employee_count': 1, 'annual_revenue': 1, 'website': 'https://example.com',
+           'phone': '555-0100', 'email': 'bench@example.com'}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def simulated_db_seconds(metrics: str) -> float:
+    return sum(float(value) for value in re.findall(r'^app_request_simulated_db_seconds_sum\{[^}]*\} (\S+)', metrics, re.M))
+
+
+async def run(base_url: str, path: str, concurrency: int, waves: int) -> dict:
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            response = await request('GET', base_url + path, timeout=120.0)
+            if response.status >= 500:
+                errors += 1
+        except (OSError, asyncio.TimeoutError):
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(waves):
+        response = await request('POST', base_url + '/companies', body=json.dumps(COMPANY).encode(),
+                                 headers={'Content-Type': 'application/json'})
+        assert response.status == 200, response.body
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    metrics = (await request('GET', base_url + '/metrics')).body.decode()
+    return {
+        'p50': percentile(latencies, 0.5), 'p99': percentile(latencies, 0.99), 'max': max(latencies),
+        'errors': errors, 'db_seconds': simulated_db_seconds(metrics),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--waves', type=int, default=5)
+    parser.add_argument('--path', default='/companies')
+    parser.add_argument('--route', default=None, help='route template to coalesce (default: --path)')
+    args = parser.parse_args()
+
+    print(f"{'coalescing':<12}{'requests':>9}{'p50 s':>8}{'p99 s':>8}{'max s':>8}{'errors':>8}{'sim. DB s':>11}")
+    for coalesce in (False, True):
+        data_dir = tempfile.mkdtemp(prefix='bench-coalescing-')
+        shutil.copytree(f'{APP_DIR}/app/models/data', data_dir, dirs_exist_ok=True)
+        env = {'DATA_DIR': data_dir, 'COALESCE_ROUTES': (args.route or args.path.split('?')[0]) if coalesce else ''}
+        try:
+            with run_server(env=env) as base_url:
+                r = asyncio.run(run(base_url, args.path, args.concurrency, args.waves))
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        print(f"{'on' if coalesce else 'off':<12}{args.concurrency * args.waves:>9}{r['p50']:>8.2f}{r['p99']:>8.2f}"
+              f"{r['max']:>8.2f}{r['errors']:>8}{r['db_seconds']:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
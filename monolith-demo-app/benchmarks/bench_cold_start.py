@@ -0,0 +1,120 @@
+"""Cold start of a fresh worker, with and without FAST_START, checked against a budget.
+
+For each mode, --runs times:
+  * import: `python -X importtime -c "import app.main"` in a fresh
+    interpreter, summed per top-level package (fastapi, pydantic, rich, app,
+    ...) from the self times of every module it imported
+  * ready: process start until /health answers 200 (uvicorn, one worker)
+  * first data: process start until a data endpoint has answered 200; the first
+    one loads the store, unless FAST_START already did in the background
+    (only with --lifespan, which also runs the simulated slow start)
+Medians are reported, with simulated request delays off. With
+--budget-import-ms or --budget-first-data-ms the benchmark exits 1 when any
+measured mode goes over, so a CI job can catch cold start regressions.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --modes fast --budget-import-ms 600 --budget-first-data-ms 1500
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.dataset import dataset_dir
+from benchmarks.server import APP_DIR, run_server_process
+
+MODES = {'default': {'FAST_START': 'false'}, 'fast': {'FAST_START': 'true'}}
+DATA_PATH = '/companies?limit=1&expand=projects'
+
+
+def import_times(env: Dict[str, str]) -> Dict[str, float]:
+    """Milliseconds spent importing each top-level package for `import app.main`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app.main'], cwd=APP_DIR,
+                            env={**os.environ, **env}, capture_output=True, text=True, check=True)
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+    return packages
+
+
+def cold_start(env: Dict[str, str], lifespan: bool) -> Dict[str, float]:
+    start = time.perf_counter()
+    with run_server_process(env=env, lifespan=lifespan, ready_path='/ready' if lifespan else '/health') as (base_url, _):
+        ready = time.perf_counter() - start
+        response = httpx.get(base_url + DATA_PATH, timeout=60.0)
+        assert response.status_code == 200, response.text
+        first_data = time.perf_counter() - start
+    return {'ready': ready * 1000, 'first_data': first_data * 1000}
+
+
+def measure(env: Dict[str, str], runs: int, lifespan: bool) -> dict:
+    imports: List[Dict[str, float]] = [import_times(env) for _ in range(runs)]
+    starts = [cold_start(env, lifespan) for _ in range(runs)]
+    packages = {package: statistics.median(run.get(package, 0.0) for run in imports)
+                for package in set().union(*imports)}
+    return {
+        'import': statistics.median(sum(run.values()) for run in imports),
+        'packages': packages,
+        'ready': statistics.median(run['ready'] for run in starts),
+        'first_data': statistics.median(run['first_data'] for run in starts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='default,fast', help='comma separated: default, fast')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--lifespan', action='store_true', help='run the simulated slow start too')
+    parser.add_argument('--companies', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=50000)
+    parser.add_argument('--top', type=int, default=8, help='packages listed per mode')
+    parser.add_argument('--budget-import-ms', type=float, help='fail when importing app.main takes longer')
+    parser.add_argument('--budget-first-data-ms', type=float, help='fail when the first data response takes longer')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'bench-datasets'))
+    args = parser.parse_args()
+
+    source = dataset_dir(args.cache_dir, args.companies, args.projects)
+    results = {}
+    for mode in args.modes.split(','):
+        data_dir = tempfile.mkdtemp(prefix='bench-cold-start-')
+        shutil.copytree(source, data_dir, dirs_exist_ok=True)
+        env = {**MODES[mode], 'DATA_DIR': data_dir, 'SIMULATED_DELAY_SCALE': '0', 'METRICS_ENABLED': 'false'}
+        try:
+            results[mode] = measure(env, args.runs, args.lifespan)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{'mode':<9}{'import ms':>11}{'ready ms':>10}{'first data ms':>15}")
+    for mode, r in results.items():
+        print(f"{mode:<9}{r['import']:>11.0f}{r['ready']:>10.0f}{r['first_data']:>15.0f}")
+    for mode, r in results.items():
+        top = sorted(r['packages'].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f"\n{mode} import breakdown (ms, self time per top-level package)")
+        for package, ms in top:
+            print(f"  {package:<24}{ms:>8.1f}")
+
+    over = []
+    for mode, r in results.items():
+        if args.budget_import_ms is not None and r['import'] > args.budget_import_ms:
+            over.append(f"{mode}: import {r['import']:.0f} ms > {args.budget_import_ms:.0f} ms")
+        if args.budget_first_data_ms is not None and r['first_data'] > args.budget_first_data_ms:
+            over.append(f"{mode}: first data {r['first_data']:.0f} ms > {args.budget_first_data_ms:.0f} ms")
+    if over:
+        print('\nCold start over budget:\n  ' + '\n  '.join(over))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
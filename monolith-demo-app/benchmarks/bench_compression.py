@@ -0,0 +1,94 @@
+"""Bytes on the wire and server CPU per request, with and without compression.
+
+The app serves a generated dataset (benchmarks.dataset) with simulated delays
+off. For every path and content coding the benchmark sends --requests GETs and
+reports the mean response size (headers + body) and the CPU time the server
+process spent per request, read from /proc. Three setups are compared:
+  * off:          COMPRESSION=false, identity only
+  * precompressed: compression on, each coding computed once per cache entry
+  * per-request:  RESPONSE_CACHE=false, so every response is encoded and
+                  compressed again, like compressing in a proxy or middleware;
+                  its identity rows show how much of that is the JSON encoding
+br and zstd only show up when the brotli / zstandard packages are installed.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_compression --companies 100 --projects 5000 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from app.utils.compression import CODECS
+from benchmarks.dataset import FIRST_COMPANY_ID, FIRST_PROJECT_ID, dataset_dir
+from benchmarks.httpclient import request
+from benchmarks.server import run_server_process
+
+PATHS = [
+    '/projects?limit=1000',
+    '/projects?limit=100',
+    '/companies',
+    f'/companies/{FIRST_COMPANY_ID}/projects',
+    f'/projects/{FIRST_PROJECT_ID}',
+]
+
+
+def cpu_seconds(pid: int) -> float:
+    """User + system CPU time of a process"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+async def measure(base_url: str, pid: int, path: str, encoding: str, requests: int, concurrency: int) -> dict:
+    headers = {'Accept-Encoding': encoding}
+    first = await request('GET', base_url + path, headers=headers)
+    assert first.status == 200, first.body
+    sizes, queue = [], list(range(requests))
+
+    async def client():
+        while queue:
+            queue.pop()
+            response = await request('GET', base_url + path, headers=headers)
+            header_bytes = sum(len(name) + len(value) + 4 for name, value in response.headers.items())
+            sizes.append(header_bytes + len(response.body))
+
+    cpu, start = cpu_seconds(pid), time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed, cpu = time.perf_counter() - start, cpu_seconds(pid) - cpu
+    return {
+        'coding': first.headers.get('content-encoding', 'identity'),
+        'bytes': sum(sizes) / len(sizes),
+        'cpu_ms': cpu / requests * 1000,
+        'rps': requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--companies', type=int, default=100)
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200, help='requests per path and coding')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'bench-datasets'))
+    args = parser.parse_args()
+
+    data_dir = dataset_dir(args.cache_dir, args.companies, args.projects)
+    setups = [
+        ('off', {'COMPRESSION': 'false'}, ['identity']),
+        ('precompressed', {}, ['identity'] + list(CODECS)),
+        ('per-request', {'RESPONSE_CACHE': 'false'}, ['identity'] + list(CODECS)),
+    ]
+    print(f"{'setup':<15}{'path':<30}{'coding':<10}{'bytes/req':>12}{'CPU ms/req':>12}{'req/s':>9}")
+    for name, env, encodings in setups:
+        env = {'DATA_DIR': data_dir, 'SIMULATED_DELAY_SCALE': '0', 'METRICS_ENABLED': 'false', **env}
+        with run_server_process(env) as (base_url, process):
+            for path in PATHS:
+                for encoding in encodings:
+                    r = asyncio.run(measure(base_url, process.pid, path, encoding, args.requests, args.concurrency))
+                    print(f"{name:<15}{path:<30}{r['coding']:<10}{r['bytes']:>12.0f}{r['cpu_ms']:>12.2f}{r['rps']:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Compare EXECUTION_MODE=sync and EXECUTION_MODE=async under the same load.
+
+Fires --concurrency simultaneous requests at one uvicorn worker and reports how
+long the whole wave takes. With sync mode each in-flight /sleep or simulated DB
+delay pins one of the ~40 threadpool threads, so a wave of 500 one-second
+requests takes ~500/40 seconds; in async mode it takes about one second.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_execution_mode --concurrency 500 --path /sleep/1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.httpclient import request
+from benchmarks.server import run_server
+
+
+async def wave(base_url: str, path: str, concurrency: int) -> dict:
+    async def one():
+        start = time.perf_counter()
+        try:
+            response = await request('GET', base_url + path, timeout=120.0)
+            ok = response.status < 500
+        except (OSError, asyncio.TimeoutError):
+            ok = False
+        return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for _, latency in results)
+    return {
+        "seconds": round(elapsed, 2),
+        "ok": sum(ok for ok, _ in results),
+        "p50": round(statistics.median(latencies), 3),
+        "p99": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--path', default='/sleep/1')
+    parser.add_argument('--modes', default='sync,async')
+    args = parser.parse_args()
+
+    for mode in args.modes.split(','):
+        with run_server(env={'EXECUTION_MODE': mode}) as base_url:
+            result = asyncio.run(wave(base_url, args.path, args.concurrency))
+        print(f"{mode:<6} {args.concurrency} x GET {args.path}: {result['seconds']}s total, "
+              f"{result['ok']} ok, p50 {result['p50']}s, p99 {result['p99']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Per-request cost of MetricsMiddleware on the hot path.
+
+Drives the ASGI app in-process (no sockets, no simulated delay) with GET
+/health, once through the full middleware stack and once with the metrics
+middleware bypassed, and reports microseconds per request for both.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from app.main import app
+from app.utils import metrics
+
+
+async def drive(path: str, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--rounds", type=int, default=5, help="alternating runs; the fastest of each is kept")
+    args = parser.parse_args()
+
+    asyncio.run(drive(args.path, 1000))  # build the middleware stack and warm up
+    results = {}
+    for enabled in (False, True) * args.rounds:
+        metrics.METRICS_ENABLED = enabled
+        results.setdefault(enabled, []).append(asyncio.run(drive(args.path, args.requests)))
+    off, on = min(results[False]), min(results[True])
+    print(f"GET {args.path}: {off:.1f} us/request without metrics, {on:.1f} us/request with metrics "
+          f"(+{on - off:.1f} us, {(on - off) / off * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
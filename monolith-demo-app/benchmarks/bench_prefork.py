@@ -0,0 +1,113 @@
+"""Compare the prefork server (python -m app.server) with `uvicorn --workers` (what `fastapi run` does).
+
+For each server it measures:
+  * time to first request: process start until /health answers 200
+  * per-worker memory after a warm-up that makes every worker load the data:
+    RSS (resident, shared pages counted in full), PSS (shared pages split
+    between the processes sharing them) and USS (pages only this worker holds)
+  * time to replace a worker: SIGKILL one and wait until a new pid answers
+
+PSS and USS are what copy-on-write sharing lowers; RSS barely moves.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_prefork --workers 4
+    python -m benchmarks.bench_prefork --workers 4 --lifespan   # include the simulated slow start
+"""
+import argparse
+import asyncio
+import os
+import signal
+import time
+from typing import Dict, Set
+
+from benchmarks.httpclient import request
+from benchmarks.server import run_server_process, worker_pids
+
+WARMUP_PATHS = ['/companies', '/projects?limit=100', '/companies/stats', '/projects/1']
+
+
+def memory(pid: int) -> Dict[str, float]:
+    """RSS, PSS and USS in MiB from smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': values.get('Rss', 0.0),
+        'pss': values.get('Pss', 0.0),
+        'uss': values.get('Private_Clean', 0.0) + values.get('Private_Dirty', 0.0),
+    }
+
+
+async def warm_up(base_url: str, rounds: int, concurrency: int):
+    """Fresh connections spread the requests over every worker"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(path: str):
+        async with semaphore:
+            await request('GET', base_url + path)
+
+    await asyncio.gather(*(one(path) for _ in range(rounds) for path in WARMUP_PATHS))
+
+
+async def wait_for_new_worker(base_url: str, old: Set[int], timeout: float = 120.0) -> float:
+    """Seconds until a request is served by a worker pid not in old"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        responses = await asyncio.gather(
+            *(request('GET', base_url + '/startup', timeout=5.0) for _ in range(16)), return_exceptions=True
+        )
+        for response in responses:
+            if not isinstance(response, BaseException) and response.status == 200 and response.json()['worker'] not in old:
+                return time.perf_counter() - start
+        await asyncio.sleep(0.01)
+    raise TimeoutError('no replacement worker answered')
+
+
+def measure(server: str, workers: int, lifespan: bool, data_dir: str, warmup_rounds: int) -> dict:
+    env = {'METRICS_ENABLED': 'false'}
+    if data_dir:
+        env['DATA_DIR'] = data_dir
+    start = time.perf_counter()
+    with run_server_process(env=env, lifespan=lifespan, workers=workers, server=server,
+                            ready_path='/ready' if lifespan else '/health') as (base_url, process):
+        first_request = time.perf_counter() - start
+        asyncio.run(warm_up(base_url, warmup_rounds, concurrency=32))
+        pids = worker_pids(process.pid)
+        per_worker = [memory(pid) for pid in pids]
+        master = memory(process.pid)
+        victim = pids[0]
+        os.kill(victim, signal.SIGKILL)
+        replacement = asyncio.run(wait_for_new_worker(base_url, set(pids)))
+    return {
+        'server': server,
+        'workers': len(pids),
+        'first_request': first_request,
+        'worker_rss': sum(m['rss'] for m in per_worker) / len(per_worker),
+        'worker_pss': sum(m['pss'] for m in per_worker) / len(per_worker),
+        'worker_uss': sum(m['uss'] for m in per_worker) / len(per_worker),
+        'total_pss': sum(m['pss'] for m in per_worker) + master['pss'],
+        'replacement': replacement,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lifespan', action='store_true', help='run the simulated slow start too')
+    parser.add_argument('--data-dir', default='', help='DATA_DIR with a larger dataset')
+    parser.add_argument('--warmup-rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'server':<10}{'workers':>8}{'first req s':>13}{'RSS MiB':>10}{'PSS MiB':>10}"
+          f"{'USS MiB':>10}{'pod PSS MiB':>13}{'replace s':>11}")
+    for server in ('uvicorn', 'prefork'):
+        r = measure(server, args.workers, args.lifespan, args.data_dir, args.warmup_rounds)
+        print(f"{r['server']:<10}{r['workers']:>8}{r['first_request']:>13.2f}{r['worker_rss']:>10.1f}"
+              f"{r['worker_pss']:>10.1f}{r['worker_uss']:>10.1f}{r['total_pss']:>13.1f}{r['replacement']:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Bytes per project for each in-memory representation.
+
+Generated projects (benchmarks.dataset, 4 tasks on average) are held as:
+  * models:   a dict of pydantic Project models (with Task models)
+  * dicts:    a dict of row dicts, as parsed from JSON (the store before
+              ProjectTable)
+  * columnar: a ProjectTable
+  * store:    a MemoryStore, i.e. the ProjectTable plus the secondary
+              indexes, company index and aggregates the app keeps
+Each runs in a fresh process and is measured as the growth of resident
+memory. Rows are generated one at a time and dropped once stored, so their
+memory is reused rather than counted. models and dicts cost the same per
+row at any size, so they run at --baseline-rows to stay within memory.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_project_memory --rows 1000000 --baseline-rows 100000
+"""
+import argparse
+import concurrent.futures
+import gc
+import multiprocessing
+import os
+import time
+
+from benchmarks.dataset import generate_projects
+
+
+def resident_bytes() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure(kind: str, rows: int, companies: int, seed: int) -> dict:
+    from app.models.project import Project
+    from app.services.columnar import ProjectTable
+    from app.services.store import MemoryStore
+
+    gc.collect()
+    start = time.perf_counter()
+    before = resident_bytes()
+    extra = None
+    if kind == 'models':
+        held = {project['id']: Project(**project) for project in generate_projects(companies, rows, 4, seed)}
+    elif kind == 'dicts':
+        held = {project['id']: project for project in generate_projects(companies, rows, 4, seed)}
+    elif kind == 'columnar':
+        held = ProjectTable()
+        for project in generate_projects(companies, rows, 4, seed):
+            held[project['id']] = project
+        extra = held.nbytes()
+    else:
+        held = MemoryStore()
+        held.load([], generate_projects(companies, rows, 4, seed))
+    gc.collect()
+    used = resident_bytes() - before
+    elapsed = time.perf_counter() - start
+    return {'kind': kind, 'rows': rows, 'bytes': used, 'per_row': used / rows, 'columns': extra, 'seconds': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--baseline-rows', type=int, default=100000, help='rows for the models and dicts runs')
+    parser.add_argument('--companies', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'representation':<16}{'rows':>10}{'MiB':>10}{'bytes/project':>15}{'load s':>9}")
+    context = multiprocessing.get_context('spawn')
+    for kind in ('models', 'dicts', 'columnar', 'store'):
+        rows = args.baseline_rows if kind in ('models', 'dicts') else args.rows
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=context) as pool:
+            r = pool.submit(measure, kind, rows, args.companies, args.seed).result()
+        print(f"{kind:<16}{r['rows']:>10}{r['bytes'] / 2 ** 20:>10.1f}{r['per_row']:>15.0f}{r['seconds']:>9.1f}")
+        if r['columns'] is not None:
+            print(f"{'  of which columns':<36}{r['columns'] / r['rows']:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
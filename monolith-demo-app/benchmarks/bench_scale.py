@@ -0,0 +1,260 @@
+"""Time every DataService method and HTTP endpoint across dataset sizes.
+
+For each --sizes entry (COMPANIESxPROJECTS) a dataset is generated with
+benchmarks.dataset (cached under --cache-dir) and copied to a scratch
+DATA_DIR, since writes and journal compaction change it. Then:
+  * in a fresh process: load time, RSS after load, and every DataService
+    method, reads first, then writes, then deletes
+  * unless --no-http: a uvicorn worker with SIMULATED_DELAY_SCALE=0 and the
+    response cache off, timing every endpoint one request at a time, plus the
+    worker's peak RSS
+
+Each case repeats until --iterations or --budget seconds, whichever comes
+first, and at least once. Reported: calls per second, p50 and p99 latency.
+Compare --json outputs of two commits to spot regressions.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_scale --sizes 100x1000,1000x10000,10000x100000
+    python -m benchmarks.bench_scale --sizes 10000x1000000 --budget 5 --json scale.json
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.dataset import FIRST_COMPANY_ID, FIRST_PROJECT_ID, dataset_dir
+from benchmarks.httpclient import request
+from benchmarks.server import run_server_process
+
+COMPANY = {'name': 'Bench Co', 'type': 'General Contractor', 'founded': 2000, 'headquarters': 'Nowhere',
+           'specialties': ['Commercial'], 'employee_count': 1, 'annual_revenue': 1, 'website': 'https://example.com',
+           'phone': '555-0100', 'email': 'bench@example.com'}
+PROJECT = {'name': 'Bench Project', 'company_id': [FIRST_COMPANY_ID], 'status': 'Planning', 'start_date': '2025-01-01',
+           'end_date': '2026-01-01', 'budget': 1000000, 'location': 'Springfield, IL', 'project_type': 'Retail',
+           'square_footage': 10000, 'floors': 2, 'architect': 'Bench Architects',
+           'tasks': [{'id': 1, 'name': 'Site Survey', 'status': 'Not Started', 'completion_date': None}]}
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(name: str, latencies: List[float]) -> Dict[str, Any]:
+    return {'case': name, 'calls': len(latencies), 'per_second': len(latencies) / sum(latencies),
+            'p50': percentile(latencies, 0.5), 'p99': percentile(latencies, 0.99)}
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    companies, _, projects = size.lower().partition('x')
+    return int(companies), int(projects)
+
+
+def peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mib(pid: str = 'self') -> Tuple[float, float]:
+    """Current and peak RSS of a process, from /proc"""
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'VmHWM'):
+                values[name] = int(value.split()[0]) / 1024
+    return values['VmRSS'], values['VmHWM']
+
+
+def service_cases(companies: int, projects: int, rng: random.Random) -> List[Tuple[str, Callable[[Any], Any]]]:
+    """(name, call) for every DataService method; call gets the service"""
+    from app.models.project import ProjectQuery
+
+    def company_id() -> int:
+        return rng.randrange(FIRST_COMPANY_ID, FIRST_COMPANY_ID + companies)
+
+    def project_id() -> int:
+        return rng.randrange(FIRST_PROJECT_ID, FIRST_PROJECT_ID + projects)
+
+    def drain(batches) -> int:
+        return sum(len(batch) for batch in batches)
+
+    created_companies: List[int] = []
+    created_projects: List[int] = []
+    query = ProjectQuery(status=['In Progress'], sort='-budget')
+    return [
+        ('get_companies', lambda s: s.get_companies()),
+        ('get_company', lambda s: s.get_company(company_id())),
+        ('get_company_stats', lambda s: s.get_company_stats(company_id())),
+        ('get_companies_stats', lambda s: s.get_companies_stats()),
+        ('get_company_projects', lambda s: s.get_company_projects(company_id())),
+        ('get_projects', lambda s: s.get_projects()),
+        ('get_projects(company_id)', lambda s: s.get_projects(company_id())),
+        ('get_project', lambda s: s.get_project(project_id())),
+        ('list_page(companies, 100)', lambda s: s.list_page('companies', limit=100)),
+        ('list_page(projects, 100, after_id)', lambda s: s.list_page('projects', after_id=project_id(), limit=100)),
+        ('list_page(projects, query, 100)', lambda s: s.list_page('projects', limit=100, query=query)),
+        ('list_rows(projects, fields)', lambda s: s.list_rows('projects', fields=['id', 'name', 'budget'])),
+        ('iter_rows(projects)', lambda s: drain(s.iter_rows('projects'))),
+        ('create_company', lambda s: created_companies.append(s.create_company(dict(COMPANY)).id)),
+        ('update_company', lambda s: s.update_company(company_id(), {'employee_count': rng.randint(1, 1000)})),
+        ('create_project', lambda s: created_projects.append(s.create_project(dict(PROJECT)).id)),
+        ('update_project', lambda s: s.update_project(project_id(), {'budget': rng.randint(1, 10 ** 9)})),
+        ('delete_project', lambda s: created_projects and s.delete_project(created_projects.pop())),
+        ('delete_company', lambda s: created_companies and s.delete_company(created_companies.pop())),
+    ]
+
+
+def run_case(call: Callable[[], Any], iterations: int, budget: float) -> List[float]:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + budget
+    while not latencies or (len(latencies) < iterations and time.perf_counter() < deadline):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_service(data_dir: str, backend: str, companies: int, projects: int, iterations: int,
+                  budget: float) -> Dict[str, Any]:
+    """Runs in a fresh process so its peak RSS belongs to this dataset alone"""
+    from app.services.data_service import DataService
+
+    service = DataService(data_dir=data_dir, backend=backend)
+    start = time.perf_counter()
+    service.get_version()
+    load = time.perf_counter() - start
+    rss_loaded = current_rss_mib()[0]
+    rng = random.Random(0)
+    results = [summarize(name, run_case(lambda: call(service), iterations, budget))
+               for name, call in service_cases(companies, projects, rng)]
+    service.close()
+    return {'load': load, 'rss_loaded': rss_loaded, 'peak_rss': peak_rss_mib(), 'cases': results}
+
+
+def http_cases(companies: int, projects: int, rng: random.Random) -> List[Tuple[str, Callable[[], Tuple[str, str, Any]]]]:
+    """(name, build) for every endpoint; build returns method, path and JSON body"""
+
+    def company_id() -> int:
+        return rng.randrange(FIRST_COMPANY_ID, FIRST_COMPANY_ID + companies)
+
+    def project_id() -> int:
+        return rng.randrange(FIRST_PROJECT_ID, FIRST_PROJECT_ID + projects)
+
+    return [
+        ('GET /companies', lambda: ('GET', '/companies', None)),
+        ('GET /companies?limit=100', lambda: ('GET', '/companies?limit=100', None)),
+        ('GET /companies/stats', lambda: ('GET', '/companies/stats', None)),
+        ('GET /companies/{id}', lambda: ('GET', f'/companies/{company_id()}', None)),
+        ('GET /companies/{id}/projects', lambda: ('GET', f'/companies/{company_id()}/projects', None)),
+        ('GET /companies/{id}/stats', lambda: ('GET', f'/companies/{company_id()}/stats', None)),
+        ('GET /projects?limit=100', lambda: ('GET', '/projects?limit=100', None)),
+        ('GET /projects?company_id=&limit=100', lambda: ('GET', f'/projects?company_id={company_id()}&limit=100', None)),
+        ('GET /projects?status=&sort=-budget&limit=100',
+         lambda: ('GET', '/projects?status=In%20Progress&sort=-budget&limit=100', None)),
+        ('GET /projects (ndjson)', lambda: ('GET', '/projects', 'ndjson')),
+        ('GET /projects/{id}', lambda: ('GET', f'/projects/{project_id()}', None)),
+        ('POST /companies', lambda: ('POST', '/companies', COMPANY)),
+        ('PUT /companies/{id}', lambda: ('PUT', f'/companies/{company_id()}', {'employee_count': rng.randint(1, 1000)})),
+        ('POST /projects', lambda: ('POST', '/projects', PROJECT)),
+        ('PUT /projects/{id}', lambda: ('PUT', f'/projects/{project_id()}', {'budget': rng.randint(1, 10 ** 9)})),
+        ('DELETE /projects/{id}', lambda: ('DELETE', f'/projects/{project_id()}', None)),
+    ]
+
+
+async def bench_http(base_url: str, companies: int, projects: int, iterations: int, budget: float) -> List[Dict[str, Any]]:
+    rng = random.Random(0)
+    results = []
+    for name, build in http_cases(companies, projects, rng):
+        latencies: List[float] = []
+        deadline = time.perf_counter() + budget
+        while not latencies or (len(latencies) < iterations and time.perf_counter() < deadline):
+            method, path, body = build()
+            headers = {}
+            if body == 'ndjson':
+                headers['Accept'] = 'application/x-ndjson'
+                body = None
+            elif body is not None:
+                headers['Content-Type'] = 'application/json'
+                body = json.dumps(body).encode()
+            start = time.perf_counter()
+            response = await request(method, base_url + path, body, headers, timeout=600.0)
+            latencies.append(time.perf_counter() - start)
+            if response.status >= 500:
+                raise RuntimeError(f'{method} {path}: {response.status} {response.body[:200]!r}')
+        results.append(summarize(name, latencies))
+    return results
+
+
+def print_cases(title: str, cases: List[Dict[str, Any]]):
+    print(f"  {title:<44}{'calls':>7}{'calls/s':>11}{'p50 ms':>10}{'p99 ms':>10}")
+    for case in cases:
+        print(f"  {case['case']:<44}{case['calls']:>7}{case['per_second']:>11.1f}"
+              f"{case['p50'] * 1000:>10.2f}{case['p99'] * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100x1000,1000x10000,10000x100000', help='COMPANIESxPROJECTS,...')
+    parser.add_argument('--tasks', type=int, default=4, help='average tasks per project')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=('journal', 'sqlite'), default='journal')
+    parser.add_argument('--iterations', type=int, default=200, help='max calls per case')
+    parser.add_argument('--budget', type=float, default=2.0, help='max seconds per case')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'bench-datasets'))
+    parser.add_argument('--no-http', action='store_true', help='only benchmark DataService')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    report = []
+    for size in args.sizes.split(','):
+        companies, projects = parse_size(size)
+        start = time.perf_counter()
+        source = dataset_dir(args.cache_dir, companies, projects, args.tasks, args.seed)
+        print(f'{companies} companies x {projects} projects (dataset ready in {time.perf_counter() - start:.1f}s)')
+        entry: Dict[str, Any] = {'companies': companies, 'projects': projects}
+
+        data_dir = tempfile.mkdtemp(prefix='bench-scale-')
+        try:
+            shutil.copytree(source, data_dir, dirs_exist_ok=True)
+            with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                service = pool.submit(bench_service, data_dir, args.backend, companies, projects,
+                                      args.iterations, args.budget).result()
+            entry['service'] = service
+            print(f"  DataService: load {service['load']:.2f}s, RSS {service['rss_loaded']:.0f} MiB after load, "
+                  f"peak {service['peak_rss']:.0f} MiB")
+            print_cases('method', service['cases'])
+
+            if not args.no_http:
+                shutil.rmtree(data_dir)
+                shutil.copytree(source, data_dir)
+                env = {'DATA_DIR': data_dir, 'DATA_BACKEND': args.backend, 'SIMULATED_DELAY_SCALE': '0',
+                       'RESPONSE_CACHE': 'false', 'METRICS_ENABLED': 'false'}
+                with run_server_process(env=env) as (base_url, process):
+                    start = time.perf_counter()
+                    asyncio.run(request('GET', base_url + '/companies/stats', timeout=600.0))
+                    first = time.perf_counter() - start
+                    cases = asyncio.run(bench_http(base_url, companies, projects, args.iterations, args.budget))
+                    rss, peak = current_rss_mib(str(process.pid))
+                entry['http'] = {'first_request': first, 'rss': rss, 'peak_rss': peak, 'cases': cases}
+                print(f'  HTTP: first request (loads the data) {first:.2f}s, worker RSS {rss:.0f} MiB, peak {peak:.0f} MiB')
+                print_cases('endpoint', cases)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        report.append(entry)
+        print()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
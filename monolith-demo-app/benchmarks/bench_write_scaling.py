@@ -0,0 +1,135 @@
+"""Write throughput of DataService from 1 to N worker processes and writer threads.
+
+Every worker process creates companies through its own DataService against a
+shared scratch copy of the seed data, the same way `fastapi run --workers N`
+workers share app/models/data. --threads runs that many concurrent writers in
+each process, like requests on the threadpool, which is where group commit
+(WRITE_BATCH_MAX / WRITE_BATCH_WINDOW_MS) batches them; --batch-max 1 turns
+it off for comparison. After each run the ids are checked for duplicates and
+lost writes.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.bench_write_scaling --backend sqlite --workers 1,2,4,8
+    python -m benchmarks.bench_write_scaling --workers 1 --threads 1,4,16,64 --batch-max 1,64
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+SEED_DIR = os.path.join(os.path.dirname(__file__), '..', 'app', 'models', 'data')
+
+
+def worker(data_dir: str, backend: str, writes: int, threads: int, barrier, results):
+    from app.services.data_service import DataService
+
+    service = DataService(data_dir=data_dir, backend=backend)
+    service.get_companies()
+    barrier.wait()
+    start = time.perf_counter()
+    ids = []
+    writers = [
+        threading.Thread(target=write_companies, args=(service, thread, range(thread, writes, threads), ids))
+        for thread in range(threads)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    results.put((time.perf_counter() - start, ids))
+    service.close()
+
+
+def write_companies(service, thread: int, indexes, ids: list):
+    for i in indexes:
+        company = service.create_company({
+            "name": f"Bench Company {os.getpid()}-{thread}-{i}",
+            "type": "General Contractor",
+            "founded": 2000,
+            "headquarters": "Springfield, IL",
+            "specialties": ["Commercial"],
+            "employee_count": 10,
+            "annual_revenue": 1000000,
+            "website": "https://bench.example.com",
+            "phone": "+1-555-0100",
+            "email": "bench@example.com",
+        })
+        ids.append(company.id if company else None)
+
+
+def run(backend: str, workers: int, writes: int, threads: int = 1) -> dict:
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name in ('companies.json', 'projects.json'):
+            shutil.copy(os.path.join(SEED_DIR, name), data_dir)
+        ctx = multiprocessing.get_context('spawn')
+        barrier, results = ctx.Barrier(workers + 1), ctx.Queue()
+        processes = [
+            ctx.Process(target=worker, args=(data_dir, backend, writes, threads, barrier, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        barrier.wait()
+        start = time.perf_counter()
+        outcomes = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+
+        from app.services.data_service import DataService
+        final = DataService(data_dir=data_dir, backend=backend)
+        ids = [company_id for _, worker_ids in outcomes for company_id in worker_ids]
+        stored = {company.id for company in final.get_companies()}
+        final.close()
+        return {
+            "backend": backend,
+            "workers": workers,
+            "threads": threads,
+            "batch_max": int(os.getenv('WRITE_BATCH_MAX', 64)),
+            "writes": len(ids),
+            "seconds": round(elapsed, 3),
+            "writes_per_sec": round(len(ids) / elapsed, 1),
+            "failed": ids.count(None),
+            "duplicate_ids": len(ids) - len(set(ids)),
+            "lost_writes": len({i for i in ids if i is not None} - stored),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['journal', 'sqlite', 'both'], default='both')
+    parser.add_argument('--workers', default='1,2,4,8', help="comma separated worker counts")
+    parser.add_argument('--writes', type=int, default=500, help="writes per worker")
+    parser.add_argument('--threads', default='1', help="comma separated writer thread counts per worker")
+    parser.add_argument('--batch-max', default='64', help="comma separated WRITE_BATCH_MAX values; 1 disables group commit")
+    parser.add_argument('--window-ms', type=float, default=0, help="WRITE_BATCH_WINDOW_MS")
+    parser.add_argument('--no-fsync', action='store_true', help="set JOURNAL_FSYNC=false")
+    parser.add_argument('--json', action='store_true', help="print JSON lines instead of a table")
+    args = parser.parse_args()
+    if args.no_fsync:
+        os.environ['JOURNAL_FSYNC'] = 'false'
+    os.environ['WRITE_BATCH_WINDOW_MS'] = str(args.window_ms)
+
+    backends = ['journal', 'sqlite'] if args.backend == 'both' else [args.backend]
+    print(f"{'backend':<8} {'batch':>5} {'workers':>7} {'threads':>7} {'writes':>7} {'seconds':>8} {'writes/s':>9} "
+          f"{'failed':>6} {'dup ids':>7} {'lost':>5}")
+    for backend in backends:
+        for batch_max in args.batch_max.split(','):
+            os.environ['WRITE_BATCH_MAX'] = batch_max
+            for workers in [int(w) for w in args.workers.split(',')]:
+                for threads in [int(t) for t in args.threads.split(',')]:
+                    result = run(backend, workers, args.writes, threads)
+                    if args.json:
+                        print(json.dumps(result))
+                    else:
+                        print(f"{backend:<8} {batch_max:>5} {workers:>7} {threads:>7} {result['writes']:>7} "
+                              f"{result['seconds']:>8} {result['writes_per_sec']:>9} {result['failed']:>6} "
+                              f"{result['duplicate_ids']:>7} {result['lost_writes']:>5}")
+
+
+if __name__ == '__main__':
+    main()
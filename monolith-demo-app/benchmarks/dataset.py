@@ -0,0 +1,184 @@
+"""Generate a synthetic companies.json/projects.json snapshot of any size.
+
+The output is deterministic for a given seed and size, and looks like the
+shipped data: the same company types, project statuses and task names, with
+project ownership skewed so that a few companies own many projects, tasks
+whose status follows their project's, and dates, budgets and sizes spread
+over realistic ranges. Company ids start at 1001 and project ids at 2001 like
+the shipped data, so existing URL lists keep working. Point DATA_DIR at the
+output directory to serve it.
+
+Projects are written as they are generated, so 1M projects take little
+memory here (the app loading them is another matter).
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.dataset --companies 10000 --projects 1000000 --seed 42 --out /tmp/data-10k-1m
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+from typing import Any, Dict, Iterator, List
+
+COMPANY_TYPES = ['General Contractor', 'General Contractor', 'Subcontractor']
+SPECIALTIES = ['Commercial', 'Education', 'Healthcare', 'Infrastructure', 'Mixed-Use', 'Residential']
+CITIES = ['Boston, MA', 'Chicago, IL', 'Houston, TX', 'Los Angeles, CA', 'Miami, FL', 'New York, NY',
+          'Riverside, CA', 'San Francisco, CA', 'Seattle, WA', 'Springfield, IL', 'Washington, DC',
+          'Denver, CO', 'Atlanta, GA', 'Phoenix, AZ', 'Portland, OR', 'Austin, TX']
+NAME_PREFIXES = ['Skyline', 'Summit', 'Ironwood', 'Keystone', 'Granite', 'Riverbend', 'Pinnacle', 'Cornerstone',
+                 'Bluewater', 'Redstone', 'Northgate', 'Lakeside', 'Highland', 'Evergreen', 'Meridian', 'Atlas']
+NAME_SUFFIXES = ['Construction Corp', 'Builders', 'Contracting', 'Engineering', 'Structures', 'Development',
+                 'Electrical Services', 'Mechanical', 'Concrete', 'Steel Works']
+PROJECT_STATUSES = ['Planning', 'In Progress', 'In Progress', 'Completed']
+PROJECT_TYPES = ['Commercial Office', 'Education', 'Healthcare', 'Mixed-Use', 'Retail']
+PROJECT_NAMES = ['Plaza', 'Tower', 'Medical Complex', 'Campus', 'Shopping Center', 'Business Park',
+                 'Community Center', 'Research Lab', 'Residences', 'Transit Hub']
+ARCHITECTS = ['DesignWorks Architecture', 'HealthDesign Partners', 'EduBuild Architects', 'RetailSpace Design',
+              'TechSpace Architects', 'MediBuild Design', 'SchoolDesign Group', 'UrbanForm Studio']
+TASK_NAMES = ['Site Survey', 'Permit Acquisition', 'Environmental Assessment', 'Site Preparation',
+              'Foundation & Excavation', 'Foundation Work', 'Steel Frame Construction', 'Medical Gas Systems',
+              'Clean Room Construction', 'Laboratory Setup', 'Classroom Construction', 'Retail Space Buildout',
+              'Playground Installation', 'Interior Finishing', 'Final Inspection']
+
+FIRST_COMPANY_ID = 1001
+FIRST_PROJECT_ID = 2001
+EPOCH = datetime.date(2015, 1, 1)
+# Ownership skew: company index = n * random() ** SKEW, so low ids own most projects
+SKEW = 2.0
+
+
+def owners(rng: random.Random, companies: int) -> List[int]:
+    """1-3 distinct owning company ids of one project"""
+    count = min(companies, rng.choice((1, 1, 2, 2, 3)))
+    ids = set()
+    while len(ids) < count:
+        ids.add(FIRST_COMPANY_ID + min(companies - 1, int(companies * rng.random() ** SKEW)))
+    return sorted(ids)
+
+
+def generate_company(rng: random.Random, company_id: int, project_count: int) -> Dict[str, Any]:
+    prefix, suffix = rng.choice(NAME_PREFIXES), rng.choice(NAME_SUFFIXES)
+    slug = f'{prefix}-{suffix.split()[0]}-{company_id}'.lower()
+    employees = max(5, int(rng.lognormvariate(5.5, 1.2)))
+    return {
+        'id': company_id,
+        'name': f'{prefix} {suffix} {company_id}',
+        'type': rng.choice(COMPANY_TYPES),
+        'founded': rng.randint(1900, 2022),
+        'headquarters': rng.choice(CITIES),
+        'specialties': sorted(rng.sample(SPECIALTIES, rng.randint(1, 3))),
+        'employee_count': employees,
+        'annual_revenue': employees * rng.randint(150_000, 800_000),
+        'project_count': project_count,
+        'website': f'https://{slug}.example.com',
+        'phone': f'+1-555-{rng.randint(0, 9999):04d}',
+        'email': f'info@{slug}.example.com',
+    }
+
+
+def generate_tasks(rng: random.Random, status: str, start: datetime.date, end: datetime.date,
+                   average: int) -> List[Dict[str, Any]]:
+    count = rng.randint(0, 2 * average)
+    names = rng.sample(TASK_NAMES, min(count, len(TASK_NAMES)))
+    if status == 'Completed':
+        done = count
+    elif status == 'Planning':
+        done = 0
+    else:
+        done = rng.randint(0, max(0, count - 1))
+    tasks = []
+    for index, name in enumerate(names):
+        if index < done:
+            completed = start + datetime.timedelta(days=rng.randint(0, max(0, (end - start).days)))
+            tasks.append({'id': index + 1, 'name': name, 'status': 'Completed', 'completion_date': completed.isoformat()})
+        else:
+            task_status = 'In Progress' if index == done and status != 'Planning' else 'Not Started'
+            tasks.append({'id': index + 1, 'name': name, 'status': task_status, 'completion_date': None})
+    return tasks
+
+
+def generate_project(rng: random.Random, project_id: int, company_ids: List[int], tasks: int) -> Dict[str, Any]:
+    status = rng.choice(PROJECT_STATUSES)
+    start = EPOCH + datetime.timedelta(days=rng.randint(0, 12 * 365))
+    end = start + datetime.timedelta(days=rng.randint(180, 5 * 365))
+    square_footage = rng.randrange(20_000, 800_000, 5_000)
+    return {
+        'id': project_id,
+        'name': f'{rng.choice(CITIES).split(",")[0]} {rng.choice(PROJECT_NAMES)} {project_id}',
+        'company_id': company_ids,
+        'status': status,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'budget': square_footage * rng.randint(150, 600),
+        'location': rng.choice(CITIES),
+        'project_type': rng.choice(PROJECT_TYPES),
+        'square_footage': square_footage,
+        'floors': rng.randint(1, 60),
+        'architect': rng.choice(ARCHITECTS),
+        'tasks': generate_tasks(rng, status, start, end, tasks),
+    }
+
+
+def generate_projects(companies: int, projects: int, tasks: int, seed: int) -> Iterator[Dict[str, Any]]:
+    owner_rng = random.Random(f'{seed}-owners')
+    rng = random.Random(f'{seed}-projects')
+    for offset in range(projects):
+        yield generate_project(rng, FIRST_PROJECT_ID + offset, owners(owner_rng, companies), tasks)
+
+
+def write_rows(file_path: str, key: str, rows: Iterator[Dict[str, Any]]):
+    """Write {key: [rows]} one row per line, without holding the rows in memory"""
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        f.write(f'{{"{key}": [\n')
+        for index, row in enumerate(rows):
+            f.write((',\n' if index else '') + json.dumps(row, separators=(',', ':')))
+        f.write('\n]}\n')
+    os.replace(temp_path, file_path)
+
+
+def generate(out_dir: str, companies: int, projects: int, tasks: int = 4, seed: int = 42):
+    """Write companies.json and projects.json for the given size into out_dir"""
+    os.makedirs(out_dir, exist_ok=True)
+    # Ownership comes from its own random stream, so it can be replayed to count projects per company first
+    owner_rng = random.Random(f'{seed}-owners')
+    project_counts: Dict[int, int] = {}
+    for _ in range(projects):
+        for company_id in owners(owner_rng, companies):
+            project_counts[company_id] = project_counts.get(company_id, 0) + 1
+    rng = random.Random(f'{seed}-companies')
+    write_rows(os.path.join(out_dir, 'companies.json'), 'companies', (
+        generate_company(rng, company_id, project_counts.get(company_id, 0))
+        for company_id in range(FIRST_COMPANY_ID, FIRST_COMPANY_ID + companies)
+    ))
+    write_rows(os.path.join(out_dir, 'projects.json'), 'projects', generate_projects(companies, projects, tasks, seed))
+
+
+def dataset_dir(cache_dir: str, companies: int, projects: int, tasks: int = 4, seed: int = 42) -> str:
+    """Directory holding the dataset of this size and seed under cache_dir, generated on first use"""
+    out_dir = os.path.join(cache_dir, f'companies-{companies}-projects-{projects}-tasks-{tasks}-seed-{seed}')
+    if not os.path.exists(os.path.join(out_dir, 'projects.json')):
+        generate(out_dir, companies, projects, tasks, seed)
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--companies', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=100000)
+    parser.add_argument('--tasks', type=int, default=4, help='average tasks per project')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', required=True, help='directory to write companies.json and projects.json to')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate(args.out, args.companies, args.projects, args.tasks, args.seed)
+    size = sum(os.path.getsize(os.path.join(args.out, name)) for name in ('companies.json', 'projects.json'))
+    print(f'{args.companies} companies, {args.projects} projects in {args.out}: '
+          f'{size / 2 ** 20:.1f} MiB in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
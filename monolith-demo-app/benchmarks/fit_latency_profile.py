@@ -0,0 +1,150 @@
+"""Fit a LATENCY_PROFILE from recorded request latencies.
+
+Reads JSON lines from Envoy's access log (the json_format in
+platform-services/*/envoy.yaml) or from the app's own request log
+(REQUEST_LOG=true), skipping anything else, such as kubectl prefixes or
+non-JSON lines. The latency taken from each line:
+  * app request log: the `db` phase, i.e. the simulated database delay the
+    profile replaces; lines without one are skipped
+  * Envoy: `response_upstream_service_time` when Envoy recorded it,
+    otherwise `duration`
+Envoy paths are mapped to the app's route templates, so
+/companies/1001/projects counts towards "GET /companies/{company_id}/projects".
+Routes with at least --min-samples latencies get their own distribution, and
+all latencies together make up the default. The profile goes to --out (or
+stdout), and a summary of the samples goes to stderr.
+
+Usage (from monolith-demo-app/):
+    kubectl logs deploy/core-web-global -c envoy | python -m benchmarks.fit_latency_profile - --out profile.json
+    python -m benchmarks.fit_latency_profile app.log --kind lognormal --min-samples 200
+"""
+import argparse
+import json
+import math
+import statistics
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.main import app
+
+PROBABILITIES = [0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999, 1.0]
+
+
+def read_lines(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path) as f:
+                yield from f
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    start = line.find('{')
+    if start < 0:
+        return None
+    try:
+        entry = json.loads(line[start:])
+    except json.JSONDecodeError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def milliseconds(value: Any) -> Optional[float]:
+    """Envoy logs numbers as strings and `-` when it has none"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def route_template(method: str, path: str) -> Optional[str]:
+    path = path.split('?', 1)[0]
+    for route in app.routes:
+        if not hasattr(route, 'path_regex') or not route.path_regex.match(path):
+            continue
+        methods = getattr(route, 'methods', None)
+        if methods is None or method in methods:
+            return route.path
+    return None
+
+
+def sample(entry: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+    """(route key, seconds) of one log entry, or None when it carries no usable latency"""
+    method = entry.get('request_method')
+    if not method:
+        return None
+    if entry.get('event') == 'request':
+        latency, route = milliseconds((entry.get('phases') or {}).get('db')), entry.get('route')
+    else:
+        latency = milliseconds(entry.get('response_upstream_service_time'))
+        if latency is None:
+            latency = milliseconds(entry.get('duration'))
+        route = route_template(method, entry.get('path') or '')
+    if latency is None or route is None:
+        return None
+    return f'{method} {route}', latency / 1000
+
+
+def quantile(values: List[float], p: float) -> float:
+    position = p * (len(values) - 1)
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def fit(values: List[float], kind: str) -> Dict[str, Any]:
+    values = sorted(values)
+    if kind == 'lognormal':
+        # Sub-millisecond samples would drag the fit towards zero
+        logs = [math.log(max(value, 0.001)) for value in values]
+        return {'type': 'lognormal', 'median': round(math.exp(statistics.fmean(logs)), 4),
+                'sigma': round(statistics.pstdev(logs), 4), 'max': round(values[-1], 4)}
+    return {'type': 'empirical', 'quantiles': [[p, round(quantile(values, p), 4)] for p in PROBABILITIES]}
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """The profile as JSON with one distribution per line"""
+    routes = ',\n'.join(f'    {json.dumps(route)}: {json.dumps(spec)}' for route, spec in profile['routes'].items())
+    return f'{{\n  "default": {json.dumps(profile["default"])},\n  "routes": {{\n{routes}\n  }}\n}}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('logs', nargs='+', help="log files, or - for stdin")
+    parser.add_argument('--kind', choices=['empirical', 'lognormal'], default='empirical')
+    parser.add_argument('--min-samples', type=int, default=50, help='latencies a route needs for its own distribution')
+    parser.add_argument('--out', help='profile file to write (default: stdout)')
+    args = parser.parse_args()
+
+    by_route: Dict[str, List[float]] = {}
+    for line in read_lines(args.logs):
+        entry = parse_line(line)
+        result = sample(entry) if entry is not None else None
+        if result is not None:
+            by_route.setdefault(result[0], []).append(result[1])
+    if not by_route:
+        sys.exit('No latencies found')
+
+    everything = [value for values in by_route.values() for value in values]
+    profile = {
+        'default': fit(everything, args.kind),
+        'routes': {route: fit(values, args.kind) for route, values in sorted(by_route.items())
+                   if len(values) >= args.min_samples},
+    }
+    print(f"{'route':<45}{'samples':>9}{'p50 s':>9}{'p99 s':>9}{'max s':>9}", file=sys.stderr)
+    for route, values in sorted(by_route.items()) + [('(default)', everything)]:
+        values = sorted(values)
+        print(f"{route:<45}{len(values):>9}{quantile(values, 0.5):>9.3f}{quantile(values, 0.99):>9.3f}"
+              f"{values[-1]:>9.3f}", file=sys.stderr)
+
+    output = format_profile(profile)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
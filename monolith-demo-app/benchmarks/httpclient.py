@@ -0,0 +1,68 @@
+"""Minimal asyncio HTTP/1.1 client for load generation.
+
+httpx's connection pool becomes the bottleneck well before a few hundred
+concurrent requests; one `Connection: close` request per socket keeps the
+client out of the measurement.
+"""
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class Response:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def _dechunk(body: bytes) -> bytes:
+    out, pos = bytearray(), 0
+    while True:
+        end = body.index(b'\r\n', pos)
+        size = int(body[pos:end].split(b';')[0], 16)
+        if size == 0:
+            return bytes(out)
+        out += body[end + 2:end + 2 + size]
+        pos = end + 4 + size
+
+
+async def request(method: str, url: str, body: Optional[bytes] = None,
+                  headers: Optional[Dict[str, str]] = None, timeout: float = 60.0) -> Response:
+    """Send one request on a fresh connection and read the response to EOF"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: close']
+    for name, value in (headers or {}).items():
+        lines.append(f'{name}: {value}')
+    if body is not None:
+        lines.append(f'Content-Length: {len(body)}')
+
+    async def exchange() -> Tuple[bytes, bytes]:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        try:
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + (body or b''))
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        head, _, payload = raw.partition(b'\r\n\r\n')
+        return head, payload
+
+    head, payload = await asyncio.wait_for(exchange(), timeout)
+    if not head:
+        raise ConnectionError('connection closed without a response')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    response_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    if response_headers.get('transfer-encoding') == 'chunked':
+        payload = _dechunk(payload)
+    return Response(int(status_line.split(' ')[1]), response_headers, payload)
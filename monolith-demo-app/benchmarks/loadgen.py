@@ -0,0 +1,325 @@
+"""Replay siege URL files and JSONL request lists and report per-route latency and errors over time.
+
+A Python stand-in for `siege -f urls-localhost.txt`. Targets come from:
+  * siege URL files (--urls, repeatable): one URL per line, `#` comments,
+    and siege's `URL POST <body>` / `URL PUT <body>` form for writes
+  * JSONL files (--requests, repeatable): one object per line with `url` (or
+    `path` together with --base-url) and optional `method`, `headers` and
+    `body` (a string, or JSON that is sent as application/json)
+
+Load is either closed loop (--concurrency clients, each sending its next
+request when the previous one finishes, like siege -c) or open loop (--rate
+requests per second, whatever the latency; --concurrency then caps requests
+in flight). Open-loop latency is measured from when a request was due, so a
+stalled server shows up as latency instead of as a lower request rate.
+
+The report lists p50/p95/p99/p999 per route (numeric path segments folded to
+{id}) and, per --bucket seconds, the request count, latency and error
+classes: http_<status> for 4xx/5xx answers, and timeout, refused, reset or
+closed (no response) for transport errors.
+
+--local starts the app on a free port instead of targeting the URLs' hosts;
+with --restart-every one worker is sent SIGTERM at that interval, and
+--verify exits non-zero if any request failed. Together they check
+"zero failed requests during worker restart" without a cluster.
+
+Usage (from monolith-demo-app/):
+    python -m benchmarks.loadgen --urls ../urls-localhost.txt --concurrency 100 --duration 60
+    python -m benchmarks.loadgen --urls ../urls-localhost.txt --base-url http://127.0.0.1:8000 --rate 200
+    python -m benchmarks.loadgen --urls ../urls-localhost.txt --local --server prefork --workers 2 \\
+        --restart-every 5 --duration 30 --verify
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from benchmarks.httpclient import request
+from benchmarks.server import run_server_process, worker_pids
+
+ID_SEGMENT = re.compile(r'^\d+(\.\d+)?$')
+QUANTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('p999', 0.999))
+
+
+class Target:
+    def __init__(self, method: str, url: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None):
+        self.method = method
+        self.url = url
+        self.body = body
+        self.headers = headers or {}
+        self.route = route_of(url)
+
+
+class Result:
+    def __init__(self, at: float, route: str, latency: float, error: Optional[str]):
+        self.at = at
+        self.route = route
+        self.latency = latency
+        self.error = error
+
+
+def route_of(url: str) -> str:
+    """Route label of a URL: its path with numeric segments folded to {id}"""
+    path = urlsplit(url).path or '/'
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def rebase(url: str, base_url: Optional[str]) -> str:
+    """Point url at base_url's scheme and host, keeping path and query"""
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    return base_url.rstrip('/') + (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+
+def load_urls(path: str, base_url: Optional[str]) -> List[Target]:
+    targets = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            url, _, rest = line.partition(' ')
+            method, _, body = rest.strip().partition(' ')
+            method = method.upper() or 'GET'
+            headers = {'Content-Type': 'application/json'} if body.lstrip().startswith(('{', '[')) else {}
+            targets.append(Target(method, rebase(url, base_url), body.encode() if body else None, headers))
+    return targets
+
+
+def load_requests(path: str, base_url: Optional[str]) -> List[Target]:
+    targets = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if 'url' in entry:
+                url = rebase(entry['url'], base_url)
+            elif 'path' in entry and base_url:
+                url = base_url.rstrip('/') + entry['path']
+            else:
+                raise ValueError(f"{path}:{number}: needs 'url', or 'path' together with --base-url")
+            headers = dict(entry.get('headers', {}))
+            body = entry.get('body')
+            if body is not None and not isinstance(body, str):
+                body = json.dumps(body)
+                headers.setdefault('Content-Type', 'application/json')
+            targets.append(Target(entry.get('method', 'POST' if body is not None else 'GET').upper(), url,
+                                  body.encode() if body is not None else None, headers))
+    return targets
+
+
+def classify(error: BaseException) -> str:
+    if isinstance(error, asyncio.TimeoutError):
+        return 'timeout'
+    if isinstance(error, ConnectionRefusedError):
+        return 'refused'
+    if isinstance(error, ConnectionResetError):
+        return 'reset'
+    if isinstance(error, ConnectionError):
+        return 'closed'
+    return type(error).__name__
+
+
+async def send(target: Target, timeout: float) -> Optional[str]:
+    """Send one request; returns its error class, or None on success"""
+    try:
+        response = await request(target.method, target.url, target.body, target.headers, timeout)
+    except (OSError, asyncio.TimeoutError, ValueError) as e:
+        return classify(e)
+    return f'http_{response.status}' if response.status >= 400 else None
+
+
+class LoadGenerator:
+    """Send targets at a fixed concurrency or rate for a duration and collect one Result per request"""
+
+    def __init__(self, targets: List[Target], duration: float, concurrency: int, rate: Optional[float],
+                 timeout: float, sequential: bool, seed: Optional[int]):
+        self.targets = targets
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self.sequential = sequential
+        self.random = random.Random(seed)
+        self.results: List[Result] = []
+        self._next = 0
+        self._start = 0.0
+
+    def pick(self) -> Target:
+        if self.sequential:
+            target = self.targets[self._next % len(self.targets)]
+            self._next += 1
+            return target
+        return self.random.choice(self.targets)
+
+    async def one(self, target: Target, due: float):
+        error = await send(target, self.timeout)
+        now = time.perf_counter()
+        self.results.append(Result(due - self._start, target.route, now - due, error))
+
+    async def closed_loop(self, deadline: float):
+        async def client():
+            while time.perf_counter() < deadline:
+                await self.one(self.pick(), time.perf_counter())
+
+        await asyncio.gather(*(client() for _ in range(self.concurrency)))
+
+    async def open_loop(self, deadline: float):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+
+        async def one(target: Target, due: float):
+            async with semaphore:
+                await self.one(target, due)
+
+        interval = 1 / self.rate
+        due = self._start
+        while due < deadline:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.ensure_future(one(self.pick(), due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            due += interval
+        await asyncio.gather(*tasks)
+
+    async def run(self) -> List[Result]:
+        self._start = time.perf_counter()
+        deadline = self._start + self.duration
+        if self.rate:
+            await self.open_loop(deadline)
+        else:
+            await self.closed_loop(deadline)
+        return self.results
+
+
+async def restart_workers(server_pid: int, every: float, deadline: float, events: List[float], start: float):
+    """SIGTERM the oldest worker every `every` seconds; the server replaces it"""
+    signalled = set()
+    while True:
+        await asyncio.sleep(every)
+        if time.perf_counter() >= deadline:
+            return
+        # A signalled worker may still be finishing long requests; leave it alone
+        pids = set(worker_pids(server_pid)) - signalled
+        if pids:
+            victim = min(pids)
+            os.kill(victim, signal.SIGTERM)
+            signalled.add(victim)
+            events.append(time.perf_counter() - start)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(results: List[Result], bucket: float, restarts: List[float]) -> dict:
+    routes: Dict[str, List[Result]] = {}
+    buckets: Dict[int, List[Result]] = {}
+    for result in results:
+        routes.setdefault(result.route, []).append(result)
+        buckets.setdefault(int(result.at // bucket), []).append(result)
+
+    def stats(group: List[Result]) -> dict:
+        latencies = [r.latency for r in group if r.error is None]
+        errors: Dict[str, int] = {}
+        for r in group:
+            if r.error is not None:
+                errors[r.error] = errors.get(r.error, 0) + 1
+        return {'requests': len(group), 'failed': sum(errors.values()), 'errors': errors,
+                **{name: percentile(latencies, q) for name, q in QUANTILES}}
+
+    return {
+        'requests': len(results),
+        'failed': sum(1 for r in results if r.error is not None),
+        'routes': {route: stats(group) for route, group in sorted(routes.items())},
+        'buckets': [{'start': index * bucket, 'restarts': sum(1 for t in restarts if index * bucket <= t < (index + 1) * bucket),
+                     **stats(buckets[index])} for index in sorted(buckets)],
+    }
+
+
+def print_report(report: dict, duration: float):
+    print(f"{'route':<32}{'requests':>9}{'failed':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'p999 ms':>9}")
+    for route, s in report['routes'].items():
+        print(f"{route:<32}{s['requests']:>9}{s['failed']:>8}" + ''.join(f"{s[name] * 1000:>9.1f}" for name, _ in QUANTILES))
+    print()
+    print(f"{'time s':<8}{'requests':>9}{'p50 ms':>9}{'p99 ms':>9}  errors")
+    for b in report['buckets']:
+        errors = ' '.join(f'{name}={count}' for name, count in sorted(b['errors'].items()))
+        marker = f"  [{b['restarts']} worker restart(s)]" if b['restarts'] else ''
+        print(f"{b['start']:<8.0f}{b['requests']:>9}{b['p50'] * 1000:>9.1f}{b['p99'] * 1000:>9.1f}  {errors}{marker}")
+    print()
+    print(f"{report['requests']} requests in {duration:.0f}s ({report['requests'] / duration:.1f}/s), "
+          f"{report['failed']} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', action='append', default=[], help='siege URL file')
+    parser.add_argument('--requests', action='append', default=[], help='JSONL file of requests')
+    parser.add_argument('--base-url', help='send every request to this scheme://host:port instead')
+    parser.add_argument('--concurrency', type=int, default=50, help='clients, or the in-flight cap with --rate')
+    parser.add_argument('--rate', type=float, help='requests per second (open loop)')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--bucket', type=float, default=1.0, help='seconds per time bucket')
+    parser.add_argument('--sequential', action='store_true', help='walk the targets in order (siege without -i)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--json', help='also write the full report to this file')
+    parser.add_argument('--local', action='store_true', help='start the app locally and target it')
+    parser.add_argument('--server', choices=('uvicorn', 'prefork'), default='uvicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--restart-every', type=float, help='SIGTERM one worker of the --local server this often')
+    parser.add_argument('--verify', action='store_true', help='exit with status 1 if any request failed')
+    args = parser.parse_args()
+    if not args.urls and not args.requests:
+        parser.error('give at least one --urls or --requests file')
+    if args.restart_every and not args.local:
+        parser.error('--restart-every needs --local')
+
+    def run(base_url: Optional[str], server_pid: Optional[int]) -> dict:
+        targets = [t for path in args.urls for t in load_urls(path, base_url)]
+        targets += [t for path in args.requests for t in load_requests(path, base_url)]
+        generator = LoadGenerator(targets, args.duration, args.concurrency, args.rate,
+                                  args.timeout, args.sequential, args.seed)
+        restarts: List[float] = []
+
+        async def go():
+            start = time.perf_counter()
+            jobs = [generator.run()]
+            if server_pid is not None and args.restart_every:
+                jobs.append(restart_workers(server_pid, args.restart_every, start + args.duration, restarts, start))
+            await asyncio.gather(*jobs)
+
+        asyncio.run(go())
+        return summarize(generator.results, args.bucket, restarts)
+
+    if args.local:
+        with run_server_process(workers=args.workers, server=args.server) as (base_url, process):
+            report = run(base_url, process.pid)
+    else:
+        report = run(args.base_url, None)
+
+    print_report(report, args.duration)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.verify and report['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Start a local uvicorn instance of the app for benchmarks."""
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, path: str = '/health', timeout: float = 60.0) -> float:
+    """Poll until path answers 200; returns the seconds it took"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if httpx.get(base_url + path, timeout=1.0).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{base_url}{path} not ready after {timeout}s")
+
+
+def children(pid: int) -> List[int]:
+    pids = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    return pids
+
+
+def worker_pids(server_pid: int) -> List[int]:
+    """Worker processes of the server, leaving out multiprocessing helpers"""
+    pids = []
+    for pid in children(server_pid):
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read()
+        except FileNotFoundError:
+            continue
+        if b'resource_tracker' not in cmdline:
+            pids.append(pid)
+    return pids
+
+
+@contextmanager
+def run_server_process(env: Optional[Dict[str, str]] = None, args: Optional[List[str]] = None,
+                       lifespan: bool = False, workers: int = 1, server: str = 'uvicorn',
+                       ready_path: str = '/health') -> Iterator[Tuple[str, subprocess.Popen]]:
+    """Run the app on a free port and yield its base URL and the server process.
+
+    server is `uvicorn` (uvicorn app.main:app, what `fastapi run` starts) or
+    `prefork` (python -m app.server). The simulated slow start in the lifespan
+    is skipped unless lifespan=True.
+    """
+    port = free_port()
+    if server == 'prefork':
+        command = [sys.executable, '-m', 'app.server', '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning']
+        command += ['--lifespan', 'on' if lifespan else 'off']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning']
+        if not lifespan:
+            command += ['--lifespan', 'off']
+    process = subprocess.Popen(command + (args or []), cwd=APP_DIR, env={**os.environ, **(env or {})})
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_ready(base_url, ready_path)
+        yield base_url, process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@contextmanager
+def run_server(env: Optional[Dict[str, str]] = None, args: Optional[List[str]] = None,
+               lifespan: bool = False, workers: int = 1, server: str = 'uvicorn') -> Iterator[str]:
+    """Run the app on a free port and yield its base URL"""
+    with run_server_process(env, args, lifespan, workers, server) as (base_url, _):
+        yield base_url
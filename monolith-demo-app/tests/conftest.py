@@ -0,0 +1,35 @@
+import os
+import shutil
+from typing import Any, Callable, Dict
+
+import pytest
+
+SEED_DIR = os.path.join(os.path.dirname(__file__), '..', 'app', 'models', 'data')
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch) -> str:
+    """Scratch copy of the seed snapshots, with fsync off to keep writes fast"""
+    monkeypatch.setenv('JOURNAL_FSYNC', 'false')
+    for name in ('companies.json', 'projects.json'):
+        shutil.copy(os.path.join(SEED_DIR, name), tmp_path)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def new_company() -> Callable[..., Dict[str, Any]]:
+    """Factory of CompanyCreate payloads"""
+    def build(name: str = 'Test Company') -> Dict[str, Any]:
+        return {
+            'name': name,
+            'type': 'General Contractor',
+            'founded': 2000,
+            'headquarters': 'Springfield, IL',
+            'specialties': ['Commercial'],
+            'employee_count': 10,
+            'annual_revenue': 1000000,
+            'website': 'https://test.example.com',
+            'phone': '+1-555-0100',
+            'email': 'test@example.com',
+        }
+    return build
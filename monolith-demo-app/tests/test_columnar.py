@@ -0,0 +1,141 @@
+from typing import Any, Dict
+
+import pytest
+
+from app.services.columnar import PROJECT_FIELDS, VACUUM_MIN_DEAD, ProjectTable
+
+
+def project(row_id: int, **fields: Any) -> Dict[str, Any]:
+    row = {
+        'id': row_id,
+        'name': f'Project {row_id}',
+        'company_id': [1001, 1002],
+        'status': 'In Progress',
+        'start_date': '2024-01-15',
+        'end_date': '2025-12-31',
+        'budget': 150000000,
+        'location': 'Springfield, IL',
+        'project_type': 'Commercial Office',
+        'square_footage': 450000,
+        'floors': 32,
+        'architect': 'Morrison & Associates',
+        'tasks': [
+            {'id': 1, 'name': 'Site Preparation', 'status': 'Completed', 'completion_date': '2024-03-15'},
+            {'id': 2, 'name': 'Foundation Work', 'status': 'In Progress', 'completion_date': None},
+        ],
+    }
+    row.update(fields)
+    return row
+
+
+def assert_round_trip(table: ProjectTable, expected: Dict[int, Dict[str, Any]]):
+    assert len(table) == len(expected)
+    assert {row_id: table[row_id] for row_id in table} == expected
+    assert sorted(table.values(), key=lambda row: repr(row['id'])) == sorted(expected.values(), key=lambda row: repr(row['id']))
+    for row_id, row in expected.items():
+        assert row_id in table
+        assert table.get(row_id) == row
+        view = table.view(row_id)
+        assert view.materialize() == row
+        assert {field: view.get(field) for field in row} == row
+
+
+ROWS = {
+    'plain': project(1),
+    'past int32': project(2, budget=2 ** 40, square_footage=-2 ** 35, floors=2 ** 31),
+    'int64 bounds': project(3, budget=2 ** 63 - 1, square_footage=-2 ** 63),
+    'budget past int64': project(4, budget=2 ** 63),
+    'negative budget past int64': project(5, budget=-2 ** 63 - 1),
+    'company id past int64': project(6, company_id=[1001, 2 ** 64]),
+    'task id past int64': project(7, tasks=[{'id': 2 ** 70, 'name': 'Huge', 'status': 'Pending', 'completion_date': None}]),
+    'float budget': project(8, budget=1.5),
+    'bool floors': project(9, floors=True),
+    'unseen categorical values': project(10, status='Mothballed', architect='Someone New', location='Nowhere, ZZ'),
+    'null categorical': project(11, status=None),
+    'extra field': project(12, rating=5),
+    'missing field': {field: value for field, value in project(13).items() if field != 'floors'},
+    'no tasks': project(14, tasks=[]),
+    'no companies': project(15, company_id=[]),
+    'task with an extra field': project(16, tasks=[{'id': 1, 'name': 'x', 'status': 'y', 'completion_date': None, 'extra': 1}]),
+    'unencodable name': project(17, name='\ud800'),
+    'unicode name': project(18, name='Überbau – 東京'),
+}
+
+
+@pytest.mark.parametrize('case', ROWS)
+def test_row_round_trips(case):
+    table = ProjectTable()
+    table[1000] = project(1000)
+    row = ROWS[case]
+    table[row['id']] = row
+    assert_round_trip(table, {1000: project(1000), row['id']: row})
+
+
+@pytest.mark.parametrize('row_id', [2 ** 63, 2 ** 80, -5, 10 ** 9])
+def test_ids_outside_the_dense_range_round_trip(row_id):
+    table = ProjectTable()
+    table[1] = project(1)
+    table[row_id] = project(row_id)
+    assert_round_trip(table, {1: project(1), row_id: project(row_id)})
+    assert list(table) == [1, row_id]
+
+
+def test_all_rows_in_one_table():
+    table = ProjectTable()
+    for row in ROWS.values():
+        table[row['id']] = row
+    assert_round_trip(table, {row['id']: row for row in ROWS.values()})
+
+
+@pytest.mark.parametrize('fields', [{}, {'budget': 2 ** 64}], ids=['columnar', 'overflow'])
+def test_stored_rows_are_copies(fields):
+    table = ProjectTable()
+    row = project(1, **fields)
+    table[1] = row
+    row['tasks'].append({'id': 3, 'name': 'Late', 'status': 'Pending', 'completion_date': None})
+    row['company_id'].append(9999)
+    for read in (table[1], table.get(1), next(table.values()), table.view(1).materialize()):
+        read['company_id'].append(9999)
+        read['tasks'][0]['status'] = 'Changed'
+    table.view(1)['tasks'][0]['status'] = 'Changed'
+    assert table[1] == project(1, **fields)
+
+
+def test_updates_and_deletes_leave_only_live_rows():
+    table = ProjectTable()
+    expected = {}
+    for row_id in range(1, 101):
+        table[row_id] = expected[row_id] = project(row_id)
+    # An update moves a row to a new slot; switching between a columnar and an overflow row retires either kind
+    table[5] = expected[5] = project(5, budget=2 ** 64)
+    table[6] = expected[6] = project(6, name='Renamed', tasks=[])
+    table[5] = expected[5] = project(5, status='Done')
+    for row_id in (1, 6, 50, 100):
+        assert table.pop(row_id) == expected.pop(row_id)
+    assert table.pop(100, None) is None
+    with pytest.raises(KeyError):
+        table.pop(100)
+    with pytest.raises(KeyError):
+        table[100]
+    assert 100 not in table
+    assert_round_trip(table, expected)
+    # A deleted id can be stored again
+    table[100] = expected[100] = project(100, floors=1)
+    assert_round_trip(table, expected)
+
+
+def test_vacuum_keeps_every_live_row():
+    table = ProjectTable()
+    expected = {row_id: project(row_id) for row_id in range(1, 21)}
+    expected[21] = project(21, budget=2 ** 64)
+    for row_id, row in expected.items():
+        table[row_id] = row
+    # Enough rewrites of the same rows that dead slots outnumber live ones and the table rebuilds itself
+    for version in range(VACUUM_MIN_DEAD // 10 + 1):
+        for row_id in range(1, 11):
+            table[row_id] = expected[row_id] = project(row_id, floors=version, name=f'Project {row_id} v{version}')
+    table.pop(20)
+    del expected[20]
+    assert len(table._alive) < VACUUM_MIN_DEAD, 'the table never vacuumed'
+    assert_round_trip(table, expected)
+    assert set(PROJECT_FIELDS) == set(table[1])
@@ -0,0 +1,96 @@
+import errno
+import threading
+import time
+from typing import Any, Callable, List
+from unittest import mock
+
+import pytest
+
+from app.services.data_service import DataService
+
+
+@pytest.fixture
+def service(data_dir, monkeypatch):
+    # The leader waits for the whole batch, then commits it without sitting out the window
+    monkeypatch.setenv('WRITE_BATCH_WINDOW_MS', '5000')
+    monkeypatch.setenv('WRITE_BATCH_MAX', '4')
+    service = DataService(data_dir=data_dir, backend='journal')
+    service.get_version()
+    yield service
+    service.close()
+
+
+def in_one_batch(service: DataService, calls: List[Callable[[], Any]]) -> List[Any]:
+    """Run calls on concurrent threads, queued in list order, and return their results"""
+    results: List[Any] = [None] * len(calls)
+    batches = []
+    commit_batch = service._commit_batch
+
+    def record(batch):
+        batches.append(len(batch))
+        commit_batch(batch)
+
+    def call(index: int):
+        results[index] = calls[index]()
+
+    threads = []
+    with mock.patch.object(service, '_commit_batch', record):
+        for index in range(len(calls)):
+            threads.append(threading.Thread(target=call, args=(index,)))
+            threads[-1].start()
+            # Queued before the next writer starts, so the batch keeps the order of calls
+            deadline = time.monotonic() + 5
+            while len(service._queue) < index + 1 and not batches and time.monotonic() < deadline:
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+    assert batches == [len(calls)], 'the writes did not share one batch'
+    return results
+
+
+def test_writes_in_a_batch_see_the_ones_before_them(service, data_dir, new_company):
+    deleted, created, updated, missing = in_one_batch(service, [
+        lambda: service.delete_company(1001),
+        lambda: service.create_company(new_company('Batched')),
+        lambda: service.update_company(1001, {'name': 'Too late'}),
+        lambda: service.update_companies([(1002, {'name': 'First'}), (99999, {'name': 'Missing'}),
+                                          (1003, {'name': 'Third'})]),
+    ])
+
+    assert deleted is True
+    assert created.name == 'Batched'
+    assert updated is None, 'the update ran before the delete batched ahead of it'
+    assert [company.name if company else None for company in missing] == ['First', None, 'Third']
+
+    reloaded = DataService(data_dir=data_dir, backend='journal')
+    assert reloaded.get_company(1001) is None
+    assert reloaded.get_company(created.id).name == 'Batched'
+    assert [reloaded.get_company(company_id).name for company_id in (1002, 1003)] == ['First', 'Third']
+    assert reloaded.get_version() == service.get_version() == 4
+    reloaded.close()
+
+
+def test_a_storage_error_fails_every_write_in_the_batch(service, data_dir, new_company):
+    before = service.get_version()
+    names = {company.id: company.name for company in service.get_companies()}
+    disk_full = OSError(errno.ENOSPC, 'No space left on device')
+
+    with mock.patch.object(service._storage, '_append', side_effect=disk_full):
+        results = in_one_batch(service, [
+            lambda: service.create_company(new_company('Lost')),
+            lambda: service.update_company(1001, {'name': 'Lost'}),
+            lambda: service.delete_company(1002),
+            lambda: service.update_companies([(1003, {'name': 'Lost'}), (1004, {'name': 'Lost'})]),
+        ])
+
+    assert results == [None, None, False, [None, None]]
+    # None of the batch stays visible, in this service or on disk
+    assert service.get_version() == before
+    assert {company.id: company.name for company in service.get_companies()} == names
+    reloaded = DataService(data_dir=data_dir, backend='journal')
+    assert {company.id: company.name for company in reloaded.get_companies()} == names
+    reloaded.close()
+
+    # The next write commits normally
+    service.batch_window = 0
+    assert service.update_company(1001, {'name': 'Renamed'}).name == 'Renamed'
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+
+from app.services.data_service import DataService
+from benchmarks.bench_write_scaling import run
+
+
+def open_service(data_dir: str) -> DataService:
+    return DataService(data_dir=data_dir, backend='journal')
+
+
+def test_replay_after_a_crash_mid_journal(data_dir, new_company):
+    service = open_service(data_dir)
+    ids = [service.create_company(new_company(f'Company {i}')).id for i in range(3)]
+    service.update_company(ids[0], {'name': 'Renamed'})
+    service.delete_company(ids[1])
+    service.close()
+    # A crash mid-append leaves part of a record without its newline
+    with open(os.path.join(data_dir, 'journal.jsonl'), 'ab') as f:
+        f.write(b'{"op":"put","entity":"companies","id":')
+
+    service = open_service(data_dir)
+    assert service.get_company(ids[0]).name == 'Renamed'
+    assert service.get_company(ids[1]) is None
+    assert service.get_company(ids[2]).name == 'Company 2'
+    later = service.create_company(new_company('After the crash')).id
+    service.close()
+
+    service = open_service(data_dir)
+    assert later == ids[2] + 1
+    assert service.get_company(later).name == 'After the crash'
+    assert service.get_company(ids[0]).name == 'Renamed'
+    service.close()
+
+
+def test_replay_folds_in_an_unfinished_compaction(data_dir, new_company):
+    service = open_service(data_dir)
+    before = service.create_company(new_company('Before')).id
+    service.close()
+    # Crash right after the journal was rotated, before it was folded into the snapshots
+    journal = os.path.join(data_dir, 'journal.jsonl')
+    os.replace(journal, journal + '.compacting')
+
+    service = open_service(data_dir)
+    after = service.create_company(new_company('After')).id
+    service.close()
+
+    assert not os.path.exists(journal + '.compacting')
+    service = open_service(data_dir)
+    assert service.get_company(before).name == 'Before'
+    assert service.get_company(after).name == 'After'
+    service.close()
+
+
+def test_compaction_racing_appends_from_another_service(data_dir, new_company, monkeypatch):
+    # A few records per journal, so both services rotate and compact many times while the other appends
+    monkeypatch.setenv('JOURNAL_COMPACT_BYTES', '2000')
+    services = [open_service(data_dir) for _ in range(2)]
+    created = [{} for _ in services]
+
+    def write(index: int):
+        for i in range(100):
+            name = f'Company {index}-{i}'
+            created[index][services[index].create_company(new_company(name)).id] = name
+
+    writers = [threading.Thread(target=write, args=(index,)) for index in range(len(services))]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    for service in services:
+        service.close()
+
+    expected = {**created[0], **created[1]}
+    assert len(expected) == 200, 'an id was handed out twice'
+    with open(os.path.join(data_dir, 'companies.json')) as f:
+        assert json.load(f)['seq'] > 0, 'no compaction ran'
+    service = open_service(data_dir)
+    stored = {company.id: company.name for company in service.get_companies()}
+    assert {company_id: stored.get(company_id) for company_id in expected} == expected
+    service.close()
+
+
+def test_ids_unique_across_processes(monkeypatch):
+    monkeypatch.setenv('JOURNAL_FSYNC', 'false')
+    result = run('journal', workers=2, writes=50, threads=2)
+    assert result['writes'] == 100
+    assert (result['failed'], result['duplicate_ids'], result['lost_writes']) == (0, 0, 0)
@@ -0,0 +1,126 @@
+import json
+import os
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from app.services.sqlite_storage import SQLiteStorage
+from app.services.store import MemoryStore
+from benchmarks.bench_write_scaling import run
+
+
+def open_storage(data_dir: str, keep_changes: int = 10000) -> SQLiteStorage:
+    return SQLiteStorage(os.path.join(data_dir, 'construction.db'), seed_dir=data_dir,
+                         keep_changes=keep_changes, fsync=False)
+
+
+def companies(store: MemoryStore) -> Dict[int, Dict[str, Any]]:
+    return {company_id: store.get_company(company_id) for company_id in store.companies}
+
+
+def put_companies(storage: SQLiteStorage, store: MemoryStore, names: List[str]) -> List[int]:
+    ids = []
+    with storage.transaction(store) as store:
+        for name in names:
+            company_id = store.next_id('companies')
+            storage.commit(store, [{'op': 'put', 'entity': 'companies', 'id': company_id,
+                                    'data': {'id': company_id, 'name': name}}])
+            ids.append(company_id)
+    return ids
+
+
+def test_seeds_an_empty_database_once(data_dir):
+    with open(os.path.join(data_dir, 'companies.json')) as f:
+        seed = {company['id']: company for company in json.load(f)['companies']}
+    first, second = open_storage(data_dir), open_storage(data_dir)
+    stores = [MemoryStore(), MemoryStore()]
+    assert first.sync(stores[0])
+    assert second.sync(stores[1])
+
+    for store in stores:
+        assert set(store.companies) == set(seed)
+        assert store.max_ids['companies'] == max(seed)
+        assert store.seq == 0
+    count = first._connection().execute("SELECT COUNT(*) FROM rows WHERE entity = 'companies'").fetchone()[0]
+    assert count == len(seed)
+    first.close()
+    second.close()
+
+
+def test_each_store_converges_after_the_other_commits(data_dir):
+    first, second = open_storage(data_dir), open_storage(data_dir)
+    stores = [MemoryStore(), MemoryStore()]
+    first.sync(stores[0])
+    second.sync(stores[1])
+
+    [created] = put_companies(first, stores[0], ['From first'])
+    assert second.sync(stores[1])
+    assert stores[1].get_company(created)['name'] == 'From first'
+
+    with second.transaction(stores[1]) as store:
+        second.commit(store, [{'op': 'delete', 'entity': 'companies', 'id': created, 'data': None}])
+    [later] = put_companies(second, stores[1], ['From second'])
+    assert first.sync(stores[0])
+    assert not first.sync(stores[0])
+
+    assert later == created + 1, 'a deleted id was handed out again'
+    assert companies(stores[0]) == companies(stores[1])
+    assert stores[0].seq == stores[1].seq == 3
+    first.close()
+    second.close()
+
+
+def test_reloads_when_the_change_log_was_pruned_past_it(data_dir):
+    first, second = open_storage(data_dir, keep_changes=10), open_storage(data_dir, keep_changes=10)
+    stores = [MemoryStore(), MemoryStore()]
+    first.sync(stores[0])
+    second.sync(stores[1])
+
+    # Changes are pruned every 1000th seq; this leaves only the last keep_changes of them
+    put_companies(first, stores[0], [f'Company {i}' for i in range(1000)])
+    oldest = first._connection().execute('SELECT MIN(seq) FROM changes').fetchone()[0]
+    assert oldest > stores[1].seq + 1
+
+    with mock.patch.object(second, '_full_load', wraps=second._full_load) as full_load:
+        assert second.sync(stores[1])
+    full_load.assert_called_once()
+    assert stores[1].seq == stores[0].seq == 1000
+    assert companies(stores[0]) == companies(stores[1])
+    first.close()
+    second.close()
+
+
+def test_rollback_reloads_the_store_it_was_applied_to(data_dir):
+    first, second = open_storage(data_dir), open_storage(data_dir)
+    stores = [MemoryStore(), MemoryStore()]
+    first.sync(stores[0])
+    second.sync(stores[1])
+    before = companies(stores[0])
+    [kept] = put_companies(first, stores[0], ['Kept'])
+
+    with pytest.raises(RuntimeError):
+        with first.transaction(stores[0]) as store:
+            company_id = store.next_id('companies')
+            first.commit(store, [{'op': 'put', 'entity': 'companies', 'id': company_id,
+                                  'data': {'id': company_id, 'name': 'Rolled back'}}])
+            first.commit(store, [{'op': 'delete', 'entity': 'companies', 'id': kept, 'data': None}])
+            assert store.get_company(company_id) is not None
+            raise RuntimeError('abort')
+
+    assert first.sync(stores[0])
+    assert second.sync(stores[1])
+    expected = {**before, kept: {'id': kept, 'name': 'Kept', 'project_count': 0}}
+    assert companies(stores[0]) == companies(stores[1]) == expected
+    assert stores[0].seq == stores[1].seq == 1
+    # The rolled back id was never committed, so it is free again
+    assert put_companies(second, stores[1], ['Next']) == [company_id]
+    first.close()
+    second.close()
+
+
+def test_ids_unique_across_processes(monkeypatch):
+    monkeypatch.setenv('JOURNAL_FSYNC', 'false')
+    result = run('sqlite', workers=2, writes=50, threads=2)
+    assert result['writes'] == 100
+    assert (result['failed'], result['duplicate_ids'], result['lost_writes']) == (0, 0, 0)
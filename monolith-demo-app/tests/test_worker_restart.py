@@ -0,0 +1,38 @@
+"""Zero failed requests while the prefork server's workers are restarted under load.
+
+Run from monolith-demo-app/: python -m pytest tests
+"""
+import asyncio
+import shutil
+import time
+from typing import List
+
+from benchmarks.loadgen import LoadGenerator, Target, restart_workers, summarize
+from benchmarks.server import APP_DIR, run_server_process
+
+PATHS = ['/health', '/companies?limit=10', '/companies/1001', '/companies/1001/projects', '/projects?limit=10']
+DURATION = 6.0
+RESTART_EVERY = 1.5
+
+
+def test_no_failed_requests_during_worker_restart(tmp_path):
+    data_dir = tmp_path / 'data'
+    shutil.copytree(f'{APP_DIR}/app/models/data', data_dir)
+    env = {'DATA_DIR': str(data_dir), 'DRAIN_FILE': str(tmp_path / 'draining'),
+           'SIMULATED_DELAY_SCALE': '0', 'METRICS_ENABLED': 'false'}
+    with run_server_process(env=env, workers=2, server='prefork') as (base_url, process):
+        generator = LoadGenerator([Target('GET', base_url + path) for path in PATHS], DURATION,
+                                  concurrency=8, rate=None, timeout=10.0, sequential=False, seed=1)
+        restarts: List[float] = []
+
+        async def go():
+            start = time.perf_counter()
+            await asyncio.gather(generator.run(),
+                                 restart_workers(process.pid, RESTART_EVERY, start + DURATION, restarts, start))
+
+        asyncio.run(go())
+
+    report = summarize(generator.results, 1.0, restarts)
+    assert restarts, 'no worker was restarted'
+    assert report['requests'] > 0
+    assert report['failed'] == 0, report['routes']